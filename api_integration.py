@@ -3,11 +3,13 @@ VLR Scraper using FastAPI Frontend
 """
 import requests
 import pyodbc
-from vlr_scraper import VLRScraper
+from vlr_scraper_enhanced import VLRScraper
+from vlr_browser_pool import BrowserPool
+from vlr_rate_limiter import RateLimiter
+import vlr_http
 from datetime import datetime
 from typing import Dict, List, Optional
 import sys
-import time
 
 
 class APIInserter:
@@ -407,6 +409,8 @@ def main():
         use_windows_auth=True
     )
     
+    pool = None
+    vlr_http.configure(rate_limiter=RateLimiter(requests_per_second=1.0))
     try:
         # Get match URLs
         print("\n📡 Discovering matches...")
@@ -418,12 +422,13 @@ def main():
         unique_urls = list(set(all_urls))
         print(f"✅ Found {len(unique_urls)} matches\n")
         
-        # Scrape and insert
+        # Scrape and insert, reusing one browser across matches
+        pool = BrowserPool(size=1, headless=True)
         for i, url in enumerate(unique_urls, 1):
             print(f"[{i}/{len(unique_urls)}] {url}")
             
             try:
-                with VLRScraper(headless=True) as scraper:
+                with pool.scraper() as scraper:
                     match_data = scraper.scrape_match(url)
                 
                 teams = match_data.get('teams', {})
@@ -431,17 +436,17 @@ def main():
                 
                 db.insert_match_data(match_data)
                 print(f"  ✅ Success!\n")
-                time.sleep(2)
                 
             except Exception as e:
                 print(f"  ❌ Error: {e}\n")
-                time.sleep(5)
         
         print("="*70)
         print("✅ COMPLETE")
         print("="*70)
         
     finally:
+        if pool:
+            pool.close()
         db.close()
 
 
@@ -1,9 +1,25 @@
 """
 Run VLR Scraper 
 """
+import argparse
+import multiprocessing
 import sys
-import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import vlr_http
+import vlr_html_parser
+from vlr_archive import reparse_archive
+from vlr_incremental import IngestedMatches
+from vlr_rate_limiter import RateLimiter
+from vlr_pipeline import IngestPipeline
+from vlr_journal import JobJournal
+from vlr_match_stubs import filter_stubs
+from vlr_profiling import PROFILE_MODES, StageProfiler, profiling
+from vlr_readiness import latency_report
 from vlr_scraper_enhanced import VLRScraper
+from vlr_browser_pool import BrowserPool
+from vlr_parallel import scrape_parallel
+from vlr_entity_registry import EntityRegistry
 from sql_server_integration_enhanced import SQLServerInserter
 
 
@@ -18,119 +34,563 @@ SQL_PASSWORD = 'zelda'
 
 # Scraping Settings
 HEADLESS = True
-DELAY_BETWEEN_MATCHES = 2
+SCRAPE_ENGINE = 'static'       # 'static' (HTTP, browser only as fallback) or 'browser'
+DETAIL_FETCH = 'async'         # 'async' (team/event/player pages at once) or 'sync'
+PARSER_BACKEND = 'html.parser' # 'html.parser', 'lxml' or 'selectolax'
+LEAN_BROWSER = False           # Firefox without images, third-party requests or animations
+FETCH_MATCH_TABS = True        # Economy and performance tabs (two extra requests per match)
 
+# Rate Limit Settings (shared by every request, browser loads and worker)
+REQUESTS_PER_SECOND = 1.0      # Backs off on 429/503 and recovers up to this
+REQUEST_BURST = 3
 
-def main():
-    """Main scraper function"""
-    
-    # Check command line arguments
-    if len(sys.argv) != 3:
-        print("\n" + "="*70)
-        print("VLR.GG MATCH SCRAPER")
-        print("="*70)
-        print("\nUsage: python run_scraper_enhanced.py START_PAGE END_PAGE")
-        print("\nExamples:")
-        print("  python run_scraper_enhanced.py 1 1    # Scrape page 1")
-        print("  python run_scraper_enhanced.py 1 3    # Scrape pages 1-3")
-        print("\n" + "="*70)
-        sys.exit(1)
-    
+# HTTP Cache Settings (team/event/player pages are reused across runs)
+HTTP_CACHE_DIR = '.vlr_cache'
+HTTP_CACHE_MAX_MB = 500
+
+# Raw HTML archive (lets --reparse rebuild matches without scraping again)
+ARCHIVE_PAGES = False
+HTML_ARCHIVE_PATH = 'vlr_archive.sqlite'
+
+# Pipeline Settings (--pipeline: database writes run beside scraping)
+PIPELINE_QUEUE_SIZE = 8        # Scraped matches waiting for a writer before scraping pauses
+PIPELINE_WRITERS = 1           # Writer threads, each with its own connection
+
+# IDs of matches already written to the database (used by --incremental)
+INGESTED_DB_PATH = 'vlr_ingested.sqlite'
+
+# Results-page match stubs: stored in MatchStubs during discovery so the GUI
+# can list matches that are known but not scraped yet
+STORE_MATCH_STUBS = True
+
+# Job journal (state of every discovered match, used by --resume)
+JOURNAL_PATH = 'vlr_journal.sqlite'
+MAX_ATTEMPTS = 3               # Scrape attempts per match before it is left as failed
+
+# Profiling (--profile writes <prefix>.prof or <prefix>.collapsed)
+PROFILE_OUTPUT_PREFIX = 'vlr_profile'
+
+# Browser Pool Settings
+BROWSER_POOL_SIZE = 1
+MAX_PAGES_PER_DRIVER = 25      # Restart Firefox after this many matches
+MAX_DRIVER_MEMORY_MB = 1500    # Restart Firefox once it uses more than this
+
+
+def _parse_day(text: str) -> date:
     try:
-        start_page = int(sys.argv[1])
-        end_page = int(sys.argv[2])
+        return datetime.strptime(text, '%Y-%m-%d').date()
     except ValueError:
-        print("ERROR: Page numbers must be integers")
-        sys.exit(1)
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {text!r}")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="VLR.GG MATCH SCRAPER",
+        epilog=(
+            "Examples:\n"
+            "  python run_scraper_enhanced.py 1 1              # Scrape page 1\n"
+            "  python run_scraper_enhanced.py 1 3              # Scrape pages 1-3\n"
+            "  python run_scraper_enhanced.py 1 10 --workers 4 # 4 browsers in parallel\n"
+            "  python run_scraper_enhanced.py 1 50 --incremental # New matches only\n"
+            "  python run_scraper_enhanced.py 1 20 --event Masters --since 2025-06-01 --no-showmatches\n"
+            "  python run_scraper_enhanced.py --resume         # Continue an interrupted run\n"
+            "  python run_scraper_enhanced.py --reparse        # Rebuild archived matches"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('start_page', type=int, nargs='?', help="First results page to scan")
+    parser.add_argument('end_page', type=int, nargs='?', help="Last results page to scan")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of browser worker processes (default: 1)")
+    parser.add_argument('--engine', choices=['static', 'browser'], default=SCRAPE_ENGINE,
+                        help="static: plain HTTP with browser fallback; browser: always Selenium "
+                             f"(default: {SCRAPE_ENGINE})")
+    parser.add_argument('--details', choices=['async', 'sync'], default=DETAIL_FETCH,
+                        help="Fetch team/tournament/player pages concurrently or one by one "
+                             f"(default: {DETAIL_FETCH})")
+    parser.add_argument('--parser', choices=vlr_html_parser.PARSER_BACKENDS, default=PARSER_BACKEND,
+                        help=f"HTML parser used for extraction (default: {PARSER_BACKEND})")
+    parser.add_argument('--lean', action='store_true', default=LEAN_BROWSER,
+                        help="Use the lean Firefox profile for browser scrapes (no images, ads, "
+                             "trackers or animations; eager page loads; persistent disk cache)")
+    parser.add_argument('--no-tabs', action='store_true', default=not FETCH_MATCH_TABS,
+                        help="Skip the economy and performance tabs (RoundEconomy, EconomyStats, "
+                             "MultiKillStats and ClutchStats stay empty)")
+    parser.add_argument('--event', action='append', metavar='NAME',
+                        help="Only matches whose event name contains NAME (repeatable)")
+    parser.add_argument('--region', action='append', metavar='REGION',
+                        help="Only matches with a team flag code (e.g. kr) or event name part "
+                             "(e.g. EMEA) equal to REGION (repeatable)")
+    parser.add_argument('--since', type=_parse_day, metavar='YYYY-MM-DD',
+                        help="Only matches played on or after this date (paging stops past it)")
+    parser.add_argument('--until', type=_parse_day, metavar='YYYY-MM-DD',
+                        help="Only matches played on or before this date")
+    parser.add_argument('--completed-only', action='store_true',
+                        help="Skip matches that are not marked completed on the results page")
+    parser.add_argument('--no-showmatches', action='store_true',
+                        help="Skip showmatches")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"Do not use the on-disk page cache in {HTTP_CACHE_DIR}")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last unfinished run from its journal, then retry its failures")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Skip matches already ingested and stop at the first results page "
+                             "with no new matches")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Write to the database in background threads while scraping continues")
+    parser.add_argument('--writers', type=int, default=PIPELINE_WRITERS,
+                        help=f"Database writer threads in --pipeline mode (default: {PIPELINE_WRITERS})")
+    parser.add_argument('--archive', action='store_true', default=ARCHIVE_PAGES,
+                        help=f"Keep every fetched page in {HTML_ARCHIVE_PATH}")
+    parser.add_argument('--reparse', action='store_true',
+                        help=f"Rebuild every match in {HTML_ARCHIVE_PATH} offline and replace it "
+                             "in the database (--workers defaults to one per CPU)")
+    parser.add_argument('--profile-report', metavar='PATH',
+                        help="Write per-stage timing percentiles to PATH (.json or .csv)")
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help=f"Profile the scrape in this process (writes {PROFILE_OUTPUT_PREFIX}.prof "
+                             f"or {PROFILE_OUTPUT_PREFIX}.collapsed)")
     
-    if start_page > end_page or start_page < 1:
-        print("ERROR: START_PAGE must be ≤ END_PAGE and > 0")
-        sys.exit(1)
+    args = parser.parse_args(argv)
     
-    print(f"\nScraping pages {start_page} to {end_page}...\n")
+    if args.reparse or args.resume:
+        if args.start_page is not None:
+            parser.error("--reparse/--resume do not take START_PAGE/END_PAGE")
+        if args.reparse and args.resume:
+            parser.error("--reparse and --resume cannot be combined")
+    elif args.start_page is None or args.end_page is None:
+        parser.error("START_PAGE and END_PAGE are required")
+    elif args.start_page > args.end_page or args.start_page < 1:
+        parser.error("START_PAGE must be ≤ END_PAGE and > 0")
+    if args.workers is None:
+        args.workers = multiprocessing.cpu_count() if args.reparse else 1
+    if args.since and args.until and args.since > args.until:
+        parser.error("--since must not be after --until")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.writers < 1:
+        parser.error("--writers must be at least 1")
+    
+    return args
+
+
+def stub_filters(args) -> Optional[Dict]:
+    """filter_stubs() keyword arguments for the metadata flags, or None when none are set"""
+    filters = {'events': args.event, 'regions': args.region, 'since': args.since, 'until': args.until,
+               'completed_only': args.completed_only, 'exclude_showmatches': args.no_showmatches}
+    return filters if any(filters.values()) else None
+
+
+def discover_urls(start_page: int, end_page: int, ingested: IngestedMatches = None,
+                  filters: Optional[Dict] = None, db: SQLServerInserter = None) -> List[str]:
+    """
+    Collect unique match URLs from the results pages.
+    With `ingested`, already ingested matches are dropped and paging stops at
+    the first page on which every match is already known (results are newest first).
+    With `filters` (filter_stubs() keyword arguments), matches are filtered on
+    the metadata of their results-page cards before anything is scraped, and
+    paging stops at the first page that is entirely older than filters['since'].
+    With `db`, every card seen is stored as a match stub (STORE_MATCH_STUBS).
+    """
+    all_urls = []
+    since = (filters or {}).get('since')
+    
+    for page in range(start_page, end_page + 1):
+        print(f"Scanning page {page}...", end=' ')
+        try:
+            stubs = VLRScraper.get_match_stubs_by_page_static(page)
+            
+            if db is not None and STORE_MATCH_STUBS and stubs:
+                db.upsert_match_stubs(stubs)
+            
+            reached_known = False
+            if ingested is not None and stubs:
+                known = ingested.known_ids(s['vlr_match_id'] for s in stubs if s.get('vlr_match_id') is not None)
+                new_stubs = [s for s in stubs if s.get('vlr_match_id') not in known]
+                if db is not None and STORE_MATCH_STUBS and known:
+                    db.mark_stubs_scraped([s['url'] for s in stubs if s.get('vlr_match_id') in known])
+                status = f"{len(stubs)} matches found, {len(new_stubs)} new"
+                reached_known = not new_stubs
+            else:
+                new_stubs = stubs
+                status = f"{len(stubs)} matches found"
+            
+            if filters:
+                new_stubs = filter_stubs(new_stubs, **filters)
+                status += f", {len(new_stubs)} after filters"
+            print(status)
+            all_urls.extend(s['url'] for s in new_stubs)
+            
+            if reached_known:
+                print("Reached already ingested matches, stopping")
+                break
+            dates = [s['match_date'] for s in stubs if s.get('match_date') is not None]
+            if since and dates and max(dates) < since:
+                print(f"Reached matches before {since}, stopping")
+                break
+        except Exception as e:
+            print(f"Error: {e}")
+    
+    return list(set(all_urls))
+
+
+def connect_db() -> SQLServerInserter:
+    """Open a database connection with the settings above"""
+    return SQLServerInserter(
+        server=SERVER_NAME,
+        database=DATABASE_NAME,
+        use_windows_auth=USE_WINDOWS_AUTH,
+        user=SQL_USER if not USE_WINDOWS_AUTH else "",
+        password=SQL_PASSWORD if not USE_WINDOWS_AUTH else ""
+    )
+
+
+def insert_match(db: SQLServerInserter, match_data: Dict, replace: bool = False,
+                 ingested: IngestedMatches = None, journal: JobJournal = None):
+    """Write one match to the database and remember it as ingested"""
+    db.insert_match_data(match_data, skip_if_exists=not replace)
+    if STORE_MATCH_STUBS and match_data.get('url'):
+        db.mark_stubs_scraped([match_data['url']])
+    if ingested is not None:
+        ingested.mark(match_data.get('url'))
+    if journal is not None:
+        journal.mark_ingested(match_data.get('url'))
+
+
+def count_success(match_data: Dict, counts: Dict) -> str:
+    """Count a stored match and return the status text for the progress line"""
+    teams = match_data.get('teams', {})
+    team1 = teams.get('team1', {}).get('name', 'Unknown')
+    team2 = teams.get('team2', {}).get('name', 'Unknown')
+    
+    counts['stages'].add(match_data.get('stage_timings'))
+    
+    counts['success'] += 1
+    return f"✓ {team1} vs {team2}"
+
+
+def store_match(db: SQLServerInserter, match_data: Dict, counts: Dict, replace: bool = False,
+                ingested: IngestedMatches = None, journal: JobJournal = None) -> str:
+    """Insert a scraped match and return the status text for the progress line"""
+    insert_match(db, match_data, replace, ingested, journal)
+    return count_success(match_data, counts)
+
+
+def report_written(url: str, match_data: Dict, error: str, counts: Dict, journal: JobJournal = None):
+    """Progress line for a match a pipeline writer has finished"""
+    status = record_error(error, counts, url, journal) if error else count_success(match_data, counts)
+    print(f"  stored {url.split('/')[-1][:50]}: {status}")
+
+
+def hand_off(db, url: str, match_data: Dict, counts: Dict, replace: bool = False,
+             ingested: IngestedMatches = None, journal: JobJournal = None) -> str:
+    """Store a match directly, or queue it for the writer threads in pipeline mode"""
+    if journal is not None:
+        journal.mark_scraped(url)
+    if isinstance(db, IngestPipeline):
+        db.submit(url, match_data)
+        return f"→ queued ({db.depth}/{db.max_queue})"
+    return store_match(db, match_data, counts, replace, ingested, journal)
+
+
+def record_error(error_msg: str, counts: Dict, url: str = None, journal: JobJournal = None) -> str:
+    """Count a failed match and return the status text for the progress line"""
+    if "already exists" in error_msg.lower() or "skip" in error_msg.lower():
+        counts['skip'] += 1
+        if journal is not None and url:
+            journal.mark_ingested(url)
+        return "(skipped)"
+    counts['error'] += 1
+    if journal is not None and url:
+        journal.mark_failed(url, error_msg)
+    return f"✗ {error_msg[:50]}"
+
+
+def scrape_sequential(urls: List[str], db: SQLServerInserter, counts: Dict, pool: BrowserPool,
+                      engine: str = SCRAPE_ENGINE, ingested: IngestedMatches = None,
+                      journal: JobJournal = None):
+    """Scrape and insert matches one at a time"""
+    for i, url in enumerate(urls, 1):
+        print(f"[{i}/{len(urls)}] {url.split('/')[-1][:50]}...", end=' ')
+        
+        try:
+            # Scrape the match (pooled browser only if the engine needs one)
+            match_data = pool.scrape_match(url, engine=engine)
+            
+            print(hand_off(db, url, match_data, counts, ingested=ingested, journal=journal))
+            
+        except Exception as e:
+            print(record_error(str(e), counts, url, journal))
+
+
+def scrape_concurrent(urls: List[str], db: SQLServerInserter, counts: Dict, workers: int,
+                      engine: str = SCRAPE_ENGINE, scraper_options: Dict = None,
+                      http_settings: Dict = None, ingested: IngestedMatches = None,
+                      journal: JobJournal = None):
+    """Scrape matches in worker processes; all inserts happen here on one connection"""
+    print(f"Using {workers} workers ({engine} engine)\n")
+    
+    results = scrape_parallel(
+        urls,
+        workers=workers,
+        headless=HEADLESS,
+        engine=engine,
+        max_pages_per_driver=MAX_PAGES_PER_DRIVER,
+        max_memory_mb=MAX_DRIVER_MEMORY_MB,
+        scraper_options=scraper_options,
+        http_settings=http_settings
+    )
+    
+    for i, (url, match_data, error) in enumerate(results, 1):
+        print(f"[{i}/{len(urls)}] {url.split('/')[-1][:50]}...", end=' ')
+        
+        if error is not None:
+            print(record_error(error, counts, url, journal))
+            continue
+        
+        try:
+            print(hand_off(db, url, match_data, counts, ingested=ingested, journal=journal))
+        except Exception as e:
+            print(record_error(str(e), counts, url, journal))
+
+
+def reparse_archived(urls: List[str], db: SQLServerInserter, counts: Dict, workers: int,
+                     scraper_options: Dict = None, ingested: IngestedMatches = None):
+    """Rebuild archived matches with the current parser and replace them in the database"""
+    print(f"Re-parsing with {workers} workers (no network)\n")
+    
+    results = reparse_archive(HTML_ARCHIVE_PATH, urls, workers=workers, scraper_options=scraper_options)
+    
+    for i, (url, match_data, error) in enumerate(results, 1):
+        print(f"[{i}/{len(urls)}] {url.split('/')[-1][:50]}...", end=' ')
+        
+        if error is not None:
+            print(record_error(error, counts))
+            continue
+        
+        try:
+            print(hand_off(db, url, match_data, counts, replace=True, ingested=ingested))
+        except Exception as e:
+            print(record_error(str(e), counts))
+
+
+def cache_counters() -> Dict:
+    """Cumulative page cache counters (shared by all worker processes)"""
+    cache_stats = vlr_http.get_stats().get('cache')
+    return cache_stats['lifetime'] if cache_stats else {}
+
+
+def main(argv=None):
+    """Main scraper function"""
+    args = parse_args(argv)
+    start_page = args.start_page
+    end_page = args.end_page
+    
+    if args.reparse:
+        print(f"\nRe-parsing matches archived in {HTML_ARCHIVE_PATH}...\n")
+    elif args.resume:
+        print(f"\nResuming the last unfinished run from {JOURNAL_PATH}...\n")
+    else:
+        print(f"\nScraping pages {start_page} to {end_page}...\n")
+    
+    http_settings = {
+        'cache_dir': None if args.no_cache else HTTP_CACHE_DIR,
+        'cache_max_mb': HTTP_CACHE_MAX_MB,
+        'archive_path': HTML_ARCHIVE_PATH if args.archive or args.reparse else None,
+        'rate_limiter': RateLimiter(REQUESTS_PER_SECOND, burst=REQUEST_BURST),
+    }
+    vlr_http.configure(**http_settings)
+    vlr_html_parser.set_default_backend(args.parser)
+    cache_before = cache_counters()
     
     # Connect to database
     try:
-        db = SQLServerInserter(
-            server=SERVER_NAME,
-            database=DATABASE_NAME,
-            use_windows_auth=USE_WINDOWS_AUTH,
-            user=SQL_USER if not USE_WINDOWS_AUTH else "",
-            password=SQL_PASSWORD if not USE_WINDOWS_AUTH else ""
-        )
+        db = connect_db()
     except Exception as e:
         print(f"Database connection failed: {e}")
         sys.exit(1)
     
+    pool = None
+    manager = None
+    pipeline = None
+    ingested = IngestedMatches(INGESTED_DB_PATH)
+    journal = JobJournal(JOURNAL_PATH)
+    run_id = None
+    
     try:
-        # Step 1: Discover match URLs
-        all_urls = []
-        
-        for page in range(start_page, end_page + 1):
-            print(f"Scanning page {page}...", end=' ')
-            try:
-                links = VLRScraper.get_match_links_by_page_static(page)
-                all_urls.extend(links)
-                print(f"{len(links)} matches found")
-                time.sleep(1)
-            except Exception as e:
-                print(f"Error: {e}")
-        
-        unique_urls = list(set(all_urls))
+        # Step 1: Discover match URLs (or list the archived / unfinished ones)
+        if args.reparse:
+            unique_urls = vlr_http.get_archive().urls('match')
+        elif args.resume:
+            run = journal.latest_unfinished_run()
+            if run is None:
+                print("No unfinished run to resume")
+                return
+            run_id = run['run_id']
+            unique_urls = journal.pending(run_id)
+            print(f"Run {run_id} (pages {run['start_page']}-{run['end_page']}): "
+                  f"{len(unique_urls)} matches left, "
+                  f"{len(journal.retryable(run_id, MAX_ATTEMPTS))} failed to retry")
+        else:
+            if args.incremental:
+                print(f"Incremental: {ingested.count()} matches already ingested "
+                      f"(newest ID {ingested.watermark()})\n")
+            discovered = discover_urls(start_page, end_page,
+                                       ingested if args.incremental else None,
+                                       filters=stub_filters(args), db=db)
+            run_id = journal.start_run(start_page, end_page)
+            journal.add_urls(run_id, discovered)
+            unique_urls = journal.pending(run_id)
+            if len(unique_urls) < len(discovered):
+                print(f"{len(discovered) - len(unique_urls)} matches already finished in earlier runs")
         print(f"\nTotal unique matches: {len(unique_urls)}\n")
         
-        if not unique_urls:
+        if not unique_urls and not (run_id and journal.retryable(run_id, MAX_ATTEMPTS)):
             print("No matches found")
+            if run_id:
+                journal.finish_run(run_id, MAX_ATTEMPTS)
             return
         
         # Step 2: Scrape and insert matches
-        success_count = 0
-        skip_count = 0
-        error_count = 0
+        counts = {'success': 0, 'skip': 0, 'error': 0, 'stages': StageProfiler()}
+        
+        # One entity registry for the whole run (shared by worker processes)
+        if args.workers > 1:
+            manager = multiprocessing.Manager()
+            registry = EntityRegistry.shared(manager)
+        else:
+            registry = EntityRegistry()
+        scraper_options = {'detail_fetch': args.details, 'registry': registry,
+                           'parser_backend': args.parser, 'lean_browser': args.lean,
+                           'match_tabs': not args.no_tabs}
+        
+        # Where scraped matches go: straight into db, or through the writer threads
+        sink = db
+        if args.pipeline:
+            pipeline = IngestPipeline(
+                connect_db,
+                store=lambda conn, match_data: insert_match(conn, match_data, args.reparse, ingested, journal),
+                on_done=lambda url, match_data, error: report_written(url, match_data, error, counts, journal),
+                writers=args.writers,
+                max_queue=PIPELINE_QUEUE_SIZE
+            )
+            pipeline.start()
+            sink = pipeline
         
-        for i, url in enumerate(unique_urls, 1):
-            print(f"[{i}/{len(unique_urls)}] {url.split('/')[-1][:50]}...", end=' ')
+        def run_pass(urls):
+            nonlocal pool
+            if args.reparse:
+                reparse_archived(urls, sink, counts, args.workers, scraper_options, ingested)
+            elif args.workers > 1:
+                scrape_concurrent(urls, sink, counts, args.workers, args.engine,
+                                  scraper_options, http_settings, ingested, journal)
+            else:
+                if pool is None:
+                    pool = BrowserPool(
+                        size=BROWSER_POOL_SIZE,
+                        headless=HEADLESS,
+                        max_pages_per_driver=MAX_PAGES_PER_DRIVER,
+                        max_memory_mb=MAX_DRIVER_MEMORY_MB,
+                        scraper_options=scraper_options
+                    )
+                scrape_sequential(urls, sink, counts, pool, args.engine, ingested, journal)
+            if pipeline:
+                pipeline.drain()
+        
+        with profiling(args.profile, PROFILE_OUTPUT_PREFIX):
+            run_pass(unique_urls)
             
-            try:
-                # Scrape the match
-                with VLRScraper(headless=HEADLESS) as scraper:
-                    match_data = scraper.scrape_match(url)
-                
-                # Get basic info
-                teams = match_data.get('teams', {})
-                team1 = teams.get('team1', {}).get('name', 'Unknown')
-                team2 = teams.get('team2', {}).get('name', 'Unknown')
-                
-                # Insert into database
-                db.insert_match_data(match_data, skip_if_exists=True)
-                
-                success_count += 1
-                print(f"✓ {team1} vs {team2}")
-                
-                # Wait before next match
-                if i < len(unique_urls):
-                    time.sleep(DELAY_BETWEEN_MATCHES)
-                
-            except Exception as e:
-                error_msg = str(e)
-                if "already exists" in error_msg.lower() or "skip" in error_msg.lower():
-                    skip_count += 1
-                    print("(skipped)")
-                else:
-                    error_count += 1
-                    print(f"✗ {str(e)[:50]}")
-                
-                time.sleep(5)
+            # Separate pass for matches that failed (this run or before a resume)
+            if run_id is not None:
+                retry_urls = journal.retryable(run_id, MAX_ATTEMPTS)
+                if retry_urls:
+                    print(f"\nRetrying {len(retry_urls)} failed matches...\n")
+                    run_pass(retry_urls)
+                journal.finish_run(run_id, MAX_ATTEMPTS)
+        
+        if pipeline:
+            pipeline.close()
+        
+        # Replaced matches keep the record they were first counted with; rebuild
+        # it from the re-parsed maps instead
+        if args.reparse and counts['success']:
+            print("\nRecomputing team win/loss records...")
+            db.recompute_team_stats()
         
         # Final summary
         print("\n" + "="*70)
         print("SUMMARY")
         print("="*70)
-        print(f"Successfully inserted: {success_count}")
-        print(f"Skipped (duplicates):  {skip_count}")
-        print(f"Errors:                {error_count}")
+        print(f"Successfully inserted: {counts['success']}")
+        print(f"Skipped (duplicates):  {counts['skip']}")
+        print(f"Errors:                {counts['error']}")
         print(f"Total processed:       {len(unique_urls)}")
         
+        if run_id is not None:
+            job_counts = journal.counts(run_id)
+            print(f"Journal:               run {run_id}: {job_counts['ingested']} ingested, "
+                  f"{job_counts['failed']} failed, "
+                  f"{job_counts['pending'] + job_counts['scraped']} unfinished")
+            if journal.latest_unfinished_run() is not None:
+                print(f"                       (continue with --resume)")
+        
+        cache_after = cache_counters()
+        if cache_after:
+            run_counts = {k: cache_after[k] - cache_before.get(k, 0) for k in cache_after}
+            print(f"Page cache:            {run_counts['hits']} hits, {run_counts['misses']} misses, "
+                  f"{run_counts['revalidated']} revalidated")
+        
+        limiter_stats = http_settings['rate_limiter'].get_stats()
+        print(f"Request rate:          {limiter_stats['current_rate']:.2f}/s now "
+              f"(max {limiter_stats['max_rate']:.2f}/s), {limiter_stats['requests']} requests, "
+              f"{limiter_stats['throttled']} throttled, {limiter_stats['waited_seconds']:.0f}s waited")
+        
+        session_stats = vlr_http.get_stats().get('session')
+        if session_stats and session_stats['requests']:
+            print(f"HTTP connections:      {session_stats['connections']} opened for "
+                  f"{session_stats['requests']} requests ({session_stats['reused']} reused, "
+                  f"{session_stats['transport']})")
+        
+        registry_stats = registry.get_stats()
+        print(f"Detail fetches saved:  {registry_stats['fetches_saved']} "
+              f"({registry_stats['entities']} teams/events/players known)")
+        
+        if pipeline:
+            pipeline_stats = pipeline.get_stats()
+            print(f"Pipeline:              scraped {pipeline_stats['scraped_per_min']:.1f}/min, "
+                  f"written {pipeline_stats['written_per_min']:.1f}/min "
+                  f"(writers could do {pipeline_stats['write_capacity_per_min']:.1f}/min)")
+            print(f"                       queue depth avg {pipeline_stats['avg_depth']:.1f}, "
+                  f"max {pipeline_stats['max_depth']}/{PIPELINE_QUEUE_SIZE}; scraping blocked "
+                  f"{pipeline_stats['producer_blocked_seconds']:.0f}s, writers idle "
+                  f"{pipeline_stats['writer_idle_seconds']:.0f}s -> bottleneck: {pipeline_stats['bottleneck']}")
+        
+        stage_summary = counts['stages'].summary()
+        if stage_summary:
+            stages = ", ".join(f"{stage} {row['mean'] * 1000:.0f}ms (p95 {row['p95'] * 1000:.0f}ms)"
+                               for stage, row in stage_summary.items() if '.' not in stage)
+            print(f"Stage times (mean):    {stages}")
+        readiness = latency_report()
+        if readiness:
+            waits = ", ".join(f"{name} p50 {row['p50'] * 1000:.0f}ms (p95 {row['p95'] * 1000:.0f}ms, "
+                              f"{row['timeouts']} timeouts)" for name, row in readiness.items())
+            print(f"Readiness waits:       {waits}")
+        if args.profile_report:
+            counts['stages'].write_report(args.profile_report, extra={
+                'engine': 'reparse' if args.reparse else args.engine,
+                'workers': args.workers,
+                'details': args.details,
+                'parser': args.parser,
+                'readiness': readiness,
+            })
+            print(f"Stage report:          {args.profile_report}")
+        
+        if pool:
+            pool_stats = pool.get_stats()
+            print(f"Browsers started:      {pool_stats['drivers_started']} "
+                  f"({pool_stats['drivers_recycled']} recycled)")
+        
         # Database stats
         try:
             db.cursor.execute("SELECT COUNT(*) FROM Matches")
@@ -151,6 +611,14 @@ def main():
     except Exception as e:
         print(f"\nCritical error: {e}")
     finally:
+        if pipeline:
+            pipeline.close()
+        if pool:
+            pool.close()
+        if manager:
+            manager.shutdown()
+        ingested.close()
+        journal.close()
         db.close()
 
 
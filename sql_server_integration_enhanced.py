@@ -2,11 +2,29 @@
 SQL Server Integration for VLR Match Data 
 """
 import pyodbc
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Optional
+from vlr_incremental import match_id_from_url
 from vlr_constants import AGENT_DATA, MAP_DATA, get_agent_id, get_agent_role, get_map_id
 
 
+class _DeferredCommits:
+    """Connection stand-in whose commit() and rollback() are left to an enclosing transaction"""
+    
+    def __init__(self, conn):
+        self._conn = conn
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
 class SQLServerInserter:
     """Handles SQL Server insertions with enhanced data"""
     
@@ -348,6 +366,55 @@ class SQLServerInserter:
             print(f"Warning: Could not update team stats: {e}")
             self.conn.rollback()
     
+    @contextmanager
+    def defer_commits(self):
+        """
+        Hold back the commits of every write made in this block, so the caller
+        can commit them (with anything else on the connection) as one transaction.
+        
+        The rollbacks behind tolerated warnings are held back too: SQL Server
+        keeps the transaction open after a failed statement, and an error that
+        dooms it makes the caller's commit fail instead.
+        Yields:
+            The real pyodbc connection
+        """
+        conn = self.conn
+        self.conn = _DeferredCommits(conn)
+        try:
+            yield conn
+        finally:
+            self.conn = conn
+    
+    def recompute_team_stats(self):
+        """
+        Rebuild TeamStats from the stored matches: a team wins a match by winning
+        more maps (MatchStats rounds) than its opponent; drawn matches are not counted
+        """
+        try:
+            self.cursor.execute("DELETE FROM TeamStats")
+            self.cursor.execute("""
+                WITH MapsWon AS (
+                    SELECT mm.match_id, ms.team_id,
+                           SUM(CASE WHEN ms.rounds_won > ms.rounds_lost THEN 1 ELSE 0 END) AS maps_won
+                    FROM MatchStats ms
+                    JOIN MatchMaps mm ON mm.match_map_id = ms.match_map_id
+                    GROUP BY mm.match_id, ms.team_id
+                ), Results AS (
+                    SELECT t.team_id, CASE WHEN t.maps_won > o.maps_won THEN 1 ELSE 0 END AS won
+                    FROM MapsWon t
+                    JOIN MapsWon o ON o.match_id = t.match_id AND o.team_id <> t.team_id
+                    WHERE t.maps_won <> o.maps_won
+                )
+                INSERT INTO TeamStats (team_id, matches_played, matches_won, matches_lost)
+                SELECT team_id, COUNT(*), SUM(won), COUNT(*) - SUM(won)
+                FROM Results
+                GROUP BY team_id
+            """)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Warning: Could not recompute team stats: {e}")
+    
     def check_match_exists(self, team1_id: int, team2_id: int, match_date) -> Optional[int]:
         """Check if match exists and return match_id"""
         try:
@@ -377,6 +444,12 @@ class SQLServerInserter:
             print(f"  Deleting existing data for Match ID: {match_id}...")
             
             self.cursor.execute("DELETE FROM AdvancedStats WHERE match_id = ?", (match_id,))
+            for table in ('RoundEconomy', 'EconomyStats', 'MultiKillStats', 'ClutchStats',
+                          'PlayerSideMetrics', 'TeamSideMetrics'):
+                self.cursor.execute(
+                    f"DELETE FROM {table} WHERE match_map_id IN (SELECT match_map_id FROM MatchMaps WHERE match_id = ?)",
+                    (match_id,)
+                )
             self.cursor.execute("DELETE FROM PlayerMatches WHERE match_id = ?", (match_id,))
             self.cursor.execute(
                 "DELETE FROM MatchRounds WHERE match_map_id IN (SELECT match_map_id FROM MatchMaps WHERE match_id = ?)", 
@@ -470,6 +543,7 @@ class SQLServerInserter:
             
             # Check if match exists
             existing_match_id = self.check_match_exists(team1_id, team2_id, match_datetime)
+            replacing = False
             
             if existing_match_id:
                 if skip_if_exists:
@@ -478,6 +552,7 @@ class SQLServerInserter:
                 else:
                     print(f"  🔄 Match exists (ID: {existing_match_id}) - REPLACING")
                     self.delete_match_data(existing_match_id)
+                    replacing = True
             
             # --- 2. Insert Match Record ---
             self.cursor.execute(
@@ -555,16 +630,18 @@ class SQLServerInserter:
             self.conn.commit()
             
             # --- 4. Update Team Stats (wins/losses) ---
+            # A replaced match was already counted when it was first stored
             team1_score = team1_data.get('score', 0)
             team2_score = team2_data.get('score', 0)
             
-            if team1_score > team2_score:
-                self.update_team_stats(team1_id, won=True)
-                self.update_team_stats(team2_id, won=False)
-            elif team2_score > team1_score:
-                self.update_team_stats(team1_id, won=False)
-                self.update_team_stats(team2_id, won=True)
-            # If tie, don't update wins/losses, just matches played would be updated
+            if not replacing:
+                if team1_score > team2_score:
+                    self.update_team_stats(team1_id, won=True)
+                    self.update_team_stats(team2_id, won=False)
+                elif team2_score > team1_score:
+                    self.update_team_stats(team1_id, won=False)
+                    self.update_team_stats(team2_id, won=True)
+                # If tie, don't update wins/losses, just matches played would be updated
             
             # --- 5. Insert Player Stats ---
             player_stats = match_data.get('player_stats', [])
@@ -642,11 +719,212 @@ class SQLServerInserter:
             
             self.conn.commit()
             
+            # --- 6. Insert Economy, Performance Tab and Side Stats ---
+            for map_data in maps_data:
+                match_map_id = match_map_ids.get(map_data.get('map_number'))
+                if match_map_id:
+                    self.insert_map_tab_stats(match_map_id, map_data, team1_id, team2_id, player_id_cache)
+                    map_stats = [p for p in player_stats if p.get('map_name') == map_data.get('map_name')]
+                    self.insert_side_metrics(match_map_id, map_data, map_stats, team1_name,
+                                             team1_id, team2_id, player_id_cache)
+            
+            self.conn.commit()
+            
         except Exception as e:
             self.conn.rollback()
             import traceback
             raise
     
+    def insert_map_tab_stats(self, match_map_id: int, map_data: Dict, team1_id: int, team2_id: int,
+                             player_ids: Dict[str, int]):
+        """
+        Bulk insert one map's economy and performance tab data
+        (RoundEconomy, EconomyStats, MultiKillStats, ClutchStats)
+        Args:
+            match_map_id: MatchMaps row of the map
+            map_data: Map entry with 'economy', 'multikills' and 'clutches' (see vlr_match_tabs)
+            team1_id, team2_id: Team IDs in team1/team2 order
+            player_ids: Player ID by IGN for this match
+        """
+        team_ids = {'team1': team1_id, 'team2': team2_id}
+        economy = map_data.get('economy') or {}
+        
+        round_rows = [
+            (match_map_id, rnd.get('round_number'), team_id, rnd.get(f'{side}_bank'), rnd.get(f'{side}_buy'))
+            for rnd in economy.get('rounds', [])
+            for side, team_id in team_ids.items()
+        ]
+        summary_rows = [
+            (match_map_id, team_id,
+             economy[side].get('pistol_won', 0),
+             economy[side].get('eco_won', 0),
+             economy[side].get('semi_eco_won', 0),
+             economy[side].get('semi_buy_won', 0),
+             economy[side].get('full_buy_won', 0))
+            for side, team_id in team_ids.items() if economy.get(side)
+        ]
+        multikill_rows = [
+            (match_map_id, mk.get('round_number'), player_ids[mk['player_ign']], mk.get('kills'))
+            for mk in map_data.get('multikills') or [] if mk.get('player_ign') in player_ids
+        ]
+        clutch_rows = [
+            (match_map_id, cl.get('round_number'), player_ids[cl['player_ign']], cl.get('clutch_type'),
+             1 if cl.get('won') else 0)
+            for cl in map_data.get('clutches') or [] if cl.get('player_ign') in player_ids
+        ]
+        
+        cursor = self.conn.cursor()
+        cursor.fast_executemany = True
+        for sql, rows in (
+            ("INSERT INTO RoundEconomy (match_map_id, round_number, team_id, money, economy_category) "
+             "VALUES (?, ?, ?, ?, ?)", round_rows),
+            ("INSERT INTO EconomyStats (match_map_id, team_id, pistol_rounds_won, eco_rounds_won, "
+             "semi_eco_rounds_won, semi_buy_rounds_won, full_buy_rounds_won) VALUES (?, ?, ?, ?, ?, ?, ?)",
+             summary_rows),
+            ("INSERT INTO MultiKillStats (match_map_id, round_number, player_id, kills_in_round) "
+             "VALUES (?, ?, ?, ?)", multikill_rows),
+            ("INSERT INTO ClutchStats (match_map_id, round_number, player_id, clutch_type, was_successful) "
+             "VALUES (?, ?, ?, ?, ?)", clutch_rows),
+        ):
+            if rows:
+                cursor.executemany(sql, rows)
+        cursor.close()
+    
+    def insert_side_metrics(self, match_map_id: int, map_data: Dict, map_stats: List[Dict],
+                            team1_name: str, team1_id: int, team2_id: int, player_ids: Dict[str, int]):
+        """
+        Bulk insert one map's attack/defense split (PlayerSideMetrics, TeamSideMetrics)
+        Args:
+            match_map_id: MatchMaps row of the map
+            map_data: Map entry with team1/team2 _attack_rounds and _defense_rounds
+            map_stats: The map's player stat rows, each with 'sides' when available
+            team1_name: Name of team1 (every other team_name belongs to team2)
+            team1_id, team2_id: Team IDs in team1/team2 order
+            player_ids: Player ID by IGN for this match
+        """
+        player_rows = []
+        team_totals = {}
+        for p_stat in map_stats:
+            sides = p_stat.get('sides') or {}
+            team_id = team1_id if p_stat.get('team_name') == team1_name else team2_id
+            for side, values in sides.items():
+                if p_stat.get('player_ign') in player_ids:
+                    player_rows.append((
+                        match_map_id, player_ids[p_stat['player_ign']], side,
+                        values.get('rating'), values.get('acs'), values.get('kills'),
+                        values.get('deaths'), values.get('assists'), values.get('kast_percent'),
+                        values.get('adr'), values.get('hs_percent'),
+                        values.get('first_kills'), values.get('first_deaths'),
+                    ))
+                totals = team_totals.setdefault((team_id, side), [0, 0])
+                totals[0] += values.get('kills') or 0
+                totals[1] += values.get('deaths') or 0
+        
+        # Spikes are only planted on attack and only defused on defense
+        spikes = {}
+        for p_stat in map_stats:
+            team_id = team1_id if p_stat.get('team_name') == team1_name else team2_id
+            for side, field in (('Attack', 'plants'), ('Defense', 'defuses')):
+                if p_stat.get(field) is not None:
+                    spikes[(team_id, side)] = spikes.get((team_id, side), 0) + p_stat[field]
+        
+        team_rows = []
+        for team_key, team_id, opponent_key in (('team1', team1_id, 'team2'), ('team2', team2_id, 'team1')):
+            for side, opposite in (('attack', 'defense'), ('defense', 'attack')):
+                side_name = side.capitalize()
+                rounds_won = map_data.get(f'{team_key}_{side}_rounds')
+                rounds_lost = map_data.get(f'{opponent_key}_{opposite}_rounds')
+                totals = team_totals.get((team_id, side_name))
+                if rounds_won is None and totals is None:
+                    continue
+                rounds_played = rounds_won + rounds_lost if None not in (rounds_won, rounds_lost) else None
+                team_rows.append((
+                    match_map_id, team_id, side_name, rounds_played, rounds_won,
+                    totals[0] if totals else None, totals[1] if totals else None,
+                    spikes.get((team_id, side_name)) if side_name == 'Attack' else None,
+                    spikes.get((team_id, side_name)) if side_name == 'Defense' else None,
+                ))
+        
+        cursor = self.conn.cursor()
+        cursor.fast_executemany = True
+        for sql, rows in (
+            ("INSERT INTO PlayerSideMetrics (match_map_id, player_id, side, r2o, acs, kills, deaths, assists, "
+             "kast, adr, hs_percent, first_kills, first_deaths) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+             player_rows),
+            ("INSERT INTO TeamSideMetrics (match_map_id, team_id, side, rounds_played, rounds_won, "
+             "total_kills, total_deaths, plants, defuses) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", team_rows),
+        ):
+            if rows:
+                cursor.executemany(sql, rows)
+        cursor.close()
+    
+    def upsert_match_stubs(self, stubs: List[Dict]) -> int:
+        """
+        Insert or refresh results-page match stubs (MatchStubs), keyed by VLR match ID.
+        scraped_at is left alone, so stubs of scraped matches stay marked.
+        Returns:
+            Number of stubs written
+        """
+        rows = [
+            (stub['vlr_match_id'], stub.get('url'), stub.get('match_date'),
+             stub.get('team1_name'), stub.get('team2_name'), stub.get('team1_score'), stub.get('team2_score'),
+             stub.get('team1_country'), stub.get('team2_country'),
+             stub.get('event_name'), stub.get('event_series'), stub.get('status'))
+            for stub in stubs if stub.get('vlr_match_id') is not None
+        ]
+        if not rows:
+            return 0
+        cursor = self.conn.cursor()
+        try:
+            cursor.fast_executemany = True
+            cursor.executemany("""
+                MERGE MatchStubs AS target
+                USING (VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?))
+                    AS source (vlr_match_id, url, match_date, team1_name, team2_name, team1_score,
+                               team2_score, team1_country, team2_country, event_name, event_series, status)
+                ON target.vlr_match_id = source.vlr_match_id
+                WHEN MATCHED THEN UPDATE SET
+                    url = source.url, match_date = source.match_date,
+                    team1_name = source.team1_name, team2_name = source.team2_name,
+                    team1_score = source.team1_score, team2_score = source.team2_score,
+                    team1_country = source.team1_country, team2_country = source.team2_country,
+                    event_name = source.event_name, event_series = source.event_series,
+                    status = source.status, last_seen = GETDATE()
+                WHEN NOT MATCHED THEN INSERT
+                    (vlr_match_id, url, match_date, team1_name, team2_name, team1_score, team2_score,
+                     team1_country, team2_country, event_name, event_series, status)
+                    VALUES (source.vlr_match_id, source.url, source.match_date, source.team1_name,
+                            source.team2_name, source.team1_score, source.team2_score, source.team1_country,
+                            source.team2_country, source.event_name, source.event_series, source.status);
+            """, rows)
+            self.conn.commit()
+            return len(rows)
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Warning: Could not store match stubs: {e}")
+            return 0
+        finally:
+            cursor.close()
+    
+    def mark_stubs_scraped(self, urls: List[str]):
+        """Set scraped_at on the stubs of these match URLs (stubs not stored yet are ignored)"""
+        ids = [(match_id,) for match_id in map(match_id_from_url, urls) if match_id is not None]
+        if not ids:
+            return
+        cursor = self.conn.cursor()
+        try:
+            cursor.fast_executemany = True
+            cursor.executemany(
+                "UPDATE MatchStubs SET scraped_at = GETDATE() WHERE vlr_match_id = ? AND scraped_at IS NULL",
+                ids
+            )
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Warning: Could not mark match stubs as scraped: {e}")
+        finally:
+            cursor.close()
+    
     def close(self):
         """Close the database connection"""
         if self.cursor:
@@ -0,0 +1,73 @@
+"""
+BrowserPool hand-out with fake drivers (no Firefox needed)
+"""
+import threading
+
+import pytest
+
+from vlr_browser_pool import BrowserPool
+from vlr_scraper_enhanced import VLRScraper
+
+
+class FakeDriver:
+    window_handles = ['main']
+    capabilities = {}
+    current_url = 'about:blank'
+
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(VLRScraper, 'build_driver', staticmethod(lambda *args, **kwargs: FakeDriver()))
+    monkeypatch.setattr(BrowserPool, '_reset', staticmethod(lambda driver: True))
+    pool = BrowserPool(size=1, max_pages_per_driver=0, max_memory_mb=None)
+    yield pool
+    pool.close()
+
+
+def test_released_driver_is_reused(pool):
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert pool.get_stats()['drivers_started'] == 1
+
+
+def test_waiter_wakes_when_holder_recycles(pool):
+    held = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    # Recycling frees the slot without returning a driver; the waiter must start a new one
+    pool.release(held, broken=True)
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert acquired and acquired[0] is not held
+    assert held.driver.quit_called
+
+
+def test_acquire_times_out_when_pool_is_full(pool):
+    pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.1)
+
+
+def test_close_wakes_waiters(pool):
+    pool.acquire()
+    errors = []
+
+    def wait():
+        try:
+            pool.acquire()
+        except RuntimeError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    pool.close()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive() and errors
@@ -0,0 +1,135 @@
+"""
+JobCoordinator: every match is written exactly once, also when leases expire
+"""
+import threading
+import time
+
+import pytest
+
+from vlr_coordinator import JobCoordinator, LeaseLost, run_worker
+
+URLS = [f'https://www.vlr.gg/{100000 + i}/team-{i}-vs-team-{i + 1}' for i in range(24)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite')
+    coordinator = JobCoordinator.sqlite(path)
+    coordinator.conn.execute("CREATE TABLE Written (url TEXT, writer TEXT)")
+    coordinator.close()
+    return path
+
+
+def open_coordinator(db_path, **kwargs) -> JobCoordinator:
+    return JobCoordinator.sqlite(db_path, **kwargs)
+
+
+def write(coordinator, url, writer):
+    # Stands in for the match insert, on the job table's database
+    coordinator.conn.execute("INSERT INTO Written VALUES (?, ?)", (url, writer))
+
+
+def written(coordinator):
+    return coordinator.conn.execute("SELECT url, writer FROM Written").fetchall()
+
+
+def test_concurrent_workers_write_each_match_once(db_path):
+    setup = open_coordinator(db_path)
+    setup.add_urls(URLS)
+    results = []
+
+    def worker(name):
+        coordinator = open_coordinator(db_path)
+        try:
+            results.append(run_worker(
+                coordinator,
+                scrape=lambda url: {'url': url},
+                store=lambda match_data, replace: write(coordinator, match_data['url'], name),
+                worker_id=name, batch=2, poll_seconds=0.01,
+                write_conn=coordinator.conn
+            ))
+        finally:
+            coordinator.close()
+
+    threads = [threading.Thread(target=worker, args=(f'w{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    urls = [url for url, _ in written(setup)]
+    assert sorted(urls) == sorted(URLS)
+    assert sum(r['ingested'] for r in results) == len(URLS)
+    assert setup.counts()['ingested'] == len(URLS)
+    setup.close()
+
+
+def test_taken_over_lease_writes_nothing(db_path):
+    old = open_coordinator(db_path, lease_seconds=0.2)
+    new = open_coordinator(db_path, lease_seconds=60)
+    old.add_urls(URLS[:1])
+
+    stale = old.claim('old')[0]
+    assert old.begin_ingest(stale)
+    time.sleep(0.4)  # the old worker stalls until its lease expires
+
+    current = new.claim('new')[0]
+    assert current.replace
+    assert new.begin_ingest(current)
+    with new.fenced(current):
+        write(new, current.url, 'new')
+
+    with pytest.raises(LeaseLost):
+        with old.fenced(stale):
+            write(old, stale.url, 'old')
+
+    assert written(new) == [(URLS[0], 'new')]
+    assert new.counts()['ingested'] == 1
+    old.close()
+    new.close()
+
+
+def test_lease_expiring_during_the_write_cannot_be_claimed(db_path):
+    old = open_coordinator(db_path, lease_seconds=0.2)
+    new = open_coordinator(db_path, lease_seconds=60)
+    old.add_urls(URLS[:1])
+
+    lease = old.claim('old')[0]
+    assert old.begin_ingest(lease)
+    writing = threading.Event()
+    claimed = []
+
+    def claim_meanwhile():
+        writing.wait()
+        time.sleep(0.3)  # past the old lease
+        claimed.extend(new.claim('new'))
+
+    thief = threading.Thread(target=claim_meanwhile)
+    thief.start()
+    with old.fenced(lease):
+        writing.set()
+        time.sleep(0.6)  # a slow insert outlives the lease
+        write(old, lease.url, 'old')
+    thief.join()
+
+    assert claimed == []
+    assert written(old) == [(URLS[0], 'old')]
+    assert old.counts()['ingested'] == 1
+    old.close()
+    new.close()
+
+
+def test_failed_write_rolls_back_and_keeps_the_lease(db_path):
+    coordinator = open_coordinator(db_path)
+    coordinator.add_urls(URLS[:1])
+    lease = coordinator.claim('w')[0]
+    assert coordinator.begin_ingest(lease)
+
+    with pytest.raises(ValueError):
+        with coordinator.fenced(lease):
+            write(coordinator, lease.url, 'w')
+            raise ValueError('insert failed')
+
+    assert written(coordinator) == []
+    assert coordinator.counts()['ingesting'] == 1
+    coordinator.close()
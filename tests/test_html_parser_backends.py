@@ -0,0 +1,54 @@
+"""
+Every parser backend must extract exactly what the 'html.parser' reference
+does from the saved pages in tests/fixtures
+"""
+import pytest
+
+import vlr_scraper_enhanced
+from vlr_html_parser import compare_backends
+from vlr_match_stubs import parse_results_page
+from vlr_scraper_enhanced import VLRScraper
+
+MATCH_PAGES = ('match_alpha_vs_beta.html', 'match_synthetic.html')
+OPTIONAL_BACKENDS = ('lxml', 'selectolax')
+
+
+@pytest.fixture(params=OPTIONAL_BACKENDS)
+def backend(request):
+    pytest.importorskip(request.param)
+    return request.param
+
+
+def parse_match(html: str, backend: str) -> dict:
+    scraper = VLRScraper(start_driver=False, detail_fetch='none', parser_backend=backend)
+    match_data = scraper.parse_match_html('https://www.vlr.gg/1/fixture', html)
+    match_data.pop('stage_timings', None)
+    return match_data
+
+
+@pytest.mark.parametrize('page', MATCH_PAGES)
+def test_match_page_matches_reference(fixture_html, page, backend):
+    html = fixture_html(page)
+    reference = parse_match(html, 'html.parser')
+    assert reference['player_stats'], "fixture page should yield player stats"
+    assert parse_match(html, backend) == reference
+
+
+@pytest.mark.parametrize('page', MATCH_PAGES)
+def test_compare_backends_reports_identical(fixture_html, page, backend):
+    assert compare_backends(fixture_html(page), backends=[backend]) == {backend: True}
+
+
+def test_results_page_links_match_reference(fixture_html, monkeypatch, backend):
+    html = fixture_html('results_page.html')
+    monkeypatch.setattr(vlr_scraper_enhanced, 'fetch_html', lambda url, timeout=None: html)
+    reference = sorted(VLRScraper.get_match_links_by_page_static(1, 'html.parser'))
+    assert reference
+    assert sorted(VLRScraper.get_match_links_by_page_static(1, backend)) == reference
+
+
+def test_results_page_stubs_match_reference(fixture_html, backend):
+    html = fixture_html('results_page.html')
+    reference = [dict(stub) for stub in parse_results_page(html, 'https://www.vlr.gg', 'html.parser')]
+    assert reference and reference[0]['team1_name'] and reference[0]['match_date']
+    assert [dict(stub) for stub in parse_results_page(html, 'https://www.vlr.gg', backend)] == reference
@@ -0,0 +1,50 @@
+"""
+JobJournal retry budget
+"""
+import pytest
+
+from vlr_journal import JobJournal
+
+URL = 'https://www.vlr.gg/100000/team-0-vs-team-1'
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = JobJournal(str(tmp_path / 'journal.sqlite'))
+    yield journal
+    journal.close()
+
+
+def fail_until_exhausted(journal, run_id, fail, max_attempts=3) -> int:
+    """Number of tries before the URL is no longer retryable"""
+    tries = 1
+    fail(journal)
+    while URL in journal.retryable(run_id, max_attempts):
+        fail(journal)
+        tries += 1
+    return tries
+
+
+def test_scrape_and_insert_failures_get_the_same_budget(journal):
+    def scrape_failure(journal):
+        journal.mark_failed(URL, 'scrape failed')
+
+    def insert_failure(journal):
+        journal.mark_scraped(URL)
+        journal.mark_failed(URL, 'insert failed')
+
+    budgets = []
+    for fail in (scrape_failure, insert_failure):
+        run_id = journal.start_run(1, 1)
+        journal.add_urls(run_id, [URL])
+        budgets.append(fail_until_exhausted(journal, run_id, fail))
+    assert budgets == [3, 3]
+
+
+def test_scraped_but_not_stored_stays_pending(journal):
+    run_id = journal.start_run(1, 1)
+    journal.add_urls(run_id, [URL])
+    journal.mark_scraped(URL)
+    assert journal.pending(run_id) == [URL]
+    journal.mark_ingested(URL)
+    assert journal.pending(run_id) == []
@@ -0,0 +1,46 @@
+"""
+Static scrapes (match pages plus async detail pages) reuse the pooled
+vlr_http connections across matches, checked against vlr_mock_server
+"""
+import pytest
+
+import vlr_http
+from vlr_benchmark import pointed_at
+from vlr_mock_server import MockVLRServer, SyntheticSite
+from vlr_scraper_enhanced import VLRScraper
+
+
+@pytest.fixture
+def server():
+    with MockVLRServer(SyntheticSite(matches=6), latency_ms=(0, 1)) as server, pointed_at(server.base_url):
+        vlr_http.configure(rate_limiter=None)
+        yield server
+        vlr_http.configure()
+
+
+def test_detail_pages_share_connections_across_matches(server):
+    urls = VLRScraper.get_match_links_by_page_static(1)
+    with VLRScraper(start_driver=False, detail_fetch='async', match_tabs=False) as scraper:
+        for url in urls:
+            scraper.scrape_match_static(url)
+
+    session = vlr_http.get_stats()['session']
+    served = server.get_stats()
+    assert session['requests'] == served['requests']
+    assert served['by_type']['player'] > 0
+    # One connection for the blocking client and one for the async client, whatever the match count
+    assert session['connections'] <= 2
+    assert session['reused'] == session['requests'] - session['connections']
+
+
+def test_close_stops_the_event_loop(server):
+    session = vlr_http.get_session()
+
+    async def fetch():
+        response = await session.aget(f"{server.base_url}/matches/results?page=1")
+        return response.status_code
+
+    assert session.run(fetch()) == 200
+    thread = session._loop_thread
+    session.close()
+    assert not thread.is_alive()
@@ -122,6 +122,48 @@ class RelationalSearchWorker(QThread):
             self.error.emit(str(e))
 
 
+# PENDING MATCHES WORKER
+class PendingMatchesWorker(QThread):
+    """Matches seen on the vlr.gg results pages (MatchStubs) that were not scraped yet"""
+    results_ready = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def __init__(self, terms: List[str]):
+        super().__init__()
+        self.terms = [t.strip() for t in terms if t.strip()]
+
+    def run(self):
+        try:
+            conn = connect_db()
+            cur = conn.cursor()
+
+            sql = """
+            SELECT vlr_match_id, match_date, event_name, event_series,
+                   team1_name, team2_name, team1_score, team2_score, status, url
+            FROM MatchStubs
+            WHERE scraped_at IS NULL
+            """
+
+            params = []
+            for term in self.terms:
+                ors = []
+                for field in ("team1_name", "team2_name", "event_name", "event_series"):
+                    ors.append(f"ISNULL({field},'') LIKE ?")
+                    params.append(f"%{term}%")
+                sql += " AND (" + " OR ".join(ors) + ")"
+
+            sql += " ORDER BY match_date DESC, vlr_match_id DESC"
+
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            conn.close()
+
+            self.results_ready.emit([tuple(r) for r in rows])
+
+        except Exception as e:
+            self.error.emit(str(e))
+
+
 # MAIN GUI
 class ValorantSearch(QWidget):
     def __init__(self):
@@ -160,6 +202,16 @@ class ValorantSearch(QWidget):
             return
         value = item.text().strip()
 
+        # Known but not scraped yet: nothing stored to graph
+        if "VLR ID" in headers:
+            url_item = self.table.item(row, headers.index("URL"))
+            QMessageBox.information(
+                self, "Not Yet Scraped",
+                "This match has not been scraped yet.\n"
+                f"{url_item.text() if url_item else ''}"
+            )
+            return
+
         # Match details on Match ID
         if header == "Match ID":
             self.show_match_details(value)
@@ -544,6 +596,10 @@ class ValorantSearch(QWidget):
         # Graph Builder row
         graph_row = QHBoxLayout()
         graph_row.addStretch()
+        self.btn_pending = QPushButton("Not Yet Scraped")
+        self.btn_pending.setFixedHeight(36)
+        self.btn_pending.clicked.connect(self.show_pending)
+        graph_row.addWidget(self.btn_pending)
         self.btn_graph_builder = QPushButton("Graph Builder")
         self.btn_graph_builder.setFixedHeight(36)
         self.btn_graph_builder.clicked.connect(self.open_graph_builder)
@@ -804,6 +860,46 @@ class ValorantSearch(QWidget):
         self.worker.error.connect(self.show_error)
         self.worker.start()
 
+    #PENDING MATCHES
+    def show_pending(self):
+        """List known matches without match data (the search text narrows by team/event)"""
+        text = self.search_input.text().strip()
+
+        self.status.setText("Loading matches not yet scraped…")
+        self.all_rows = []
+        self.table.clear()
+        self.table.setRowCount(0)
+        self.table.setColumnCount(0)
+        self.disable_filters()
+        self.loading_overlay.show()
+
+        self.worker = PendingMatchesWorker(text.split(",") if text else [])
+        self.worker.results_ready.connect(self.display_pending)
+        self.worker.error.connect(self.show_error)
+        self.worker.start()
+
+    def display_pending(self, rows):
+        self.loading_overlay.hide()
+
+        if not rows:
+            self.status.setText("No matches waiting to be scraped.")
+            return
+
+        headers = [
+            "VLR ID", "Date", "Event", "Series", "Team 1",
+            "Team 2", "Score 1", "Score 2", "Status", "URL"
+        ]
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.setRowCount(len(rows))
+
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                self.table.setItem(r, c, QTableWidgetItem("" if value is None else str(value)))
+
+        self.table.resizeColumnsToContents()
+        self.status.setText(f"{len(rows)} match(es) not yet scraped")
+
     #SEARCH HISTORY PILLS
     def update_search_history_pills(self):
         while self.history_layout.count():
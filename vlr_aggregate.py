@@ -0,0 +1,212 @@
+"""
+Player stat aggregation: per match (single pass) and per season (columnar, NumPy)
+"""
+import math
+from typing import Dict, Iterable, List, Tuple
+
+from vlr_records import PlayerMapStat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Summed over maps (missing/None values count as nothing)
+TOTAL_FIELDS = ('kills', 'deaths', 'assists', 'first_kills', 'first_deaths', 'plus_minus')
+
+# Averaged over the maps that have a value, rounded to this many digits (None: whole number)
+MEAN_FIELDS = (('rating', 2), ('acs', None), ('kast_percent', 1), ('adr', 1), ('hs_percent', 1))
+
+PLAYER_KEY = ('team_name', 'player_ign')
+
+
+class _PlayerTotals:
+    """Running totals for one player while the rows are swept"""
+    __slots__ = ('first', 'agent', 'totals', 'sums', 'counts', 'rows', 'matches')
+
+    def __init__(self, first):
+        self.first = first
+        self.agent = None
+        self.totals = [0] * len(TOTAL_FIELDS)
+        self.sums = [0] * len(MEAN_FIELDS)
+        self.counts = [0] * len(MEAN_FIELDS)
+        self.rows = 0
+        self.matches = 0
+
+    def add(self, stat):
+        get = stat.get
+        totals = self.totals
+        for i, field in enumerate(TOTAL_FIELDS):
+            value = get(field)
+            if value is not None:
+                totals[i] += value
+        sums, counts = self.sums, self.counts
+        for i, (field, _) in enumerate(MEAN_FIELDS):
+            value = get(field)
+            if value is not None:
+                sums[i] += value
+                counts[i] += 1
+        if self.agent is None:
+            self.agent = get('agent') or None
+        self.rows += 1
+
+
+def _mean(total, count, digits):
+    if not count:
+        return None
+    return round(total / count, digits) if digits is not None else round(total / count)
+
+
+def _build_record(key: Tuple, first, map_name: str, totals, sums, counts, agent) -> PlayerMapStat:
+    """Aggregated row in the same field layout aggregate_player_stats has always produced"""
+    agg = PlayerMapStat(**dict(zip(PLAYER_KEY, key)))
+    agg['map_name'] = map_name
+    agg['player_url'] = first.get('player_url', '')
+
+    # Copy region and join date from the first map entry
+    if 'player_region' in first:
+        agg['player_region'] = first['player_region']
+    if 'team_join_date' in first:
+        agg['team_join_date'] = first['team_join_date']
+
+    for field, total in zip(TOTAL_FIELDS, totals):
+        agg[field] = total
+    for (field, digits), total, count in zip(MEAN_FIELDS, sums, counts):
+        agg[field] = _mean(total, count, digits)
+    if agent:
+        agg['agent'] = agent
+    return agg
+
+
+def aggregate_player_stats(player_stats: List[Dict]) -> List[PlayerMapStat]:
+    """
+    Aggregate individual map stats into overall player statistics.
+
+    One sweep over the rows accumulates every total and average for every
+    player at once (grouped by team and IGN, in order of first appearance).
+    """
+    players = {}
+    for stat in player_stats:
+        key = (stat['team_name'], stat['player_ign'])
+        entry = players.get(key)
+        if entry is None:
+            entry = players[key] = _PlayerTotals(stat)
+        entry.add(stat)
+
+    return [
+        _build_record(key, entry.first, 'Overall', entry.totals, entry.sums, entry.counts, entry.agent)
+        for key, entry in players.items()
+    ]
+
+
+def _map_rows(matches: Iterable[Dict]):
+    """(match index, row) for every per-map stat row (skips the 'Overall' rows)"""
+    for match_idx, match_data in enumerate(matches):
+        if not match_data:
+            continue
+        for stat in match_data.get('player_stats', []):
+            if stat.get('map_name') != 'Overall':
+                yield match_idx, stat
+
+
+def aggregate_season(matches: Iterable[Dict], key_fields: Tuple[str, ...] = PLAYER_KEY,
+                     label: str = 'Season') -> List[PlayerMapStat]:
+    """
+    Aggregate per-map stats across many matches (e.g. reparse_archive output).
+
+    Rows are collected into one column per stat and reduced for all players
+    at once with NumPy (pure Python when NumPy is not installed). Totals,
+    averages and rounding follow aggregate_player_stats; each row also gets
+    'matches' and 'maps' played.
+    Args:
+        matches: Iterable of match_data dicts
+        key_fields: Fields that identify a player; ('player_url',) follows
+                    players across team changes
+        label: map_name of the aggregated rows
+    """
+    index = {}
+    firsts = []
+    agents = []
+    match_counts = []
+    last_match = []
+    codes = []
+    columns = {field: [] for field in TOTAL_FIELDS}
+    columns.update({field: [] for field, _ in MEAN_FIELDS})
+
+    # One pass over the rows: assign player codes and fill the columns
+    for match_idx, stat in _map_rows(matches):
+        key = tuple(stat.get(field) for field in key_fields)
+        code = index.get(key)
+        if code is None:
+            code = index[key] = len(firsts)
+            firsts.append(stat)
+            agents.append(None)
+            match_counts.append(0)
+            last_match.append(-1)
+        if last_match[code] != match_idx:
+            last_match[code] = match_idx
+            match_counts[code] += 1
+        if agents[code] is None:
+            agents[code] = stat.get('agent') or None
+        codes.append(code)
+        for field, column in columns.items():
+            value = stat.get(field)
+            column.append(math.nan if value is None else value)
+
+    n_players = len(firsts)
+    if not n_players:
+        return []
+
+    if np is not None:
+        code_array = np.asarray(codes, dtype=np.intp)
+        rows_per_player = np.bincount(code_array, minlength=n_players)
+        reduced = {}
+        for field, column in columns.items():
+            values = np.asarray(column, dtype=np.float64)
+            present = ~np.isnan(values)
+            sums = np.bincount(code_array[present], weights=values[present], minlength=n_players)
+            counts = np.bincount(code_array[present], minlength=n_players)
+            reduced[field] = (sums.tolist(), counts.tolist())
+        rows_per_player = rows_per_player.tolist()
+    else:
+        rows_per_player = [0] * n_players
+        for code in codes:
+            rows_per_player[code] += 1
+        reduced = {}
+        for field, column in columns.items():
+            sums = [0] * n_players
+            counts = [0] * n_players
+            for code, value in zip(codes, column):
+                if value == value:  # not NaN
+                    sums[code] += value
+                    counts[code] += 1
+            reduced[field] = (sums, counts)
+
+    results = []
+    for key, code in index.items():
+        totals = [int(reduced[field][0][code]) for field in TOTAL_FIELDS]
+        sums = [reduced[field][0][code] for field, _ in MEAN_FIELDS]
+        counts = [reduced[field][1][code] for field, _ in MEAN_FIELDS]
+        agg = _build_record((firsts[code].get('team_name'), firsts[code].get('player_ign')),
+                            firsts[code], label, totals, sums, counts, agents[code])
+        agg['matches'] = match_counts[code]
+        agg['maps'] = rows_per_player[code]
+        results.append(agg)
+    return results
+
+
+if __name__ == "__main__":
+    # Usage: python vlr_aggregate.py [archive.sqlite]  -> season leaderboard by rating
+    import sys
+    from vlr_archive import reparse_archive
+
+    archive_path = sys.argv[1] if len(sys.argv) > 1 else 'vlr_archive.sqlite'
+    matches = (match_data for _, match_data, error in
+               reparse_archive(archive_path, scraper_options={'detail_fetch': 'none'}) if not error)
+    season = aggregate_season(matches)
+    season.sort(key=lambda row: (row['rating'] is None, -(row['rating'] or 0)))
+    for row in season[:25]:
+        print(f"{row['player_ign']:16} {row['team_name']:24} {row['matches']:3} matches "
+              f"{row['maps']:3} maps  rating {row['rating']}  ACS {row['acs']}  "
+              f"K/D/A {row['kills']}/{row['deaths']}/{row['assists']}")
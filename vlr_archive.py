@@ -0,0 +1,184 @@
+"""
+Raw HTML archive of fetched vlr.gg pages, and offline re-parsing from it
+"""
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from vlr_http_cache import classify_url
+
+
+class HTMLArchive:
+    """
+    Append-only store of every page version the scraper has seen.
+
+    Each row holds one zlib-compressed page body keyed by URL and fetch time,
+    so a parser fix can be replayed over the archive instead of scraping
+    vlr.gg again. A new row is only written when a page's content changes.
+    Safe to share between threads; several processes may write to the same
+    file (SQLite WAL mode).
+    """
+
+    def __init__(self, path: str = 'vlr_archive.sqlite'):
+        """
+        Args:
+            path: SQLite file holding the archive (created if missing)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                   url TEXT NOT NULL,
+                   fetched_at REAL NOT NULL,
+                   page_type TEXT NOT NULL,
+                   body_hash TEXT NOT NULL,
+                   body BLOB NOT NULL,
+                   PRIMARY KEY (url, fetched_at)
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_type ON pages(page_type, url)")
+        self._conn.commit()
+
+        self.stats = {'saved': 0, 'unchanged': 0, 'reads': 0}
+
+    def save(self, url: str, html: str, fetched_at: Optional[float] = None) -> bool:
+        """
+        Archive a page unless its latest archived version is identical
+        Returns:
+            True if a new version was written
+        """
+        data = html.encode('utf-8')
+        body_hash = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            latest = self._conn.execute(
+                "SELECT body_hash FROM pages WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)
+            ).fetchone()
+            if latest and latest[0] == body_hash:
+                self.stats['unchanged'] += 1
+                return False
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, fetched_at, page_type, body_hash, body) VALUES (?, ?, ?, ?, ?)",
+                (url, fetched_at or time.time(), classify_url(url), body_hash, zlib.compress(data, 6))
+            )
+            self._conn.commit()
+            self.stats['saved'] += 1
+        return True
+
+    def latest(self, url: str) -> Optional[str]:
+        """Most recently archived version of a page, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM pages WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)
+            ).fetchone()
+            self.stats['reads'] += 1
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def versions(self, url: str) -> List[float]:
+        """Fetch times of every archived version of a page, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT fetched_at FROM pages WHERE url = ? ORDER BY fetched_at", (url,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def urls(self, page_type: Optional[str] = None) -> List[str]:
+        """Archived URLs, optionally only one page type ('match', 'team', 'event', 'player', ...)"""
+        with self._lock:
+            if page_type:
+                rows = self._conn.execute(
+                    "SELECT DISTINCT url FROM pages WHERE page_type = ? ORDER BY url", (page_type,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT DISTINCT url FROM pages ORDER BY url").fetchall()
+        return [row[0] for row in rows]
+
+    def get_stats(self) -> Dict:
+        """Counters for this process plus archive size per page type"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_type, COUNT(DISTINCT url), COUNT(*), COALESCE(SUM(LENGTH(body)), 0) "
+                "FROM pages GROUP BY page_type"
+            ).fetchall()
+        stats = dict(self.stats)
+        stats['pages'] = {page_type: {'urls': urls, 'versions': versions, 'bytes': size}
+                          for page_type, urls, versions, size in rows}
+        return stats
+
+    def close(self):
+        """Close the archive database"""
+        with self._lock:
+            self._conn.close()
+
+
+# Per-process state for reparse workers, set up by _init_reparse_worker
+_reparse_scraper = None
+
+
+def _init_reparse_worker(archive_path: str, scraper_options: Optional[Dict]):
+    """Point the worker's HTTP layer at the archive (no network) and build its parser"""
+    global _reparse_scraper
+    import vlr_http
+    from vlr_scraper_enhanced import VLRScraper
+
+    vlr_http.configure(archive_path=archive_path, offline=True)
+    _reparse_scraper = VLRScraper(start_driver=False, **(scraper_options or {}))
+
+
+def _reparse_in_worker(url: str) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """Rebuild one match from its archived page; errors are returned, not raised"""
+    import vlr_http
+    try:
+        html = vlr_http.get_archive().latest(url)
+        if html is None:
+            return url, None, "not in archive"
+        return url, _reparse_scraper.parse_match_html(url, html), None
+    except Exception as e:
+        return url, None, str(e) or e.__class__.__name__
+
+
+def reparse_archive(archive_path: str, urls: Optional[List[str]] = None,
+                    workers: Optional[int] = None,
+                    scraper_options: Optional[Dict] = None) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    """
+    Rebuild match_data for archived match pages across all CPU cores.
+
+    Team, event and player details are read from the archive as well, so no
+    request is sent to vlr.gg. Yields (url, match_data, error) tuples in
+    archive order, ready for SQLServerInserter.insert_match_data().
+    Args:
+        archive_path: Archive written during earlier scrapes
+        urls: Match URLs to rebuild (default: every archived match page)
+        workers: Worker processes (default: one per CPU)
+        scraper_options: Extra VLRScraper keyword arguments
+    """
+    if urls is None:
+        archive = HTMLArchive(archive_path)
+        try:
+            urls = archive.urls('match')
+        finally:
+            archive.close()
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(16, len(urls) // (workers * 4)))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(),
+        initializer=_init_reparse_worker,
+        initargs=(archive_path, scraper_options)
+    ) as executor:
+        yield from executor.map(_reparse_in_worker, urls, chunksize=chunksize)
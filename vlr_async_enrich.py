@@ -0,0 +1,205 @@
+"""
+Concurrent fetching of team, tournament and player detail pages
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import vlr_http
+from vlr_rate_limiter import THROTTLE_STATUSES
+
+
+class AsyncRateLimiter:
+    """
+    Spaces request starts at least 1/rate seconds apart within one event loop,
+    or takes its slots from a shared RateLimiter when one is given
+    """
+
+    def __init__(self, requests_per_second: float, shared=None):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.shared = shared
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        """Wait for the next free request slot"""
+        if self.shared is not None:
+            delay = self.shared.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncDetailEnricher:
+    """
+    Fetches every team, tournament and player page needed by one or more
+    matches at once, then merges the parsed details into the match_data dicts.
+
+    Requests go over the vlr_http session's long-lived async client (HTTP/2
+    when h2 is installed), so connections stay open from one match to the
+    next and show up in the session's reuse counters; without httpx they go
+    through the pooled session in worker threads. Concurrency is capped by a
+    semaphore and request starts are spaced by a rate limiter (the run's
+    shared vlr_http limiter when one is configured). Pages go through the
+    vlr_http cache, so fresh cached pages are never requested at all.
+    """
+
+    def __init__(self, parser, concurrency: int = 8, requests_per_second: float = 5.0,
+                 timeout: float = 10):
+        """
+        Args:
+            parser: VLRScraper providing the _parse_*_details methods
+            concurrency: Maximum requests in flight
+            requests_per_second: Maximum request start rate
+            timeout: Per-request timeout in seconds
+        """
+        self.parser = parser
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.timeout = timeout
+
+    def enrich(self, matches: List[Dict]) -> List[Dict]:
+        """Enrich a batch of match_data dicts in place (blocking wrapper)"""
+        vlr_http.get_session().run(self.enrich_async(matches))
+        return matches
+
+    async def enrich_async(self, matches: List[Dict]) -> List[Dict]:
+        """Enrich a batch of match_data dicts in place (run on vlr_http.get_session().run())"""
+        team_urls, tournament_urls, player_urls = self._collect_urls(matches)
+
+        # Entities already enriched earlier in the run are not fetched again
+        known = {}
+        for kind, urls in (('team', team_urls), ('tournament', tournament_urls), ('player', player_urls)):
+            for url in urls:
+                details = self.registry.get(kind, url)
+                if details is not None:
+                    known[url] = details
+
+        to_fetch = [url for url in team_urls + tournament_urls + player_urls if url not in known]
+        pages = await self._fetch_all(to_fetch) if to_fetch else {}
+
+        team_details = self._details_for('team', team_urls, known, pages,
+                                         self.parser._parse_team_details)
+        tournament_details = self._details_for('tournament', tournament_urls, known, pages,
+                                               self.parser._parse_tournament_details)
+        player_details = self._details_for('player', player_urls, known, pages,
+                                           self.parser._parse_player_details)
+
+        for match_data in matches:
+            self._merge(match_data, team_details, tournament_details, player_details)
+
+        return matches
+
+    @property
+    def registry(self):
+        return self.parser.registry
+
+    def _details_for(self, kind: str, urls: List[str], known: Dict, pages: Dict, parse_fn) -> Dict:
+        """Parsed (or already known) details per URL; newly parsed ones go into the registry"""
+        details = {}
+        for url in urls:
+            if url in known:
+                details[url] = known[url]
+                continue
+            details[url] = self._parse(parse_fn, pages.get(url))
+            if details[url] is not None:
+                self.registry.put(kind, url, details[url])
+        return details
+
+    def _collect_urls(self, matches: List[Dict]):
+        """Unique detail URLs across all matches, in first-seen order"""
+        team_urls, tournament_urls, player_urls = [], [], []
+
+        for match_data in matches:
+            teams = match_data.get('teams', {})
+            for team_key in ('team1', 'team2'):
+                url = teams.get(team_key, {}).get('url')
+                if url and url not in team_urls:
+                    team_urls.append(url)
+
+            tournament_url = match_data.get('match_info', {}).get('tournament_url')
+            if tournament_url and self.parser._is_valid_tournament_url(tournament_url) \
+                    and tournament_url not in tournament_urls:
+                tournament_urls.append(tournament_url)
+
+            for stat in match_data.get('player_stats', []):
+                url = stat.get('player_url')
+                if url and url not in player_urls:
+                    player_urls.append(url)
+
+        return team_urls, tournament_urls, player_urls
+
+    async def _fetch_all(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """Fetch all URLs concurrently; failed fetches map to None"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = AsyncRateLimiter(self.requests_per_second, shared=vlr_http.get_rate_limiter())
+
+        session = vlr_http.get_session()
+        bodies = await asyncio.gather(*[
+            self._fetch_one(url, semaphore, limiter, session) for url in urls
+        ])
+        return dict(zip(urls, bodies))
+
+    async def _fetch_one(self, url: str, semaphore, limiter, session) -> Optional[str]:
+        """Fetch one page under the concurrency cap and rate limit (cache first)"""
+        try:
+            entry, headers = vlr_http.prepare_request(url)
+        except vlr_http.ArchiveMiss as e:
+            print(f"    Warning: {e}")
+            return None
+        if entry is not None and entry.fresh:
+            return entry.body
+
+        async with semaphore:
+            try:
+                for attempt in range(vlr_http.MAX_THROTTLE_RETRIES + 1):
+                    await limiter.wait()
+                    response = await session.aget(url, headers=headers, timeout=self.timeout)
+                    vlr_http.record_status(response.status_code, response.headers.get('Retry-After'))
+                    if response.status_code not in THROTTLE_STATUSES:
+                        break
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return vlr_http.finish_response(url, entry, response.status_code,
+                                                response.headers, response.text)
+            except Exception as e:
+                print(f"    Warning: Could not fetch {url}: {e}")
+                return None
+
+    @staticmethod
+    def _parse(parse_fn, html: Optional[str]) -> Optional[Dict]:
+        """Run a detail parser, returning None for missing or unparseable pages"""
+        if html is None:
+            return None
+        try:
+            return parse_fn(html)
+        except Exception as e:
+            print(f"    Warning: Could not parse detail page: {e}")
+            return None
+
+    def _merge(self, match_data: Dict, team_details: Dict, tournament_details: Dict, player_details: Dict):
+        """Merge fetched details into one match_data dict"""
+        teams = match_data.get('teams', {})
+        for team_key in ('team1', 'team2'):
+            team = teams.get(team_key, {})
+            details = team_details.get(team.get('url'))
+            team.update(details or {'region': None, 'logo_url': None})
+
+        match_info = match_data.get('match_info', {})
+        tournament_url = match_info.get('tournament_url')
+        if tournament_url:
+            details = tournament_details.get(tournament_url)
+            match_info.update(details or self.parser._empty_tournament_details())
+
+        for stat in match_data.get('player_stats', []):
+            player_url = stat.get('player_url')
+            if player_url:
+                self.parser._apply_player_details(stat, player_details.get(player_url))
@@ -0,0 +1,271 @@
+"""
+Crawler throughput benchmark against the local vlr.gg stand-in (vlr_mock_server)
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import vlr_http
+import vlr_scraper_enhanced
+from vlr_mock_server import ArchiveSite, MockVLRServer, SyntheticSite
+from vlr_profiling import percentile
+from vlr_scraper_enhanced import VLRScraper
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BENCH_PHASES = ('results', 'scrape', 'run')
+
+
+class PeakMemory:
+    """Samples the RSS of this process and its children; peak_mb is the highest total seen"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _rss_mb(self) -> Optional[float]:
+        if psutil is None:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+        process = psutil.Process()
+        total = 0
+        for proc in [process] + process.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / 1024 / 1024
+
+    def _sample(self):
+        while True:
+            rss = self._rss_mb()
+            if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+                self.peak_mb = rss
+            if self._stop.wait(self.interval):
+                break
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, name='peak-memory', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def _timed_calls(items: List, call: Callable) -> Dict:
+    """Run call(item) for every item; throughput, latency percentiles and peak memory"""
+    latencies = []
+    results = []
+    errors = 0
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        for item in items:
+            call_start = time.perf_counter()
+            try:
+                results.append(call(item))
+            except Exception as e:
+                errors += 1
+                print(f"  {item}: {e}")
+            latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'items': len(items),
+        'errors': errors,
+        'seconds': elapsed,
+        'per_minute': len(items) / elapsed * 60 if elapsed else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'peak_rss_mb': memory.peak_mb,
+        'results': results,
+    }
+
+
+@contextmanager
+def pointed_at(base_url: str):
+    """Send every scraper URL to base_url (this process and worker processes started inside)"""
+    previous_env = os.environ.get('VLR_BASE_URL')
+    previous = vlr_scraper_enhanced.VLR_BASE_URL
+    os.environ['VLR_BASE_URL'] = base_url
+    vlr_scraper_enhanced.VLR_BASE_URL = base_url
+    try:
+        yield
+    finally:
+        vlr_scraper_enhanced.VLR_BASE_URL = previous
+        if previous_env is None:
+            os.environ.pop('VLR_BASE_URL', None)
+        else:
+            os.environ['VLR_BASE_URL'] = previous_env
+
+
+def bench_results_pages(pages: List[int]) -> Dict:
+    """get_match_links_by_page_static over the given results pages"""
+    report = _timed_calls(pages, VLRScraper.get_match_links_by_page_static)
+    report['urls'] = sorted({url for links in report.pop('results') for url in links})
+    return report
+
+
+def bench_scrape(urls: List[str], engine: str = 'static', scraper_options: Optional[Dict] = None) -> Dict:
+    """
+    Scrape every URL with one scraper, one match at a time
+    Args:
+        urls: Match pages on the stand-in
+        engine: 'static' (scrape_match_static) or 'browser' (scrape_match, needs Firefox)
+        scraper_options: Extra VLRScraper keyword arguments
+    """
+    options = {'detail_fetch': 'sync', 'match_tabs': True, **(scraper_options or {})}
+    with VLRScraper(headless=True, start_driver=(engine == 'browser'), **options) as scraper:
+        scrape = scraper.scrape_match if engine == 'browser' else scraper.scrape_match_static
+        report = _timed_calls(urls, scrape)
+    report['stat_rows'] = sum(len(match_data.get('player_stats', [])) for match_data in report.pop('results'))
+    return report
+
+
+class _DiscardDatabase:
+    """Stands in for SQLServerInserter in a benchmark run: counts matches and stores nothing"""
+
+    def __init__(self):
+        self.inserted = 0
+        self._lock = threading.Lock()
+
+    def insert_match_data(self, match_data: Dict, skip_if_exists: bool = True):
+        with self._lock:
+            self.inserted += 1
+
+    def upsert_match_stubs(self, stubs: List[Dict]) -> int:
+        return len(stubs)
+
+    def mark_stubs_scraped(self, urls: List[str]):
+        pass
+
+    def close(self):
+        pass
+
+
+def bench_full_run(start_page: int, end_page: int, extra_args: Optional[List[str]] = None) -> Dict:
+    """
+    The whole run_scraper_enhanced flow (discovery, scraping, detail pages,
+    hand-off) with the database replaced by one that discards every match.
+    Journal, ingested list and cache live in a temporary directory.
+    """
+    import run_scraper_enhanced as runner
+
+    database = _DiscardDatabase()
+    state_dir = tempfile.mkdtemp(prefix='vlr_bench_')
+    saved = {name: getattr(runner, name) for name in
+             ('connect_db', 'INGESTED_DB_PATH', 'JOURNAL_PATH', 'HTTP_CACHE_DIR', 'HTML_ARCHIVE_PATH',
+              'REQUESTS_PER_SECOND', 'REQUEST_BURST')}
+    runner.connect_db = lambda: database
+    runner.INGESTED_DB_PATH = os.path.join(state_dir, 'ingested.sqlite')
+    runner.JOURNAL_PATH = os.path.join(state_dir, 'journal.sqlite')
+    runner.HTTP_CACHE_DIR = os.path.join(state_dir, 'cache')
+    runner.HTML_ARCHIVE_PATH = os.path.join(state_dir, 'archive.sqlite')
+    runner.REQUESTS_PER_SECOND = 1000.0
+    runner.REQUEST_BURST = 100
+    try:
+        with PeakMemory() as memory:
+            start = time.perf_counter()
+            runner.main([str(start_page), str(end_page), '--no-cache'] + list(extra_args or []))
+            elapsed = time.perf_counter() - start
+    finally:
+        for name, value in saved.items():
+            setattr(runner, name, value)
+        shutil.rmtree(state_dir, ignore_errors=True)
+    return {
+        'items': database.inserted,
+        'seconds': elapsed,
+        'per_minute': database.inserted / elapsed * 60 if elapsed else 0.0,
+        'peak_rss_mb': memory.peak_mb,
+    }
+
+
+def run_benchmark(server: MockVLRServer, pages: int = 1, engine: str = 'static', phases=BENCH_PHASES,
+                  run_args: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Benchmark the crawler against a running stand-in server
+    Args:
+        server: Started MockVLRServer
+        pages: Results pages to crawl (50 matches each)
+        engine: Scrape engine for the 'scrape' phase ('static' or 'browser')
+        phases: Any of 'results', 'scrape' and 'run'
+        run_args: Extra run_scraper_enhanced arguments for the 'run' phase
+    Returns:
+        {phase: {'items', 'seconds', 'per_minute', 'p50', 'p95', 'peak_rss_mb', ...}}
+        plus 'server': the stand-in's request counters
+    """
+    report = {}
+    with pointed_at(server.base_url):
+        vlr_http.configure(rate_limiter=None)
+        results = bench_results_pages(list(range(1, pages + 1)))
+        urls = results.pop('urls')
+        if 'results' in phases:
+            report['results'] = results
+        if 'scrape' in phases:
+            report['scrape'] = bench_scrape(urls, engine)
+        if 'run' in phases:
+            try:
+                report['run'] = bench_full_run(1, pages, run_args)
+            except ImportError as e:
+                print(f"Full run skipped: {e}")
+        vlr_http.configure()
+    report['server'] = server.get_stats()
+    return report
+
+
+def format_report(report: Dict[str, Dict]) -> str:
+    lines = []
+    for phase in BENCH_PHASES:
+        row = report.get(phase)
+        if not row:
+            continue
+        latency = (f"  p50 {row['p50'] * 1000:6.0f}ms  p95 {row['p95'] * 1000:6.0f}ms"
+                   if 'p50' in row else '')
+        memory = f"  peak RSS {row['peak_rss_mb']:.0f} MB" if row.get('peak_rss_mb') is not None else ''
+        errors = f"  {row['errors']} errors" if row.get('errors') else ''
+        lines.append(f"{phase:8} {row['items']:5} items in {row['seconds']:6.1f}s  "
+                     f"{row['per_minute']:7.1f}/min{latency}{memory}{errors}")
+    server = report.get('server')
+    if server:
+        lines.append(f"server   {server['requests']} requests ({server['throttled']} throttled, "
+                     f"{server['errors']} errors, {server['not_found']} not found) {server['by_type']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Usage: python vlr_benchmark.py [--pages 2] [--archive vlr_archive.sqlite] [--latency-ms 20 80] ...
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Crawler throughput against a local vlr.gg stand-in")
+    parser.add_argument('--pages', type=int, default=1, help="Results pages to crawl (50 matches each)")
+    parser.add_argument('--archive', help="Serve pages recorded in this HTML archive (default: generated pages)")
+    parser.add_argument('--engine', choices=['static', 'browser'], default='static')
+    parser.add_argument('--phases', nargs='+', choices=BENCH_PHASES, default=list(BENCH_PHASES))
+    parser.add_argument('--latency-ms', type=float, nargs=2, default=(20, 80), metavar=('MIN', 'MAX'))
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--run-args', nargs='*', default=[],
+                        help="Extra run_scraper_enhanced arguments, e.g. --run-args=--workers=4")
+    parser.add_argument('--json', help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    site = ArchiveSite(args.archive) if args.archive else SyntheticSite(matches=args.pages * 50)
+    with MockVLRServer(site, latency_ms=tuple(args.latency_ms), error_rate=args.error_rate,
+                       throttle_rate=args.throttle_rate, seed=0) as server:
+        report = run_benchmark(server, args.pages, args.engine, args.phases, args.run_args)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
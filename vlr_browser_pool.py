@@ -0,0 +1,282 @@
+"""
+Reusable Firefox WebDriver pool for VLR scraping
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from vlr_scraper_enhanced import VLRScraper
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class PooledDriver:
+    """A long-lived WebDriver plus the bookkeeping used to decide when to recycle it"""
+
+    def __init__(self, driver, slot: int):
+        self.driver = driver
+        self.slot = slot
+        self.pages_served = 0
+        self.created_at = time.time()
+
+
+class BrowserPool:
+    """
+    Keeps N Firefox drivers alive and hands them out one match at a time.
+
+    Drivers are created lazily, reset (cookies, storage, extra windows) when they
+    are returned, and recycled after `max_pages_per_driver` matches or once the
+    browser's resident memory passes `max_memory_mb`.
+    """
+
+    def __init__(self, size: int = 1, headless: bool = True,
+                 max_pages_per_driver: int = 25, max_memory_mb: Optional[int] = 1500,
+                 scraper_options: Optional[Dict] = None):
+        """
+        Args:
+            size: Maximum number of drivers kept alive at once
+            headless: Run Firefox without a visible window
+            max_pages_per_driver: Recycle a driver after this many matches (0 = never)
+            max_memory_mb: Recycle a driver once its RSS passes this limit (None = never)
+            scraper_options: Extra VLRScraper keyword arguments (e.g. detail_fetch)
+        """
+        if size < 1:
+            raise ValueError("Browser pool size must be at least 1")
+
+        self.size = size
+        self.headless = headless
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_memory_mb = max_memory_mb
+        self.scraper_options = scraper_options or {}
+
+        self._idle: List[PooledDriver] = []   # Most recently returned last
+        self._lock = threading.Lock()
+        # Signalled whenever a driver is returned or a slot frees up
+        self._available = threading.Condition(self._lock)
+        self._created = 0
+        self._all: List[PooledDriver] = []
+        self._closed = False
+        self._static_scraper = None
+
+        self.stats = {
+            'drivers_started': 0,
+            'drivers_recycled': 0,
+            'pages_served': 0,
+        }
+
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledDriver:
+        """Get an idle driver, starting a new one if the pool is not full yet"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    slot = self._created
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No browser available after {timeout}s")
+                self._available.wait(remaining)
+
+        try:
+            return self._start_driver(slot)
+        except Exception:
+            self._free_slot()
+            raise
+
+    def release(self, pooled: PooledDriver, broken: bool = False):
+        """Return a driver to the pool, resetting or recycling it as needed"""
+        pooled.pages_served += 1
+        self.stats['pages_served'] += 1
+
+        if self._closed:
+            self._quit(pooled)
+            return
+
+        if broken or self._needs_recycle(pooled) or not self._reset(pooled.driver):
+            self._quit(pooled)
+            self.stats['drivers_recycled'] += 1
+            self._free_slot()
+            return
+
+        with self._available:
+            self._idle.append(pooled)
+            self._available.notify()
+
+    def _free_slot(self):
+        """Give back a driver slot and wake one waiter so it can start a new driver"""
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    @contextmanager
+    def scraper(self, timeout: Optional[float] = None):
+        """
+        Borrow a driver wrapped in a VLRScraper for one match.
+
+        Usage:
+            with pool.scraper() as scraper:
+                match_data = scraper.scrape_match(url)
+        """
+        pooled = self.acquire(timeout=timeout)
+        scraper = VLRScraper(headless=self.headless, driver=pooled.driver, **self.scraper_options)
+        try:
+            yield scraper
+        except Exception:
+            self.release(pooled, broken=self._is_dead(pooled.driver))
+            raise
+        else:
+            self.release(pooled)
+        finally:
+            scraper.close()
+
+    def scrape_match(self, match_url: str, engine: str = 'static') -> Dict:
+        """
+        Scrape one match with the chosen engine
+        Args:
+            match_url: URL of the match page
+            engine: 'static' (plain HTTP, a pooled browser only as fallback)
+                    or 'browser' (always load the page in a pooled browser)
+        """
+        if engine == 'static':
+            if self._static_scraper is None:
+                self._static_scraper = VLRScraper(headless=self.headless, start_driver=False,
+                                                  **self.scraper_options)
+            return self._static_scraper.scrape_match_auto(match_url, browser_pool=self)
+
+        with self.scraper() as scraper:
+            return scraper.scrape_match(match_url)
+
+    def close(self):
+        """Quit every driver owned by the pool"""
+        with self._available:
+            self._closed = True
+            drivers = list(self._all)
+            self._all.clear()
+            self._idle.clear()
+            self._created = 0
+            self._available.notify_all()
+        for pooled in drivers:
+            self._quit(pooled)
+
+    def _start_driver(self, slot: int) -> PooledDriver:
+        """Start a new Firefox instance for the given slot"""
+        driver = VLRScraper.build_driver(self.headless, lean=self.scraper_options.get('lean_browser', False),
+                                         cache_slot=slot)
+        pooled = PooledDriver(driver, slot)
+        with self._lock:
+            self._all.append(pooled)
+        self.stats['drivers_started'] += 1
+        return pooled
+
+    def _quit(self, pooled: PooledDriver):
+        """Shut a driver down, ignoring errors from an already dead browser"""
+        with self._lock:
+            if pooled in self._all:
+                self._all.remove(pooled)
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def _needs_recycle(self, pooled: PooledDriver) -> bool:
+        """Check the page and memory limits for a driver"""
+        if self.max_pages_per_driver and pooled.pages_served >= self.max_pages_per_driver:
+            return True
+
+        if self.max_memory_mb:
+            memory_mb = self.driver_memory_mb(pooled.driver)
+            if memory_mb is not None and memory_mb > self.max_memory_mb:
+                print(f"  Recycling browser {pooled.slot}: {memory_mb:.0f} MB > {self.max_memory_mb} MB")
+                return True
+
+        return False
+
+    @staticmethod
+    def _reset(driver) -> bool:
+        """Clear per-match browser state so the next match starts clean"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"  Warning: Could not reset browser, recycling it: {e}")
+            return False
+
+    @staticmethod
+    def _is_dead(driver) -> bool:
+        """Return True if the WebDriver session no longer responds"""
+        try:
+            driver.current_url
+            return False
+        except Exception:
+            return True
+
+    @staticmethod
+    def driver_memory_mb(driver) -> Optional[float]:
+        """
+        Resident memory of the Firefox process tree behind a driver, in MB.
+        Uses psutil when installed, otherwise /proc for the main process only.
+        """
+        pid = driver.capabilities.get('moz:processID') if getattr(driver, 'capabilities', None) else None
+        if not pid:
+            return None
+
+        if psutil is not None:
+            try:
+                process = psutil.Process(pid)
+                rss = process.memory_info().rss
+                for child in process.children(recursive=True):
+                    try:
+                        rss += child.memory_info().rss
+                    except psutil.Error:
+                        pass
+                return rss / (1024 * 1024)
+            except psutil.Error:
+                return None
+
+        status_path = f"/proc/{pid}/status"
+        if os.path.exists(status_path):
+            try:
+                with open(status_path) as f:
+                    for line in f:
+                        if line.startswith('VmRSS:'):
+                            return int(line.split()[1]) / 1024
+            except (OSError, ValueError):
+                return None
+        return None
+
+    def get_stats(self) -> Dict:
+        """Pool counters plus the current number of live drivers"""
+        stats = dict(self.stats)
+        with self._lock:
+            stats['drivers_alive'] = len(self._all)
+            stats['drivers_idle'] = len(self._idle)
+        return stats
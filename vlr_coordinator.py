@@ -0,0 +1,523 @@
+"""
+Lease-based job table so scrape workers on many machines can share one backlog
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from vlr_incremental import match_id_from_url
+
+
+JOB_STATES = ('pending', 'leased', 'ingesting', 'ingested', 'failed')
+
+# Current time in epoch seconds from the database clock (one clock for every host)
+_NOW_SQL = {
+    'sqlite': "((julianday('now') - 2440587.5) * 86400.0)",
+    'sqlserver': "(DATEDIFF_BIG(millisecond, '19700101', SYSUTCDATETIME()) / 1000.0)",
+}
+
+_CREATE_SQL = {
+    'sqlite': [
+        """CREATE TABLE IF NOT EXISTS ScrapeJobs (
+               url TEXT PRIMARY KEY,
+               match_id INTEGER,
+               state TEXT NOT NULL DEFAULT 'pending',
+               owner TEXT,
+               lease_token INTEGER NOT NULL DEFAULT 0,
+               lease_expires REAL,
+               attempts INTEGER NOT NULL DEFAULT 0,
+               needs_replace INTEGER NOT NULL DEFAULT 0,
+               last_error TEXT,
+               updated_at REAL
+           )""",
+        "CREATE INDEX IF NOT EXISTS IX_ScrapeJobs_state ON ScrapeJobs(state, match_id)",
+    ],
+    'sqlserver': [
+        """IF OBJECT_ID('dbo.ScrapeJobs', 'U') IS NULL
+           CREATE TABLE dbo.ScrapeJobs (
+               url NVARCHAR(400) NOT NULL PRIMARY KEY,
+               match_id INT NULL,
+               state VARCHAR(16) NOT NULL DEFAULT 'pending',
+               owner NVARCHAR(200) NULL,
+               lease_token BIGINT NOT NULL DEFAULT 0,
+               lease_expires FLOAT NULL,
+               attempts INT NOT NULL DEFAULT 0,
+               needs_replace BIT NOT NULL DEFAULT 0,
+               last_error NVARCHAR(1000) NULL,
+               updated_at FLOAT NULL
+           )""",
+        """IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ScrapeJobs_state')
+           CREATE INDEX IX_ScrapeJobs_state ON dbo.ScrapeJobs(state, match_id)""",
+    ],
+}
+
+
+class Lease(NamedTuple):
+    """A claimed job. `token` fences out holders of older leases on the same URL."""
+    url: str
+    token: int
+    replace: bool  # an earlier holder may have written part of the match
+
+
+class LeaseLost(Exception):
+    """The lease was taken over (or already finished) by another worker; nothing was written"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobCoordinator:
+    """
+    Shared table of match URLs that workers claim with time-limited leases.
+
+    A job is pending until a worker claims it, which leases it to that worker
+    for `lease_seconds` and bumps its fencing token. The worker heartbeats
+    while scraping and calls begin_ingest() right before writing to the
+    database (refused if the lease was lost). The write itself goes inside
+    fenced(): one transaction, on a connection to the job table's database,
+    that first completes the lease (holding its row lock) and then commits
+    the match together with the completion. A worker whose lease was taken
+    over writes nothing, and nobody can take a lease over while its match
+    is being written, so every match is written exactly once.
+
+    Leases that expire (crashed or partitioned worker) are claimable again;
+    a job that expired while ingesting is handed out with replace=True.
+    When the matches live in another database (e.g. a SQLite job table),
+    the write and complete() cannot share a transaction; a crash between
+    them re-runs the match with replace=True, which overwrites it.
+
+    Backed by SQL Server (shared by every host) or SQLite (one machine, tests).
+    All times come from the database clock.
+    """
+
+    def __init__(self, conn, dialect: str = 'sqlite', lease_seconds: float = 300,
+                 max_attempts: int = 3):
+        """
+        Args:
+            conn: DB-API connection (sqlite3 in autocommit mode, or pyodbc)
+            dialect: 'sqlite' or 'sqlserver'
+            lease_seconds: How long a claim or heartbeat keeps a job
+            max_attempts: Claims per job before it is left as failed
+        """
+        if dialect not in _NOW_SQL:
+            raise ValueError(f"Unknown dialect: {dialect}")
+        self.conn = conn
+        self.dialect = dialect
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._now = _NOW_SQL[dialect]
+        self._lock = threading.Lock()
+        with self._lock:
+            for statement in _CREATE_SQL[dialect]:
+                self._execute(statement)
+            self._commit()
+
+    @classmethod
+    def sqlite(cls, path: str = 'vlr_jobs.sqlite', **kwargs) -> 'JobCoordinator':
+        """Coordinator on a local SQLite file (workers on this machine only)"""
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return cls(conn, 'sqlite', **kwargs)
+
+    @classmethod
+    def sql_server(cls, conn, **kwargs) -> 'JobCoordinator':
+        """Coordinator on a pyodbc SQL Server connection (e.g. connect_db().conn)"""
+        return cls(conn, 'sqlserver', **kwargs)
+
+    # --- Low-level helpers (call with self._lock held) ---
+
+    def _execute(self, sql: str, params=()):
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return cursor
+
+    def _commit(self):
+        if self.dialect == 'sqlserver':
+            self.conn.commit()
+
+    def _update(self, sql: str, params) -> bool:
+        """Run a fenced single-row UPDATE; True if it matched"""
+        with self._lock:
+            matched = self._execute(sql, params).rowcount == 1
+            self._commit()
+        return matched
+
+    # --- Queue ---
+
+    def add_urls(self, urls: Iterable[str]) -> int:
+        """Enqueue match URLs; ones already in the table are left alone. Returns how many were new."""
+        added = 0
+        with self._lock:
+            for url in urls:
+                if self.dialect == 'sqlite':
+                    sql = ("INSERT OR IGNORE INTO ScrapeJobs (url, match_id, updated_at) "
+                           f"VALUES (?, ?, {self._now})")
+                    params = (url, match_id_from_url(url))
+                else:
+                    sql = ("INSERT INTO ScrapeJobs (url, match_id, updated_at) "
+                           f"SELECT ?, ?, {self._now} "
+                           "WHERE NOT EXISTS (SELECT 1 FROM ScrapeJobs WITH (UPDLOCK, HOLDLOCK) WHERE url = ?)")
+                    params = (url, match_id_from_url(url), url)
+                added += max(0, self._execute(sql, params).rowcount)
+            self._commit()
+        return added
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[Lease]:
+        """
+        Lease up to `limit` jobs (newest matches first): pending ones and ones
+        whose lease expired
+        """
+        claimable = (f"attempts < ? AND (state = 'pending' OR "
+                     f"(state IN ('leased', 'ingesting') AND lease_expires < {self._now}))")
+        assignments = (f"needs_replace = CASE WHEN state = 'ingesting' THEN 1 ELSE needs_replace END, "
+                       f"state = 'leased', owner = ?, lease_token = lease_token + 1, "
+                       f"lease_expires = {self._now} + ?, attempts = attempts + 1, updated_at = {self._now}")
+
+        with self._lock:
+            if self.dialect == 'sqlserver':
+                # READPAST lets concurrent claimers skip each other's locked rows
+                rows = self._execute(
+                    f"WITH next AS (SELECT TOP (?) * FROM ScrapeJobs WITH (UPDLOCK, READPAST, ROWLOCK) "
+                    f"WHERE {claimable} ORDER BY match_id DESC) "
+                    f"UPDATE next SET {assignments} "
+                    f"OUTPUT inserted.url, inserted.lease_token, inserted.needs_replace",
+                    (limit, self.max_attempts, worker_id, self.lease_seconds)
+                ).fetchall()
+                self.conn.commit()
+            else:
+                # BEGIN IMMEDIATE takes the write lock, so claims never overlap
+                self._execute("BEGIN IMMEDIATE")
+                try:
+                    urls = [row[0] for row in self._execute(
+                        f"SELECT url FROM ScrapeJobs WHERE {claimable} ORDER BY match_id DESC LIMIT ?",
+                        (self.max_attempts, limit)
+                    ).fetchall()]
+                    rows = []
+                    for url in urls:
+                        self._execute(f"UPDATE ScrapeJobs SET {assignments} WHERE url = ?",
+                                      (worker_id, self.lease_seconds, url))
+                        rows.append(self._execute(
+                            "SELECT url, lease_token, needs_replace FROM ScrapeJobs WHERE url = ?", (url,)
+                        ).fetchone())
+                    self._execute("COMMIT")
+                except BaseException:
+                    self._execute("ROLLBACK")
+                    raise
+        return [Lease(url, int(token), bool(replace)) for url, token, replace in rows]
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """Extend a lease; False if it was lost (expired and claimed by someone else)"""
+        return self._update(
+            f"UPDATE ScrapeJobs SET lease_expires = {self._now} + ?, updated_at = {self._now} "
+            "WHERE url = ? AND lease_token = ? AND state IN ('leased', 'ingesting')",
+            (self.lease_seconds, lease.url, lease.token)
+        )
+
+    def begin_ingest(self, lease: Lease) -> bool:
+        """
+        Call right before writing a match. Succeeds only for the current,
+        unexpired lease, so at most one worker ever writes a given token.
+        """
+        return self._update(
+            f"UPDATE ScrapeJobs SET state = 'ingesting', lease_expires = {self._now} + ?, "
+            f"updated_at = {self._now} "
+            f"WHERE url = ? AND lease_token = ? AND state = 'leased' AND lease_expires >= {self._now}",
+            (self.lease_seconds, lease.url, lease.token)
+        )
+
+    def _complete_sql(self) -> str:
+        return (f"UPDATE ScrapeJobs SET state = 'ingested', owner = NULL, needs_replace = 0, "
+                f"last_error = NULL, updated_at = {self._now} "
+                "WHERE url = ? AND lease_token = ? AND state = 'ingesting'")
+
+    def complete(self, lease: Lease) -> bool:
+        """Mark an ingested match as done (use fenced() when the write can share the transaction)"""
+        return self._update(self._complete_sql(), (lease.url, lease.token))
+
+    @contextmanager
+    def fenced(self, lease: Lease, conn=None):
+        """
+        Transaction that completes a lease and commits whatever the block
+        writes on `conn` along with it, or rolls both back if the block raises
+        Args:
+            lease: Lease after begin_ingest()
+            conn: Connection to the job table's database that the block writes
+                  through (default: the coordinator's own)
+        Raises:
+            LeaseLost: The lease is no longer current (the block is not run)
+        """
+        conn = self.conn if conn is None else conn
+        # The coordinator's own connection is shared with heartbeats and claims
+        with self._lock if conn is self.conn else nullcontext():
+            cursor = conn.cursor()
+            if self.dialect == 'sqlite':
+                # Takes the write lock up front; other claims wait for the commit
+                cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # The row stays locked until commit, so the lease cannot be claimed meanwhile
+                cursor.execute(self._complete_sql(), (lease.url, lease.token))
+                if cursor.rowcount != 1:
+                    raise LeaseLost(lease.url)
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        """Give a job back after an error; it stays failed once it is out of attempts"""
+        return self._update(
+            "UPDATE ScrapeJobs SET "
+            "needs_replace = CASE WHEN state = 'ingesting' THEN 1 ELSE needs_replace END, "
+            "state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            f"owner = NULL, last_error = ?, updated_at = {self._now} "
+            "WHERE url = ? AND lease_token = ? AND state IN ('leased', 'ingesting')",
+            (self.max_attempts, (error or '')[:1000], lease.url, lease.token)
+        )
+
+    def release(self, lease: Lease) -> bool:
+        """Give back a job that was not worked on (e.g. on shutdown) without using an attempt"""
+        return self._update(
+            f"UPDATE ScrapeJobs SET state = 'pending', owner = NULL, attempts = attempts - 1, "
+            f"updated_at = {self._now} "
+            "WHERE url = ? AND lease_token = ? AND state = 'leased'",
+            (lease.url, lease.token)
+        )
+
+    def requeue_expired(self) -> int:
+        """Return expired leases to pending (or failed once out of attempts). Returns how many."""
+        with self._lock:
+            cursor = self._execute(
+                "UPDATE ScrapeJobs SET "
+                "needs_replace = CASE WHEN state = 'ingesting' THEN 1 ELSE needs_replace END, "
+                "state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                f"owner = NULL, last_error = 'lease expired', updated_at = {self._now} "
+                f"WHERE state IN ('leased', 'ingesting') AND lease_expires < {self._now}",
+                (self.max_attempts,)
+            )
+            self._commit()
+        return max(0, cursor.rowcount)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per state"""
+        with self._lock:
+            rows = self._execute("SELECT state, COUNT(*) FROM ScrapeJobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in JOB_STATES}
+        counts.update({state: count for state, count in rows})
+        return counts
+
+    def failures(self) -> Dict[str, str]:
+        """Last error per failed URL"""
+        with self._lock:
+            rows = self._execute("SELECT url, last_error FROM ScrapeJobs WHERE state = 'failed'").fetchall()
+        return {url: error for url, error in rows}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class LeaseKeeper:
+    """Background thread that heartbeats every lease a worker holds"""
+
+    def __init__(self, coordinator: JobCoordinator, interval: Optional[float] = None):
+        self.coordinator = coordinator
+        self.interval = interval or coordinator.lease_seconds / 3
+        self._leases = {}
+        self._lost = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='vlr-lease-keeper', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+    def hold(self, lease: Lease):
+        with self._lock:
+            self._leases[lease.url] = lease
+
+    def drop(self, lease: Lease):
+        with self._lock:
+            self._leases.pop(lease.url, None)
+            self._lost.discard(lease)
+
+    def lost(self, lease: Lease) -> bool:
+        with self._lock:
+            return lease in self._lost
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                leases = list(self._leases.values())
+            for lease in leases:
+                try:
+                    alive = self.coordinator.heartbeat(lease)
+                except Exception as e:
+                    print(f"  Heartbeat failed for {lease.url}: {e}")
+                    continue
+                if not alive:
+                    with self._lock:
+                        self._lost.add(lease)
+                        self._leases.pop(lease.url, None)
+
+
+def run_worker(coordinator: JobCoordinator, scrape: Callable[[str], Dict],
+               store: Callable[[Dict, bool], None], worker_id: Optional[str] = None,
+               batch: int = 1, poll_seconds: float = 10, exit_when_idle: bool = True,
+               write_conn=None) -> Dict[str, int]:
+    """
+    Claim, scrape and store jobs until the table has nothing left to claim
+    Args:
+        coordinator: Shared job table
+        scrape: scrape(url) -> match_data
+        store: store(match_data, replace) writes one match (replace: overwrite an earlier write)
+        write_conn: Connection `store` writes through, if it is on the job table's
+                    database: the write and the lease completion then commit as one
+                    transaction (see JobCoordinator.fenced). store must not commit on it.
+        worker_id: Name recorded as lease owner (default host:pid)
+        batch: Jobs claimed per round trip
+        poll_seconds: Wait between claims while other workers still hold leases
+        exit_when_idle: Return once nothing is pending or leased (else keep polling)
+    Returns:
+        Counts of ingested, failed and lost (lease taken over) jobs
+    """
+    worker_id = worker_id or default_worker_id()
+    results = {'ingested': 0, 'failed': 0, 'lost': 0}
+
+    with LeaseKeeper(coordinator) as keeper:
+        while True:
+            leases = coordinator.claim(worker_id, batch)
+            if not leases:
+                coordinator.requeue_expired()
+                counts = coordinator.counts()
+                if exit_when_idle and not (counts['pending'] or counts['leased'] or counts['ingesting']):
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            for i, lease in enumerate(leases):
+                keeper.hold(lease)
+                print(f"[{worker_id}] {lease.url.split('/')[-1][:50]}...", end=' ')
+                try:
+                    match_data = scrape(lease.url)
+                    if keeper.lost(lease) or not coordinator.begin_ingest(lease):
+                        raise LeaseLost(lease.url)
+                    if write_conn is not None:
+                        with coordinator.fenced(lease, write_conn):
+                            store(match_data, lease.replace)
+                    else:
+                        store(match_data, lease.replace)
+                        coordinator.complete(lease)
+                    results['ingested'] += 1
+                    print("✓")
+                except LeaseLost:
+                    results['lost'] += 1
+                    print("lease lost, left to its new owner")
+                except KeyboardInterrupt:
+                    for unworked in leases[i:]:
+                        coordinator.release(unworked)
+                    raise
+                except Exception as e:
+                    coordinator.fail(lease, str(e) or e.__class__.__name__)
+                    results['failed'] += 1
+                    print(f"✗ {str(e)[:50]}")
+                finally:
+                    keeper.drop(lease)
+    return results
+
+
+def _open_coordinator(args) -> JobCoordinator:
+    options = {'lease_seconds': args.lease_seconds, 'max_attempts': args.max_attempts}
+    if args.sqlite:
+        return JobCoordinator.sqlite(args.sqlite, **options)
+    from run_scraper_enhanced import connect_db
+    return JobCoordinator.sql_server(connect_db().conn, **options)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared scrape job table for workers on many machines")
+    parser.add_argument('--sqlite', metavar='PATH',
+                        help="Use a local SQLite job table instead of the SQL Server one")
+    parser.add_argument('--lease-seconds', type=float, default=300)
+    parser.add_argument('--max-attempts', type=int, default=3)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="Discover matches on results pages and enqueue them")
+    add.add_argument('start_page', type=int)
+    add.add_argument('end_page', type=int)
+
+    work = commands.add_parser('work', help="Claim and scrape jobs until none are left")
+    work.add_argument('--worker-id', default=None)
+    work.add_argument('--batch', type=int, default=1)
+    work.add_argument('--engine', choices=['static', 'browser'], default=None)
+    work.add_argument('--forever', action='store_true', help="Keep polling for new jobs")
+
+    commands.add_parser('status', help="Show job counts per state")
+    commands.add_parser('requeue', help="Return expired leases to the queue")
+
+    args = parser.parse_args()
+    coordinator = _open_coordinator(args)
+    try:
+        if args.command == 'add':
+            from run_scraper_enhanced import discover_urls
+            urls = discover_urls(args.start_page, args.end_page)
+            print(f"{coordinator.add_urls(urls)} new jobs ({len(urls)} discovered)")
+        elif args.command == 'requeue':
+            print(f"{coordinator.requeue_expired()} expired leases requeued")
+        elif args.command == 'work':
+            import run_scraper_enhanced as runner
+            import vlr_http
+            from vlr_browser_pool import BrowserPool
+            from vlr_rate_limiter import RateLimiter
+
+            # The rate limit applies per worker process
+            vlr_http.configure(cache_dir=runner.HTTP_CACHE_DIR, cache_max_mb=runner.HTTP_CACHE_MAX_MB,
+                               rate_limiter=RateLimiter(runner.REQUESTS_PER_SECOND, burst=runner.REQUEST_BURST))
+            engine = args.engine or runner.SCRAPE_ENGINE
+            db = runner.connect_db()
+
+            def store(match_data, replace):
+                if args.sqlite:
+                    runner.insert_match(db, match_data, replace)
+                    return
+                # Committed by the coordinator together with the lease completion
+                with db.defer_commits():
+                    runner.insert_match(db, match_data, replace)
+
+            pool = BrowserPool(size=1, headless=runner.HEADLESS,
+                               max_pages_per_driver=runner.MAX_PAGES_PER_DRIVER,
+                               max_memory_mb=runner.MAX_DRIVER_MEMORY_MB,
+                               scraper_options={'detail_fetch': runner.DETAIL_FETCH,
+                                                'lean_browser': runner.LEAN_BROWSER,
+                                                'match_tabs': runner.FETCH_MATCH_TABS})
+            try:
+                results = run_worker(
+                    coordinator,
+                    scrape=lambda url: pool.scrape_match(url, engine=engine),
+                    store=store,
+                    worker_id=args.worker_id,
+                    batch=args.batch,
+                    exit_when_idle=not args.forever,
+                    write_conn=None if args.sqlite else db.conn
+                )
+                print(f"\nIngested {results['ingested']}, failed {results['failed']}, "
+                      f"lost {results['lost']} leases")
+            finally:
+                pool.close()
+                db.close()
+        counts = coordinator.counts()
+        print(", ".join(f"{state}: {count}" for state, count in counts.items()))
+    finally:
+        coordinator.close()
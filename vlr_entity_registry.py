@@ -0,0 +1,81 @@
+"""
+Run-scoped memo of team, tournament and player details
+"""
+import re
+import threading
+from typing import Dict, Optional
+
+
+ENTITY_KINDS = ('team', 'tournament', 'player')
+
+# URL path segment used by vlr.gg for each entity kind
+_URL_SEGMENTS = {'team': 'team', 'tournament': 'event', 'player': 'player'}
+
+
+class EntityRegistry:
+    """
+    Remembers details already scraped for teams, tournaments and players so
+    each entity is enriched at most once per run.
+
+    Entries are keyed by entity kind and vlr.gg ID (falling back to the URL).
+    A registry built with EntityRegistry.shared(manager) keeps its entries in
+    multiprocessing.Manager proxies, so every worker process of a pool sees
+    (and fills) the same registry.
+    """
+
+    def __init__(self, store=None, counters=None, lock=None):
+        """
+        Args:
+            store: Mapping for cached details (default: a plain dict)
+            counters: Mapping for hit/miss counters (default: a plain dict)
+            lock: Lock guarding counter updates (default: a threading.Lock)
+        """
+        self._store = store if store is not None else {}
+        self._counters = counters if counters is not None else {}
+        self._lock = lock if lock is not None else threading.Lock()
+
+    @classmethod
+    def shared(cls, manager) -> 'EntityRegistry':
+        """Create a registry that can be passed to worker processes"""
+        return cls(store=manager.dict(), counters=manager.dict(), lock=manager.Lock())
+
+    @staticmethod
+    def make_key(kind: str, url: str) -> str:
+        """Registry key for an entity URL, e.g. 'team:2593'"""
+        segment = _URL_SEGMENTS.get(kind, kind)
+        match = re.search(rf'/{segment}/(\d+)', url or '')
+        if match:
+            return f"{kind}:{match.group(1)}"
+        return f"{kind}:{url}"
+
+    def get(self, kind: str, url: str) -> Optional[Dict]:
+        """Return a copy of the stored details, or None if the entity is new"""
+        details = self._store.get(self.make_key(kind, url))
+        self._count(kind, 'hits' if details is not None else 'misses')
+        return dict(details) if details is not None else None
+
+    def contains(self, kind: str, url: str) -> bool:
+        """Check for an entity without touching the counters"""
+        return self.make_key(kind, url) in self._store
+
+    def put(self, kind: str, url: str, details: Dict):
+        """Store the scraped details for an entity"""
+        self._store[self.make_key(kind, url)] = dict(details)
+
+    def _count(self, kind: str, outcome: str):
+        name = f"{kind}_{outcome}"
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def get_stats(self) -> Dict:
+        """Hits/misses per entity kind plus the total number of fetches saved"""
+        counters = dict(self._counters)
+        stats = {}
+        for kind in ENTITY_KINDS:
+            stats[kind] = {
+                'hits': counters.get(f"{kind}_hits", 0),
+                'misses': counters.get(f"{kind}_misses", 0),
+            }
+        stats['fetches_saved'] = sum(stats[kind]['hits'] for kind in ENTITY_KINDS)
+        stats['entities'] = len(self._store)
+        return stats
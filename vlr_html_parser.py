@@ -0,0 +1,237 @@
+"""
+Pluggable HTML parser backends for the VLR extraction routines
+"""
+import re
+import sys
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401 (only needed by BeautifulSoup's 'lxml' builder)
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+PARSER_BACKENDS = ('html.parser', 'lxml', 'selectolax')
+DEFAULT_BACKEND = 'html.parser'
+
+_SIMPLE_CLASS = re.compile(r'^[\w-]+$')
+
+
+def set_default_backend(backend: str):
+    """Choose the backend used when make_soup() is not given one"""
+    global DEFAULT_BACKEND
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    DEFAULT_BACKEND = backend
+
+
+def available_backends() -> List[str]:
+    """Backends whose libraries are installed"""
+    backends = ['html.parser']
+    if lxml is not None:
+        backends.append('lxml')
+    if LexborHTMLParser is not None:
+        backends.append('selectolax')
+    return backends
+
+
+def make_soup(html: str, backend: Optional[str] = None):
+    """
+    Parse HTML with the chosen backend.
+
+    'html.parser' and 'lxml' return a regular BeautifulSoup object. 'selectolax'
+    returns a SelectolaxNode, which supports the subset of the BeautifulSoup
+    API used by the extraction routines (find, find_all, get, text, get_text,
+    stripped_strings, find_parent).
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'selectolax':
+        if LexborHTMLParser is None:
+            raise ImportError("selectolax is not installed (pip install selectolax)")
+        return SelectolaxNode(LexborHTMLParser(html).root)
+    if backend == 'lxml' and lxml is None:
+        raise ImportError("lxml is not installed (pip install lxml)")
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return BeautifulSoup(html, backend)
+
+
+class SelectolaxNode:
+    """BeautifulSoup-style wrapper around a selectolax (lexbor) node"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        return isinstance(other, SelectolaxNode) and self._node.mem_id == other._node.mem_id
+
+    def __hash__(self):
+        return hash(self._node.mem_id)
+
+    def __repr__(self):
+        return f"<SelectolaxNode {self._node.tag}>"
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    # --- Attributes ---
+
+    def get(self, key: str, default=None):
+        """Attribute value; 'class' is returned as a list like BeautifulSoup does"""
+        attributes = self._node.attributes
+        if key not in attributes:
+            return default
+        value = attributes[key]
+        if value is None:
+            value = ''
+        if key == 'class':
+            return value.split()
+        return value
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    # --- Text ---
+
+    def _strings(self):
+        for node in self._node.traverse(include_text=True):
+            if node.tag == '-text':
+                yield node.text_content or ''
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._strings())
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        strings = self._strings()
+        if strip:
+            strings = (s.strip() for s in strings)
+            strings = (s for s in strings if s)
+        return separator.join(strings)
+
+    @property
+    def stripped_strings(self):
+        for string in self._strings():
+            string = string.strip()
+            if string:
+                yield string
+
+    # --- Navigation ---
+
+    def find_parent(self, name: Optional[str] = None):
+        parent = self._node.parent
+        while parent is not None and parent.tag != '-document':
+            if name is None or parent.tag == name:
+                return SelectolaxNode(parent)
+            parent = parent.parent
+        return None
+
+    def find(self, name: Optional[str] = None, class_=None, **attrs):
+        results = self._search(name, class_, attrs, limit=1)
+        return results[0] if results else None
+
+    def find_all(self, name: Optional[str] = None, class_=None, limit: Optional[int] = None, **attrs):
+        return self._search(name, class_, attrs, limit=limit)
+
+    def _search(self, name, class_, attrs: Dict, limit: Optional[int]):
+        """Descendant search: CSS for tag/class/presence, Python for everything else"""
+        selector = name or '*'
+        filters = {}
+
+        if isinstance(class_, str) and _SIMPLE_CLASS.match(class_):
+            selector += f'.{class_}'
+        elif class_ is not None:
+            filters['class'] = class_
+
+        for key, value in attrs.items():
+            if value is True:
+                selector += f'[{key}]'
+            else:
+                filters[key] = value
+
+        own_id = self._node.mem_id
+        results = []
+        for node in self._node.css(selector):
+            if node.mem_id == own_id:
+                continue
+            wrapped = SelectolaxNode(node)
+            if filters and not all(_match_attr(wrapped, key, value) for key, value in filters.items()):
+                continue
+            results.append(wrapped)
+            if limit and len(results) >= limit:
+                break
+        return results
+
+
+def _match_attr(node: SelectolaxNode, key: str, expected) -> bool:
+    """BeautifulSoup attribute matching rules (string, regex, callable, None)"""
+    value = node.get(key)
+    if key == 'class' and value is not None:
+        candidates = value + [' '.join(value)]
+    else:
+        candidates = [value]
+
+    for candidate in candidates:
+        if expected is None:
+            if candidate is None:
+                return True
+        elif callable(expected) and not hasattr(expected, 'search'):
+            if expected(candidate):
+                return True
+        elif candidate is None:
+            continue
+        elif hasattr(expected, 'search'):
+            if expected.search(candidate):
+                return True
+        elif candidate == expected:
+            return True
+    return False
+
+
+def compare_backends(html: str, match_url: str = '', backends: Optional[List[str]] = None) -> Dict[str, bool]:
+    """
+    Parse a saved match page with every backend and check the results match
+    the 'html.parser' reference exactly
+    Returns:
+        {backend: identical?}
+    """
+    from vlr_scraper_enhanced import VLRScraper
+
+    backends = backends or available_backends()
+
+    def parse(backend):
+        scraper = VLRScraper(start_driver=False, detail_fetch='none', parser_backend=backend)
+        match_data = scraper.parse_match_html(match_url, html)
+        match_data.pop('stage_timings', None)
+        return match_data
+
+    reference = parse('html.parser')
+    return {backend: parse(backend) == reference for backend in backends}
+
+
+if __name__ == "__main__":
+    # Usage: python vlr_html_parser.py saved_match_page.html [...]
+    all_identical = True
+    for path in sys.argv[1:]:
+        with open(path, encoding='utf-8') as f:
+            results = compare_backends(f.read())
+        for backend, identical in results.items():
+            print(f"{path}: {backend:12} {'identical' if identical else 'DIFFERENT'}")
+            all_identical = all_identical and identical
+    sys.exit(0 if all_identical else 1)
@@ -0,0 +1,188 @@
+"""
+Shared HTTP layer for the static vlr.gg fetchers
+"""
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from vlr_archive import HTMLArchive
+from vlr_http_cache import CacheEntry, HTTPDiskCache
+from vlr_rate_limiter import THROTTLE_STATUSES, RateLimiter
+from vlr_session import SessionManager
+
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# Extra attempts for a request answered with 429/503 (after the limiter's backoff)
+MAX_THROTTLE_RETRIES = 3
+
+
+class ArchiveMiss(requests.RequestException):
+    """Raised in offline mode for a page that is not in the archive"""
+
+
+# Process-wide cache, archive and rate limiter, set by configure()
+_cache: Optional[HTTPDiskCache] = None
+_archive: Optional[HTMLArchive] = None
+_limiter: Optional[RateLimiter] = None
+_session: Optional[SessionManager] = None
+_offline = False
+
+
+def configure(cache_dir: Optional[str] = None, cache_max_mb: int = 500,
+              cache_ttls: Optional[Dict[str, int]] = None,
+              archive_path: Optional[str] = None, offline: bool = False,
+              rate_limiter: Optional[RateLimiter] = None):
+    """
+    Configure the HTTP layer for this process
+    Args:
+        cache_dir: Directory for the persistent page cache (None disables caching)
+        cache_max_mb: Cache size limit in MB
+        cache_ttls: Per page type TTL overrides in seconds
+        archive_path: SQLite file that keeps every fetched page (None disables archiving)
+        offline: Serve every page from the archive and never touch the network
+        rate_limiter: Limiter every request to vlr.gg waits on (None: no limit).
+                      Pass the same RateLimiter to every worker process to share it.
+    """
+    global _cache, _archive, _limiter, _session, _offline
+    if _session is not None:
+        _session.close()
+        _session = None
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+    if _archive is not None:
+        _archive.close()
+        _archive = None
+    if offline and not archive_path:
+        raise ValueError("offline mode needs an archive_path")
+    _offline = offline
+    _limiter = rate_limiter
+    if cache_dir and not offline:
+        _cache = HTTPDiskCache(cache_dir, max_bytes=cache_max_mb * 1024 * 1024, ttls=cache_ttls)
+    if archive_path:
+        _archive = HTMLArchive(archive_path)
+
+
+def get_cache() -> Optional[HTTPDiskCache]:
+    """Return the configured page cache, if any"""
+    return _cache
+
+
+def get_archive() -> Optional[HTMLArchive]:
+    """Return the configured HTML archive, if any"""
+    return _archive
+
+
+def get_session() -> SessionManager:
+    """This process's pooled HTTP session (created on first use)"""
+    global _session
+    if _session is None:
+        _session = SessionManager(HTTP_HEADERS)
+    return _session
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the configured rate limiter, if any"""
+    return _limiter
+
+
+def wait_for_slot():
+    """Wait for the rate limiter before a request made outside this module (e.g. driver.get)"""
+    if _limiter is not None:
+        _limiter.acquire()
+
+
+def record_status(status_code: int, retry_after=None):
+    """Report a response status to the rate limiter so it can adapt"""
+    if _limiter is not None:
+        _limiter.record(status_code, retry_after)
+
+
+def archive_page(url: str, html: str):
+    """Keep a page in the archive (no-op when archiving is off or the page is unchanged)"""
+    if _archive is not None and not _offline and html:
+        _archive.save(url, html)
+
+
+def prepare_request(url: str, headers: Optional[Dict] = None) -> Tuple[Optional[CacheEntry], Dict]:
+    """
+    Look a URL up in the cache and build the request headers
+    Returns:
+        (cache entry or None, per-request headers on top of HTTP_HEADERS).
+        A fresh entry means no request is needed.
+    Raises:
+        ArchiveMiss in offline mode for pages that were never archived
+    """
+    request_headers = dict(headers or {})
+
+    if _offline:
+        body = _archive.latest(url)
+        if body is None:
+            raise ArchiveMiss(f"{url} is not in the archive")
+        return CacheEntry(url, body, None, None, 0.0, fresh=True), request_headers
+
+    entry = _cache.lookup(url) if _cache is not None else None
+    if entry is not None and entry.fresh:
+        archive_page(url, entry.body)
+    elif entry is not None:
+        request_headers.update(_cache.conditional_headers(entry))
+    return entry, request_headers
+
+
+def finish_response(url: str, entry: Optional[CacheEntry], status_code: int,
+                    response_headers, text: str) -> str:
+    """Turn a response into page HTML, using/updating the cache as needed"""
+    if status_code == 304 and entry is not None:
+        _cache.refresh(url, response_headers)
+        archive_page(url, entry.body)
+        return entry.body
+    if status_code == 200:
+        if _cache is not None:
+            _cache.store(url, text, response_headers)
+        archive_page(url, text)
+    return text
+
+
+def fetch_html(url: str, timeout: float = 10, headers: Optional[Dict] = None) -> str:
+    """
+    GET a vlr.gg page and return its HTML, served from the cache when fresh
+    Raises:
+        requests.HTTPError for error responses
+    """
+    entry, request_headers = prepare_request(url, headers)
+    if entry is not None and entry.fresh:
+        return entry.body
+
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        wait_for_slot()
+        response = get_session().get(url, headers=request_headers, timeout=timeout)
+        record_status(response.status_code, response.headers.get('Retry-After'))
+        if response.status_code not in THROTTLE_STATUSES:
+            break
+        if attempt < MAX_THROTTLE_RETRIES:
+            print(f"    Throttled ({response.status_code}) on {url}, backing off")
+
+    if response.status_code != 304:
+        response.raise_for_status()
+    return finish_response(url, entry, response.status_code, response.headers, response.text)
+
+
+def get_stats() -> Dict:
+    """HTTP layer statistics for this process"""
+    stats = {}
+    if _cache is not None:
+        stats['cache'] = _cache.get_stats()
+    if _archive is not None:
+        stats['archive'] = _archive.get_stats()
+    if _limiter is not None:
+        stats['rate_limiter'] = _limiter.get_stats()
+    if _session is not None:
+        stats['session'] = _session.get_stats()
+    return stats
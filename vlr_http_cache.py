@@ -0,0 +1,252 @@
+"""
+Persistent on-disk HTTP cache for vlr.gg pages
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from typing import Dict, Optional
+
+
+# How long a cached page is served without asking the server again (seconds)
+DEFAULT_TTLS = {
+    'team': 7 * 24 * 3600,
+    'event': 24 * 3600,
+    'player': 3 * 24 * 3600,
+    'match': 3600,
+    'match_tab': 3600,
+    'results': 10 * 60,
+    'other': 3600,
+}
+
+COUNTER_NAMES = ('hits', 'misses', 'stale', 'revalidated', 'stores', 'evictions')
+
+
+def classify_url(url: str) -> str:
+    """Map a vlr.gg URL to the page type used for its TTL"""
+    path = re.sub(r'^https?://[^/]+', '', url)
+    if path.startswith('/team/'):
+        return 'team'
+    if path.startswith('/event/'):
+        return 'event'
+    if path.startswith('/player/'):
+        return 'player'
+    if path.startswith('/matches/results'):
+        return 'results'
+    if re.match(r'^/\d+/', path):
+        return 'match_tab' if 'tab=' in path else 'match'
+    return 'other'
+
+
+class CacheEntry:
+    """A cached page plus the validators needed to revalidate it"""
+
+    def __init__(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str],
+                 fetched_at: float, fresh: bool):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.fresh = fresh
+
+
+class HTTPDiskCache:
+    """
+    Content-addressed page cache that survives across runs.
+
+    Bodies are stored zlib-compressed under objects/ named by the SHA-256 of
+    their content; a SQLite index maps each URL to its body, validators
+    (ETag / Last-Modified), fetch time and last access. Entries younger than
+    their page type's TTL are served directly; older ones are revalidated with
+    a conditional request. The least recently used entries are evicted once
+    the stored bodies exceed max_bytes. Hit/miss counters are kept both for
+    this process and cumulatively in the index.
+    """
+
+    def __init__(self, directory: str = '.vlr_cache', max_bytes: int = 500 * 1024 * 1024,
+                 ttls: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Maximum total size of stored (compressed) bodies
+            ttls: Per page type TTL overrides in seconds (see DEFAULT_TTLS)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+
+        self._objects_dir = os.path.join(directory, 'objects')
+        os.makedirs(self._objects_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.sqlite'),
+                                     timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                   url TEXT PRIMARY KEY,
+                   body_hash TEXT NOT NULL,
+                   size INTEGER NOT NULL,
+                   etag TEXT,
+                   last_modified TEXT,
+                   page_type TEXT,
+                   fetched_at REAL NOT NULL,
+                   last_access REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.executemany("INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                               [(name,) for name in COUNTER_NAMES])
+        self._conn.commit()
+
+        self.stats = {name: 0 for name in COUNTER_NAMES}
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for a URL (fresh or stale), or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body_hash, etag, last_modified, page_type, fetched_at FROM entries WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if not row:
+                self._count('misses')
+                return None
+
+            body_hash, etag, last_modified, page_type, fetched_at = row
+            body = self._read_object(body_hash)
+            if body is None:
+                # Object file was removed behind our back
+                self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._count('misses')
+                return None
+
+            fresh = time.time() - fetched_at < self.ttls.get(page_type, self.ttls['other'])
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._count('hits' if fresh else 'stale')
+            self._conn.commit()
+
+        return CacheEntry(url, body, etag, last_modified, fetched_at, fresh)
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> Dict[str, str]:
+        """Headers that turn a request into a revalidation of a stale entry"""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        elif not entry.etag:
+            headers['If-Modified-Since'] = formatdate(entry.fetched_at, usegmt=True)
+        return headers
+
+    def refresh(self, url: str, response_headers=None):
+        """Mark a stale entry fresh again after a 304 Not Modified"""
+        response_headers = response_headers or {}
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                """UPDATE entries
+                   SET fetched_at = ?, last_access = ?,
+                       etag = COALESCE(?, etag),
+                       last_modified = COALESCE(?, last_modified)
+                   WHERE url = ?""",
+                (now, now, response_headers.get('ETag'), response_headers.get('Last-Modified'), url)
+            )
+            self._count('revalidated')
+            self._conn.commit()
+
+    def store(self, url: str, body: str, response_headers=None):
+        """Save a freshly downloaded page and evict old entries if over budget"""
+        response_headers = response_headers or {}
+        data = body.encode('utf-8')
+        body_hash = hashlib.sha256(data).hexdigest()
+        compressed = zlib.compress(data, 6)
+
+        path = self._object_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            now = time.time()
+            old = self._conn.execute("SELECT body_hash FROM entries WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                """INSERT OR REPLACE INTO entries
+                   (url, body_hash, size, etag, last_modified, page_type, fetched_at, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (url, body_hash, len(compressed), response_headers.get('ETag'),
+                 response_headers.get('Last-Modified'), classify_url(url), now, now)
+            )
+            if old and old[0] != body_hash:
+                self._delete_object_if_unused(old[0])
+            self._count('stores')
+            self._evict()
+            self._conn.commit()
+
+    def get_stats(self) -> Dict:
+        """Counters for this process, cumulative counters and current size"""
+        with self._lock:
+            lifetime = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        stats = dict(self.stats)
+        stats['lifetime'] = lifetime
+        stats['entries'] = entries
+        stats['bytes'] = total_bytes
+        return stats
+
+    def close(self):
+        """Close the index database"""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes (lock held)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT url, body_hash, size FROM entries ORDER BY last_access").fetchall()
+        for url, body_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._delete_object_if_unused(body_hash)
+            total -= size
+            self._count('evictions')
+
+    def _count(self, name: str):
+        """Bump a counter in memory and in the index (lock held)"""
+        self.stats[name] += 1
+        self._conn.execute("UPDATE counters SET value = value + 1 WHERE name = ?", (name,))
+
+    def _object_path(self, body_hash: str) -> str:
+        return os.path.join(self._objects_dir, body_hash[:2], body_hash[2:])
+
+    def _read_object(self, body_hash: str) -> Optional[str]:
+        try:
+            with open(self._object_path(body_hash), 'rb') as f:
+                return zlib.decompress(f.read()).decode('utf-8')
+        except (OSError, zlib.error):
+            return None
+
+    def _delete_object_if_unused(self, body_hash: str):
+        """Remove a body file once no URL points at it (lock held)"""
+        in_use = self._conn.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+        if not in_use:
+            try:
+                os.remove(self._object_path(body_hash))
+            except OSError:
+                pass
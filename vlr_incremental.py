@@ -0,0 +1,90 @@
+"""
+Persisted set of ingested vlr.gg match IDs for incremental runs
+"""
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional, Set
+
+
+def match_id_from_url(url: str) -> Optional[int]:
+    """vlr.gg match ID from a match URL, e.g. https://www.vlr.gg/295620/a-vs-b -> 295620"""
+    match = re.match(r'^(?:https?://[^/]+)?/(\d+)(?:/|$)', url or '')
+    return int(match.group(1)) if match else None
+
+
+class IngestedMatches:
+    """
+    Match IDs that have already been written to the database.
+
+    Stored in a small SQLite file next to the runner so an update run can
+    check a whole results page against it in one query and stop paging once
+    it reaches matches it has already ingested.
+    """
+
+    # SQLite's default limit on host parameters per statement is 999
+    _CHUNK = 500
+
+    def __init__(self, path: str = 'vlr_ingested.sqlite'):
+        """
+        Args:
+            path: SQLite file holding the IDs (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS ingested (
+                   match_id INTEGER PRIMARY KEY,
+                   url TEXT,
+                   ingested_at REAL NOT NULL
+               )"""
+        )
+        self._conn.commit()
+
+    def known_ids(self, match_ids: Iterable[int]) -> Set[int]:
+        """The subset of match_ids that is already ingested (bulk lookup)"""
+        match_ids = list(set(match_ids))
+        known = set()
+        with self._lock:
+            for i in range(0, len(match_ids), self._CHUNK):
+                chunk = match_ids[i:i + self._CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT match_id FROM ingested WHERE match_id IN ({placeholders})", chunk
+                ).fetchall()
+                known.update(row[0] for row in rows)
+        return known
+
+    def is_known(self, url: str) -> bool:
+        """Check one match URL"""
+        match_id = match_id_from_url(url)
+        return match_id is not None and bool(self.known_ids([match_id]))
+
+    def mark(self, url: str):
+        """Record a match as ingested"""
+        match_id = match_id_from_url(url)
+        if match_id is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingested (match_id, url, ingested_at) VALUES (?, ?, ?)",
+                (match_id, url, time.time())
+            )
+            self._conn.commit()
+
+    def watermark(self) -> Optional[int]:
+        """Highest ingested match ID (vlr.gg IDs grow over time)"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(match_id) FROM ingested").fetchone()
+        return row[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ingested").fetchone()[0]
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
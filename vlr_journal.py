@@ -0,0 +1,180 @@
+"""
+Durable job journal so interrupted scrape runs can be resumed
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from vlr_incremental import match_id_from_url
+
+
+JOB_STATES = ('pending', 'scraped', 'ingested', 'failed')
+
+
+class JobJournal:
+    """
+    Records every discovered match URL and how far it got.
+
+    Jobs move pending -> scraped -> ingested, or to failed with the error
+    and an attempt count. A job keeps its state across runs, so a new run
+    over the same pages skips finished matches, and --resume continues the
+    last unfinished run from the URLs it had left. Stored in SQLite; safe to
+    use from the writer threads of the ingest pipeline.
+    """
+
+    def __init__(self, path: str = 'vlr_journal.sqlite'):
+        """
+        Args:
+            path: SQLite file holding the journal (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS runs (
+                   run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   start_page INTEGER,
+                   end_page INTEGER,
+                   status TEXT NOT NULL,
+                   started_at REAL NOT NULL,
+                   finished_at REAL
+               )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                   url TEXT PRIMARY KEY,
+                   match_id INTEGER,
+                   run_id INTEGER NOT NULL,
+                   state TEXT NOT NULL,
+                   attempts INTEGER NOT NULL DEFAULT 0,
+                   last_error TEXT,
+                   discovered_at REAL NOT NULL,
+                   updated_at REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_run_state ON jobs(run_id, state)")
+        self._conn.commit()
+
+    # --- Runs ---
+
+    def start_run(self, start_page: Optional[int], end_page: Optional[int]) -> int:
+        """Open a new run and return its ID"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (start_page, end_page, status, started_at) VALUES (?, ?, 'running', ?)",
+                (start_page, end_page, time.time())
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def latest_unfinished_run(self) -> Optional[Dict]:
+        """The most recent run that did not finish, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, start_page, end_page, started_at FROM runs "
+                "WHERE status != 'finished' ORDER BY run_id DESC LIMIT 1"
+            ).fetchone()
+        if not row:
+            return None
+        return {'run_id': row[0], 'start_page': row[1], 'end_page': row[2], 'started_at': row[3]}
+
+    def finish_run(self, run_id: int, max_attempts: int):
+        """Close a run as 'finished' if nothing is left to do, else 'incomplete'"""
+        remaining = len(self.pending(run_id)) + len(self.retryable(run_id, max_attempts))
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                ('incomplete' if remaining else 'finished', time.time(), run_id)
+            )
+            self._conn.commit()
+
+    # --- Jobs ---
+
+    def add_urls(self, run_id: int, urls: List[str]) -> int:
+        """
+        Attach discovered URLs to a run. New URLs start as pending; unfinished
+        ones from earlier runs move to this run (failed ones get fresh
+        attempts); ingested ones are left alone.
+        Returns:
+            Number of URLs that still need work
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (url, match_id, run_id, state, discovered_at, updated_at) "
+                "VALUES (?, ?, ?, 'pending', ?, ?)",
+                [(url, match_id_from_url(url), run_id, now, now) for url in urls]
+            )
+            self._conn.executemany(
+                "UPDATE jobs SET run_id = ?, state = 'pending', attempts = 0 "
+                "WHERE url = ? AND run_id != ? AND state != 'ingested'",
+                [(run_id, url, run_id) for url in urls]
+            )
+            self._conn.commit()
+        return len(self.pending(run_id))
+
+    def mark_scraped(self, url: str):
+        self._set_state(url, 'scraped')
+
+    def mark_ingested(self, url: str):
+        self._set_state(url, 'ingested')
+
+    def mark_failed(self, url: str, reason: str):
+        self._set_state(url, 'failed', reason)
+
+    def _set_state(self, url: str, state: str, error: Optional[str] = None):
+        """
+        Move a job to a new state. Only a failure counts as an attempt, so a
+        match that fails at insert uses the same share of the retry budget as
+        one that fails to scrape.
+        """
+        attempt = 1 if state == 'failed' else 0
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + ?, last_error = ?, updated_at = ? WHERE url = ?",
+                (state, attempt, error, time.time(), url)
+            )
+            self._conn.commit()
+
+    def pending(self, run_id: int) -> List[str]:
+        """URLs of a run that were never finished (scraped but not stored counts as unfinished)"""
+        return self._urls(
+            "SELECT url FROM jobs WHERE run_id = ? AND state IN ('pending', 'scraped') ORDER BY match_id DESC",
+            (run_id,)
+        )
+
+    def retryable(self, run_id: int, max_attempts: int = 3) -> List[str]:
+        """Failed URLs of a run that have attempts left"""
+        return self._urls(
+            "SELECT url FROM jobs WHERE run_id = ? AND state = 'failed' AND attempts < ? ORDER BY match_id DESC",
+            (run_id, max_attempts)
+        )
+
+    def failures(self, run_id: int) -> Dict[str, str]:
+        """Last error per failed URL of a run"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, last_error FROM jobs WHERE run_id = ? AND state = 'failed'", (run_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def counts(self, run_id: int) -> Dict[str, int]:
+        """Number of jobs per state for a run"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY state", (run_id,)
+            ).fetchall()
+        counts = {state: 0 for state in JOB_STATES}
+        counts.update(dict(rows))
+        return counts
+
+    def _urls(self, sql: str, params) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params).fetchall()]
+
+    def close(self):
+        """Close the journal database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,150 @@
+"""
+Lean Firefox profile for browser scraping: no images, ads, trackers or animations
+"""
+import multiprocessing
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+# Hosts the browser may still reach in lean mode (subdomains included)
+LEAN_ALLOWED_HOSTS = ('vlr.gg',)
+
+# Persistent disk cache for first-party CSS/JS, one subdirectory per browser
+LEAN_CACHE_DIR = '.vlr_browser_cache'
+LEAN_CACHE_MB = 256
+
+# Everything else is sent to a closed local port, so it fails at once
+_BLACKHOLE = 'PROXY 127.0.0.1:9'
+
+
+def blocking_pac(allowed_hosts: Iterable[str] = LEAN_ALLOWED_HOSTS) -> str:
+    """
+    Proxy auto-config (as a data: URL) that lets the allowed hosts and
+    localhost through and blackholes every third-party request
+    """
+    checks = ' || '.join(
+        f'host == "{host}" || dnsDomainIs(host, ".{host}")' for host in allowed_hosts
+    ) or 'false'
+    pac = (
+        'function FindProxyForURL(url, host) {'
+        f' if ({checks}) return "DIRECT";'
+        ' if (isPlainHostName(host) || host == "127.0.0.1") return "DIRECT";'
+        f' return "{_BLACKHOLE}";'
+        ' }'
+    )
+    return 'data:application/x-ns-proxy-autoconfig,' + quote(pac)
+
+
+def lean_preferences(cache_dir: Optional[str] = None,
+                     allowed_hosts: Iterable[str] = LEAN_ALLOWED_HOSTS) -> Dict:
+    """Firefox preferences for lean mode"""
+    prefs = {
+        # Third-party requests (ads, analytics, embeds) go nowhere
+        'network.proxy.type': 2,
+        'network.proxy.autoconfig_url': blocking_pac(allowed_hosts),
+        'privacy.trackingprotection.enabled': True,
+        # No images, media, web fonts or animations
+        'permissions.default.image': 2,
+        'media.autoplay.default': 5,
+        'media.autoplay.blocking_policy': 2,
+        'media.mediasource.enabled': False,
+        'gfx.downloadable_fonts.enabled': False,
+        'browser.display.use_document_fonts': 0,
+        'image.animation_mode': 'none',
+        'ui.prefersReducedMotion': 1,
+        'toolkit.cosmeticAnimations.enabled': False,
+        # No speculative connections or prefetching
+        'network.prefetch-next': False,
+        'network.dns.disablePrefetch': True,
+        'network.http.speculative-parallel-limit': 0,
+        'browser.urlbar.speculativeConnect.enabled': False,
+        # Fewer content processes and no back/forward page cache (lower RSS)
+        'fission.autostart': False,
+        'dom.ipc.processCount': 1,
+        'browser.sessionhistory.max_total_viewers': 0,
+        'browser.sessionstore.resume_from_crash': False,
+        'extensions.pocket.enabled': False,
+    }
+    if cache_dir:
+        prefs.update({
+            'browser.cache.disk.enable': True,
+            'browser.cache.disk.parent_directory': os.path.abspath(cache_dir),
+            'browser.cache.disk.capacity': LEAN_CACHE_MB * 1024,
+            'browser.cache.disk.smart_size.enabled': False,
+        })
+    return prefs
+
+
+def browser_cache_dir(slot: int = 0) -> str:
+    """
+    Disk cache directory for one browser. Named after the process and pool
+    slot, so concurrent browsers never share a cache but a new run reuses it.
+    """
+    return os.path.join(LEAN_CACHE_DIR, f"{multiprocessing.current_process().name}-{slot}")
+
+
+def apply_lean_options(firefox_options, cache_dir: Optional[str] = None):
+    """Switch a selenium Firefox Options object to lean mode (eager page loads included)"""
+    firefox_options.page_load_strategy = 'eager'
+    for name, value in lean_preferences(cache_dir).items():
+        firefox_options.set_preference(name, value)
+    return firefox_options
+
+
+def benchmark_page_load(urls: List[str], headless: bool = True, runs: int = 1) -> Dict[str, Dict]:
+    """
+    Load match pages with the default and the lean profile and compare
+    Args:
+        urls: Match pages to load (each loaded `runs` times per profile)
+        headless: Run Firefox without a visible window
+        runs: Passes over the URLs
+    Returns:
+        {'default'|'lean': {'pages', 'mean_ready', 'p50_ready', 'p95_ready', 'rss_mb'}}
+        with page-ready times (navigation until the match header exists) in seconds
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    from vlr_browser_pool import BrowserPool
+    from vlr_profiling import percentile
+    from vlr_scraper_enhanced import VLRScraper
+
+    results = {}
+    for mode in ('default', 'lean'):
+        driver = VLRScraper.build_driver(headless, lean=(mode == 'lean'))
+        times = []
+        try:
+            for _ in range(runs):
+                for url in urls:
+                    start = time.perf_counter()
+                    driver.get(url)
+                    WebDriverWait(driver, 30).until(
+                        EC.presence_of_element_located((By.CLASS_NAME, "match-header"))
+                    )
+                    times.append(time.perf_counter() - start)
+            rss_mb = BrowserPool.driver_memory_mb(driver)
+        finally:
+            driver.quit()
+
+        times.sort()
+        results[mode] = {
+            'pages': len(times),
+            'mean_ready': sum(times) / len(times) if times else 0.0,
+            'p50_ready': percentile(times, 50),
+            'p95_ready': percentile(times, 95),
+            'rss_mb': rss_mb,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    # Usage: python vlr_lean_browser.py MATCH_URL [MATCH_URL ...]
+    import sys
+
+    results = benchmark_page_load(sys.argv[1:], runs=2)
+    for mode, row in results.items():
+        rss = f"{row['rss_mb']:.0f} MB" if row['rss_mb'] is not None else "n/a"
+        print(f"{mode:8} {row['pages']} pages  ready mean {row['mean_ready']:.2f}s  "
+              f"p50 {row['p50_ready']:.2f}s  p95 {row['p95_ready']:.2f}s  RSS {rss}")
@@ -0,0 +1,162 @@
+"""
+Match stubs from the results pages: the teams, score, event, date and status
+each card already shows, so runs can filter matches before scraping them
+"""
+import re
+from datetime import date, datetime
+from typing import Iterable, List, Optional
+
+from vlr_html_parser import make_soup
+from vlr_incremental import match_id_from_url
+from vlr_records import MatchStub
+
+MATCH_HREF = re.compile(r'^/\d+.*vs.*')
+
+# Date headings above each group of cards, e.g. "Thu, November 13, 2025" (plus a
+# "Today"/"Yesterday" tag on recent ones)
+_DATE_HEADING = re.compile(r'[A-Z][a-z]+,\s+([A-Z][a-z]+\s+\d{1,2},\s+\d{4})')
+
+
+def _parse_date(text: str) -> Optional[date]:
+    match = _DATE_HEADING.search(' '.join(text.split()))
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), '%B %d, %Y').date()
+    except ValueError:
+        return None
+
+
+def _score(text: str) -> Optional[int]:
+    try:
+        return int(text.strip())
+    except ValueError:
+        return None
+
+
+def _card_stub(link, base_url: str, match_date: Optional[date]) -> MatchStub:
+    """Stub for one match card (an <a class="match-item"> on a results page)"""
+    url = base_url + link.get('href', '')
+    stub = MatchStub(url=url, vlr_match_id=match_id_from_url(url), match_date=match_date)
+
+    time_elem = link.find('div', class_='match-item-time')
+    if time_elem:
+        stub['match_time'] = time_elem.text.strip() or None
+
+    for key, team in zip(('team1', 'team2'), link.find_all('div', class_='match-item-vs-team')):
+        name_elem = team.find('div', class_='match-item-vs-team-name')
+        if name_elem:
+            stub[f'{key}_name'] = ' '.join(name_elem.text.split()) or None
+        flag = team.find('span', class_='flag')
+        if flag:
+            codes = [c[4:] for c in (flag.get('class') or []) if c.startswith('mod-')]
+            stub[f'{key}_country'] = codes[0] if codes else None
+        score_elem = team.find('div', class_='match-item-vs-team-score')
+        if score_elem:
+            stub[f'{key}_score'] = _score(score_elem.text)
+
+    status_elem = link.find('div', class_='ml-status')
+    if status_elem:
+        stub['status'] = status_elem.text.strip() or None
+
+    event_elem = link.find('div', class_='match-item-event')
+    if event_elem:
+        series_elem = event_elem.find('div', class_='match-item-event-series')
+        series = ' '.join(series_elem.text.split()) if series_elem else ''
+        event = ' '.join(event_elem.text.split())
+        if series and event.startswith(series):
+            event = event[len(series):].strip()
+        stub['event_series'] = series or None
+        stub['event_name'] = event or None
+    return stub
+
+
+def parse_results_page(html: str, base_url: str, backend: Optional[str] = None) -> List[MatchStub]:
+    """
+    Match stubs for every match linked from a results page, in page order.
+
+    Cards get teams, countries (flag codes), scores, status, event, series
+    and the date of the heading above them; any other match link only gets
+    its URL and ID.
+    Args:
+        html: Results page
+        base_url: Site root the hrefs are relative to
+        backend: HTML parser backend (None: vlr_html_parser's default)
+    """
+    soup = make_soup(html, backend)
+    stubs = []
+    seen = set()
+
+    # Date headings and card groups alternate, in document order
+    match_date = None
+    for block in soup.find_all('div', class_=lambda c: c in ('wf-label', 'wf-card')):
+        classes = block.get('class') or []
+        if 'wf-label' in classes:
+            if 'mod-large' in classes:
+                match_date = _parse_date(block.text)
+            continue
+        for link in block.find_all('a', class_='match-item'):
+            href = link.get('href', '')
+            if MATCH_HREF.match(href) and href not in seen:
+                seen.add(href)
+                stubs.append(_card_stub(link, base_url, match_date))
+
+    for link in soup.find_all('a', href=True):
+        href = link.get('href', '')
+        if MATCH_HREF.match(href) and href not in seen:
+            seen.add(href)
+            url = base_url + href
+            stubs.append(MatchStub(url=url, vlr_match_id=match_id_from_url(url)))
+    return stubs
+
+
+def is_showmatch(stub: MatchStub) -> bool:
+    text = f"{stub.get('event_name') or ''} {stub.get('event_series') or ''}".lower()
+    return 'showmatch' in text or 'show match' in text
+
+
+def is_completed(stub: MatchStub) -> bool:
+    """Completed per the card's status (stubs without a card count as completed)"""
+    status = stub.get('status')
+    return status is None or status.lower() == 'completed'
+
+
+def filter_stubs(stubs: Iterable[MatchStub], events: Optional[List[str]] = None,
+                 regions: Optional[List[str]] = None, since: Optional[date] = None,
+                 until: Optional[date] = None, completed_only: bool = False,
+                 exclude_showmatches: bool = False) -> List[MatchStub]:
+    """
+    Keep the stubs that pass every given filter
+    Args:
+        events: Case-insensitive substrings, any of which the event name must contain
+        regions: Results cards carry no region, so each entry matches either a
+                 team's flag code ('us', 'kr') or a substring of the event name
+                 ('Americas', 'EMEA', 'Pacific')
+        since, until: Inclusive date range (stubs without a date are dropped)
+        completed_only: Drop live, upcoming and otherwise unfinished matches
+        exclude_showmatches: Drop showmatches
+    """
+    events = [e.lower() for e in events or []]
+    regions = [r.lower() for r in regions or []]
+    kept = []
+    for stub in stubs:
+        event_name = (stub.get('event_name') or '').lower()
+        if events and not any(e in event_name for e in events):
+            continue
+        if regions:
+            countries = {stub.get('team1_country'), stub.get('team2_country')}
+            if not any(r in countries or r in event_name for r in regions):
+                continue
+        match_date = stub.get('match_date')
+        if (since or until) and match_date is None:
+            continue
+        if since and match_date < since:
+            continue
+        if until and match_date > until:
+            continue
+        if completed_only and not is_completed(stub):
+            continue
+        if exclude_showmatches and is_showmatch(stub):
+            continue
+        kept.append(stub)
+    return kept
@@ -0,0 +1,214 @@
+"""
+Economy and performance tabs of a vlr.gg match, fetched over HTTP and parsed
+"""
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from vlr_html_parser import make_soup
+
+ECONOMY_TAB = 'economy'
+PERFORMANCE_TAB = 'performance'
+MATCH_TABS = (ECONOMY_TAB, PERFORMANCE_TAB)
+
+# Buy type shown in the round-by-round economy table -> RoundEconomy.economy_category
+BUY_CATEGORIES = {'': 'Eco', '$': '$', '$$': '$$', '$$$': '$$$'}
+
+# Economy summary columns (header text, lowercased) -> key
+_ECONOMY_COLUMNS = (
+    ('pistol', 'pistol'),
+    ('semi-eco', 'semi_eco'),
+    ('semi eco', 'semi_eco'),
+    ('semi-buy', 'semi_buy'),
+    ('semi buy', 'semi_buy'),
+    ('full', 'full_buy'),
+    ('eco', 'eco'),
+)
+
+_MULTIKILL_COLUMNS = {'2K': 2, '3K': 3, '4K': 4, '5K': 5}
+_CLUTCH_COLUMNS = ('1v1', '1v2', '1v3', '1v4', '1v5')
+_PLAYER_COLUMNS = {'ECON': 'econ_rating', 'PL': 'plants', 'DE': 'defuses'}
+
+
+def tab_url(match_url: str, tab: str) -> str:
+    """URL of one tab of a match page, covering every map (game=all)"""
+    parts = urlsplit(match_url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, f"game=all&tab={tab}", ''))
+
+
+def _first_text(node) -> str:
+    """First non-empty string inside a node (a stat square's value, not its popup)"""
+    for text in node.stripped_strings:
+        return text
+    return ''
+
+
+def _to_int(text) -> Optional[int]:
+    try:
+        return int(str(text).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_money(text: str) -> Optional[int]:
+    """Credits from the economy table, e.g. '8.1k' -> 8100, '950' -> 950"""
+    text = (text or '').strip().lower().replace(',', '')
+    if not text:
+        return None
+    try:
+        if text.endswith('k'):
+            return int(round(float(text[:-1]) * 1000))
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def _game_containers(soup) -> Dict[str, object]:
+    """Per-map containers keyed by data-game-id (skips the 'all' summary)"""
+    containers = {}
+    for container in soup.find_all('div', class_='vm-stats-game'):
+        game_id = container.get('data-game-id')
+        if game_id and game_id != 'all':
+            containers[game_id] = container
+    return containers
+
+
+def _header_labels(table) -> List[str]:
+    header = table.find('tr')
+    return [cell.text.strip() for cell in header.find_all('th')] if header else []
+
+
+def _popup_rounds(cell) -> List[int]:
+    """Round numbers listed in a stat square's hover popup, if the page has them"""
+    popup = cell.find('div', class_='wf-popable-contents')
+    if not popup:
+        return []
+    text = popup.get_text(' ')
+    return [int(n) for n in re.findall(r'\b(?:round|rnd|r)\s*(\d{1,2})\b', text, re.IGNORECASE)]
+
+
+def parse_economy(html: str, backend: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Economy tab of a match
+    Returns:
+        {game_id: {'team1': {...}, 'team2': {...}, 'rounds': [...]}} where team
+        entries hold '<buy>_won' (and '<buy>_played') for pistol, eco, semi_eco,
+        semi_buy and full_buy, and rounds hold round_number, team1/team2 _bank
+        (credits) and _buy (Eco, $, $$, $$$)
+    """
+    soup = make_soup(html, backend)
+    economy = {}
+    for game_id, container in _game_containers(soup).items():
+        tables = container.find_all('table', class_='mod-econ')
+        if not tables:
+            continue
+        entry = {'team1': {}, 'team2': {}, 'rounds': []}
+
+        # Summary: one row per team, "played (won)" per buy type
+        summary = tables[0]
+        labels = _header_labels(summary)
+        team_rows = [row for row in summary.find_all('tr') if row.find('td')]
+        for side, row in zip(('team1', 'team2'), team_rows):
+            for label, cell in zip(labels[1:], row.find_all('td')[1:]):
+                key = next((k for marker, k in _ECONOMY_COLUMNS if marker in label.lower()), None)
+                if key is None:
+                    continue
+                value = _first_text(cell)
+                played_won = re.match(r'^\s*(\d+)\s*\((\d+)\)', value)
+                if played_won:
+                    entry[side][f'{key}_played'] = int(played_won.group(1))
+                    entry[side][f'{key}_won'] = int(played_won.group(2))
+                else:
+                    entry[side][f'{key}_won'] = _to_int(value)
+
+        # Round by round: one column per round with both teams' buy and bank
+        if len(tables) > 1:
+            number = 0
+            for cell in tables[1].find_all('td'):
+                squares = cell.find_all('div', class_='rnd-sq')
+                if len(squares) < 2:
+                    continue
+                number += 1
+                round_num = cell.find('div', class_='round-num')
+                banks = cell.find_all('div', class_='bank')
+                round_data = {'round_number': _to_int(round_num.text) if round_num else number}
+                for i, side in enumerate(('team1', 'team2')):
+                    buy = squares[i].text.strip()
+                    round_data[f'{side}_buy'] = BUY_CATEGORIES.get(buy, buy)
+                    round_data[f'{side}_bank'] = parse_money(banks[i].text) if i < len(banks) else None
+                    round_data[f'{side}_won'] = 'mod-win' in (squares[i].get('class') or [])
+                entry['rounds'].append(round_data)
+
+        economy[game_id] = entry
+    return economy
+
+
+def parse_performance(html: str, backend: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Performance tab (advanced stats) of a match
+    Returns:
+        {game_id: {'multikills': [...], 'clutches': [...], 'players': {ign: {...}}}}
+        multikills: player_ign, kills (2-5) and round_number (None if the page
+        does not list the rounds); clutches: player_ign, clutch_type ('1v2'),
+        won and round_number; players: econ_rating, plants, defuses
+    """
+    soup = make_soup(html, backend)
+    performance = {}
+    for game_id, container in _game_containers(soup).items():
+        table = container.find('table', class_='mod-adv-stats')
+        if not table:
+            continue
+        labels = _header_labels(table)
+        entry = {'multikills': [], 'clutches': [], 'players': {}}
+
+        for row in table.find_all('tr'):
+            cells = row.find_all('td')
+            if not cells:
+                continue
+            player_ign = _first_text(cells[0])
+            if not player_ign:
+                continue
+            player = {}
+            for label, cell in zip(labels, cells):
+                count = _to_int(_first_text(cell))
+                if label in _MULTIKILL_COLUMNS or label in _CLUTCH_COLUMNS:
+                    if not count:
+                        continue
+                    rounds = _popup_rounds(cell)
+                    rounds = (rounds + [None] * count)[:count]
+                    for round_number in rounds:
+                        if label in _MULTIKILL_COLUMNS:
+                            entry['multikills'].append({'player_ign': player_ign, 'round_number': round_number,
+                                                        'kills': _MULTIKILL_COLUMNS[label]})
+                        else:
+                            # vlr.gg only counts clutches that were won
+                            entry['clutches'].append({'player_ign': player_ign, 'round_number': round_number,
+                                                      'clutch_type': label, 'won': True})
+                elif label in _PLAYER_COLUMNS:
+                    player[_PLAYER_COLUMNS[label]] = count
+            entry['players'][player_ign] = player
+
+        performance[game_id] = entry
+    return performance
+
+
+def apply_match_tabs(match_data: Dict, economy: Optional[Dict], performance: Optional[Dict]):
+    """
+    Attach parsed tab data to match_data: maps get 'economy', 'multikills' and
+    'clutches'; per-map player stats get econ_rating, plants and defuses
+    """
+    maps_by_name = {}
+    for map_data in match_data.get('maps', []):
+        game_id = map_data.get('game_id')
+        if economy and game_id in economy:
+            map_data['economy'] = economy[game_id]
+        if performance and game_id in performance:
+            map_data['multikills'] = performance[game_id]['multikills']
+            map_data['clutches'] = performance[game_id]['clutches']
+            maps_by_name[map_data.get('map_name')] = performance[game_id]['players']
+
+    for stat in match_data.get('player_stats', []):
+        players = maps_by_name.get(stat.get('map_name'))
+        if players and stat.get('player_ign') in players:
+            for key, value in players[stat['player_ign']].items():
+                stat[key] = value
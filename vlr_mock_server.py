@@ -0,0 +1,437 @@
+"""
+Local stand-in for vlr.gg: serves recorded (or generated) results, match, team,
+event and player pages with configurable latency, errors and throttling
+"""
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from vlr_http_cache import classify_url
+
+# Origin the recorded pages were fetched from (archive URLs start with it)
+RECORDED_ORIGIN = 'https://www.vlr.gg'
+
+# Matches listed per results page, as on vlr.gg
+RESULTS_PAGE_SIZE = 50
+
+_AGENTS = ('Jett', 'Sova', 'Omen', 'Killjoy', 'Skye', 'Raze', 'Viper', 'Cypher', 'Breach', 'Astra')
+_MAPS = ('Bind', 'Haven', 'Split', 'Ascent', 'Lotus', 'Sunset', 'Icebox')
+_FLAGS = ('us', 'kr', 'br', 'jp', 'tr', 'fr')
+
+# Newest synthetic match start (ms since the epoch); each later match ID is an hour older
+_NEWEST_MATCH_MS = 1700000000000
+SHOWMATCH_EVERY = 20   # Every Nth synthetic match is a showmatch
+
+
+def _results_page(match_paths: List[str], page: int, card: Optional[Callable[[str], Tuple]] = None) -> str:
+    """
+    Results page N listing its slice of the match paths (newest first).
+    card(path) gives (date heading, card contents) for full match cards;
+    without it each card carries only its link.
+    """
+    start = (page - 1) * RESULTS_PAGE_SIZE
+    blocks = []
+    items = []
+    current = None
+    for path in match_paths[start:start + RESULTS_PAGE_SIZE]:
+        heading, contents = card(path) if card else (None, f'<div class="match-item-vs">{path}</div>')
+        if heading != current:
+            if items:
+                blocks.append(f'<div class="wf-card">{"".join(items)}</div>')
+                items = []
+            blocks.append(f'<div class="wf-label mod-large">{heading}</div>')
+            current = heading
+        items.append(f'<a href="{path}" class="wf-module-item match-item">{contents}</a>')
+    if items:
+        blocks.append(f'<div class="wf-card">{"".join(items)}</div>')
+    return f'<html><body>{"".join(blocks)}</body></html>'
+
+
+class SyntheticSite:
+    """
+    Generated pages in vlr.gg's markup, deterministic for a given seed.
+    Much smaller than real pages; record an archive for realistic parse costs.
+    """
+
+    def __init__(self, matches: int = 100, maps: int = 2, teams: int = 16, seed: int = 0):
+        """
+        Args:
+            matches: Matches listed on the results pages
+            maps: Maps played per match
+            teams: Distinct teams the matches are drawn from (at least 2; 5 players each)
+            seed: Seed for the generated stats
+        """
+        self.maps = maps
+        self.teams = teams
+        self.seed = seed
+        self.match_ids = [100000 + i for i in range(matches)]
+        # Every team meets every other team in turn
+        self._pairs = {
+            match_id: (i % teams, (i + 1 + (i // teams) % (teams - 1)) % teams)
+            for i, match_id in enumerate(self.match_ids)
+        }
+
+    @property
+    def match_paths(self) -> List[str]:
+        return [self._match_path(match_id) for match_id in self.match_ids]
+
+    def _match_path(self, match_id: int) -> str:
+        team1, team2 = self._pairs[match_id]
+        return f"/{match_id}/team-{team1}-vs-team-{team2}-synthetic-cup"
+
+    def page(self, path: str, query: Dict[str, List[str]]) -> Optional[str]:
+        """HTML for a request path, or None for a 404"""
+        if path == '/matches/results':
+            return _results_page(self.match_paths, int(query.get('page', ['1'])[0] or 1), self._card)
+        match = re.match(r'^/(\d+)/', path)
+        if match and int(match.group(1)) in self._pairs:
+            match_id = int(match.group(1))
+            tab = query.get('tab', [None])[0]
+            if tab == 'economy':
+                return self._economy_page(match_id)
+            if tab == 'performance':
+                return self._performance_page(match_id)
+            return self._match_page(match_id)
+        entity = re.match(r'^/(team|event|player)/(\d+)', path)
+        if entity:
+            return getattr(self, f'_{entity.group(1)}_page')(int(entity.group(2)))
+        return None
+
+    # --- Generated pages ---
+
+    def _rng(self, *key) -> random.Random:
+        # String seeds are hashed the same way in every process
+        return random.Random(':'.join(map(str, (self.seed,) + key)))
+
+    def _games(self, match_id: int) -> List[Tuple[int, str, int, int]]:
+        """(game_id, map name, team1 score, team2 score) per map"""
+        rng = self._rng('games', match_id)
+        games = []
+        for idx in range(self.maps):
+            loser = rng.randint(3, 11)
+            scores = (13, loser) if rng.random() < 0.5 else (loser, 13)
+            games.append((match_id * 10 + idx, _MAPS[(match_id + idx) % len(_MAPS)]) + scores)
+        return games
+
+    def _timestamp_ms(self, match_id: int) -> int:
+        return _NEWEST_MATCH_MS - (match_id - self.match_ids[0]) * 3600000
+
+    def _event(self, match_id: int) -> Tuple[str, str]:
+        """(event name, series)"""
+        if (match_id - self.match_ids[0]) % SHOWMATCH_EVERY == SHOWMATCH_EVERY - 1:
+            return 'Synthetic Cup', 'Showmatch'
+        return 'Synthetic Cup', 'Playoffs: Final'
+
+    def _card(self, path: str) -> Tuple[str, str]:
+        """(date heading, card contents) for a results-page match card"""
+        match_id = int(path.split('/')[1])
+        team1, team2 = self._pairs[match_id]
+        games = self._games(match_id)
+        maps_won = (sum(g[2] > g[3] for g in games), sum(g[3] > g[2] for g in games))
+        started = datetime.fromtimestamp(self._timestamp_ms(match_id) / 1000, tz=timezone.utc)
+        event, series = self._event(match_id)
+        teams = ''.join(
+            f'<div class="match-item-vs-team"><div class="match-item-vs-team-name"><div class="text-of">'
+            f'<span class="flag mod-{_FLAGS[team % len(_FLAGS)]}"></span> Team {team}</div></div>'
+            f'<div class="match-item-vs-team-score">{won}</div></div>'
+            for team, won in zip((team1, team2), maps_won)
+        )
+        contents = (
+            f'<div class="match-item-time">{started.strftime("%I:%M %p").lstrip("0")}</div>'
+            f'<div class="match-item-vs">{teams}</div>'
+            '<div class="match-item-eta"><div class="ml mod-completed"><div class="ml-status">Completed</div></div></div>'
+            f'<div class="match-item-event text-of"><div class="match-item-event-series text-of">{series}</div>'
+            f' {event}</div>'
+        )
+        return started.strftime('%a, %B %d, %Y').replace(' 0', ' '), contents
+
+    def _match_page(self, match_id: int) -> str:
+        team1, team2 = self._pairs[match_id]
+        games = self._games(match_id)
+        maps_won = (sum(g[2] > g[3] for g in games), sum(g[3] > g[2] for g in games))
+        event, series = self._event(match_id)
+        header = (
+            '<div class="match-header"><a class="match-header-event" href="/event/1/synthetic-cup">'
+            f'<div><div style="font-weight: 700;">{event}</div>'
+            f'<div class="match-header-event-series">{series}</div></div></a>'
+            f'<div class="match-header-date"><div class="moment-tz-convert" data-utc-ts="{self._timestamp_ms(match_id)}">x</div>'
+            '<div>Patch 9.03</div></div>'
+            f'<a href="/team/{team1}/team-{team1}"><div class="match-header-link-name"><div class="wf-title-med">Team {team1}</div></div></a>'
+            f'<div class="match-header-vs"><div class="match-header-vs-score">{maps_won[0]}</div>'
+            f'<div class="match-header-vs-score">{maps_won[1]}</div></div>'
+            f'<a href="/team/{team2}/team-{team2}"><div class="match-header-link-name"><div class="wf-title-med">Team {team2}</div></div></a></div>'
+        )
+        nav = ''.join(f'<div class="vm-stats-gamesnav-item">{name}</div>' for _, name, _, _ in games)
+        containers = ''.join(self._game_container(match_id, game, team1, team2) for game in games)
+        return (f'<html><body>{header}<div class="vm-stats-gamesnav"><div class="vm-stats-gamesnav-item">All</div>'
+                f'{nav}</div><div class="vm-stats-game" data-game-id="all"></div>{containers}</body></html>')
+
+    def _game_container(self, match_id: int, game, team1: int, team2: int) -> str:
+        game_id, map_name, score1, score2 = game
+        attack1 = score1 // 2
+        defense2 = score2 // 2
+        rounds = ''.join(
+            f'<div class="vlr-rounds-row-col"><div class="rnd"><div class="rnd-sq{" mod-win mod-t" if r % 2 else ""}">'
+            '<img src="/img/vlr/game/round/elim.webp"></div></div></div>'
+            for r in range(score1 + score2)
+        )
+        tables = ''.join(self._stat_table(match_id, game_id, team) for team in (team1, team2))
+        return (
+            f'<div class="vm-stats-game" data-game-id="{game_id}"><div class="vm-stats-game-header">'
+            f'<div class="team"><div class="score">{score1}</div><span class="mod-t">{attack1}</span> / '
+            f'<span class="mod-ct">{score1 - attack1}</span></div>'
+            f'<div class="map"><div><span>{map_name} <span class="picked">PICK</span></span></div>'
+            '<div class="map-duration">41:07</div></div>'
+            f'<div class="team mod-right"><div class="score">{score2}</div><span class="mod-ct">{defense2}</span> / '
+            f'<span class="mod-t">{score2 - defense2}</span></div></div>'
+            f'<div class="vlr-rounds">{rounds}</div>{tables}</div>'
+        )
+
+    def _stat_table(self, match_id: int, game_id: int, team: int) -> str:
+        rng = self._rng('stats', game_id, team)
+        rows = []
+        for slot in range(5):
+            player_id = team * 5 + slot
+            kills, deaths = rng.randint(5, 30), rng.randint(5, 25)
+            values = (f"{rng.uniform(0.5, 1.8):.2f}", rng.randint(100, 320), kills, deaths, rng.randint(1, 12),
+                      f"{kills - deaths:+d}", f"{rng.randint(50, 90)}%", rng.randint(80, 200),
+                      f"{rng.randint(10, 40)}%", rng.randint(0, 6), rng.randint(0, 6))
+            cells = ''.join(
+                '<td class="mod-stat">' + ''.join(f'<span class="side mod-side {side}">{value}</span>'
+                                                 for side in ('mod-both', 'mod-t', 'mod-ct')) + '</td>'
+                for value in values
+            )
+            rows.append(
+                f'<tr><td class="mod-player"><a href="/player/{player_id}/player-{player_id}">'
+                f'<div class="text-of">P{player_id}</div><div class="ge-text-light">NA</div></a></td>'
+                f'<td class="mod-agents"><span><img title="{_AGENTS[player_id % len(_AGENTS)]}"></span></td>{cells}</tr>'
+            )
+        return f'<table class="wf-table-inset mod-overview"><thead><tr><th></th></tr></thead><tbody>{"".join(rows)}</tbody></table>'
+
+    def _economy_page(self, match_id: int) -> str:
+        team1, team2 = self._pairs[match_id]
+        containers = []
+        for game_id, _, score1, score2 in self._games(match_id):
+            rng = self._rng('economy', game_id)
+            summary = ''.join(
+                f'<tr><td><div class="team">Team {team}</div></td><td><div class="stats-sq">{rng.randint(0, 2)}</div></td>'
+                + ''.join(f'<td><div class="stats-sq">{n} ({rng.randint(0, n)})</div></td>'
+                          for n in (rng.randint(1, 5), rng.randint(1, 4), rng.randint(1, 5), rng.randint(5, 15)))
+                + '</tr>'
+                for team in (team1, team2)
+            )
+            rounds = ''.join(
+                f'<td><div class="round-num">{r}</div><div class="bank">{rng.uniform(0.1, 9):.1f}k</div>'
+                f'<div class="rnd-sq{" mod-win" if r % 2 else ""}">{rng.choice(("", "$", "$$", "$$$"))}</div>'
+                f'<div class="rnd-sq{"" if r % 2 else " mod-win"}">{rng.choice(("", "$", "$$", "$$$"))}</div>'
+                f'<div class="bank">{rng.randint(100, 9000)}</div></td>'
+                for r in range(1, score1 + score2 + 1)
+            )
+            containers.append(
+                f'<div class="vm-stats-game" data-game-id="{game_id}">'
+                '<table class="wf-table-inset mod-econ"><tr><th></th><th>Pistol Won</th><th>Eco (won)</th>'
+                f'<th>Semi-eco (won)</th><th>Semi-buy (won)</th><th>Full buy (won)</th></tr>{summary}</table>'
+                f'<table class="wf-table-inset mod-econ"><tr><td></td>{rounds}</tr></table></div>'
+            )
+        return f'<html><body><div class="vm-stats-game" data-game-id="all"></div>{"".join(containers)}</body></html>'
+
+    def _performance_page(self, match_id: int) -> str:
+        team1, team2 = self._pairs[match_id]
+        labels = ('2K', '3K', '4K', '5K', '1v1', '1v2', '1v3', '1v4', '1v5', 'ECON', 'PL', 'DE')
+        containers = []
+        for game_id, _, _, _ in self._games(match_id):
+            rng = self._rng('performance', game_id)
+            rows = ''.join(
+                f'<tr><td><div class="team"><div>P{team * 5 + slot}</div><div class="team-tag">T{team}</div></div></td><td></td>'
+                + ''.join(f'<td><div class="stats-sq">{rng.randint(0, 3) or ""}</div></td>' for _ in range(9))
+                + f'<td><div class="stats-sq">{rng.randint(20, 90)}</div></td>'
+                  f'<td><div class="stats-sq">{rng.randint(0, 4)}</div></td><td><div class="stats-sq">{rng.randint(0, 2)}</div></td></tr>'
+                for team in (team1, team2) for slot in range(5)
+            )
+            header = '<tr><th></th><th></th>' + ''.join(f'<th>{label}</th>' for label in labels) + '</tr>'
+            containers.append(f'<div class="vm-stats-game" data-game-id="{game_id}">'
+                              f'<table class="wf-table-inset mod-adv-stats">{header}{rows}</table></div>')
+        return f'<html><body>{"".join(containers)}</body></html>'
+
+    def _team_page(self, team: int) -> str:
+        return (f'<html><body><div class="team-header"><img class="team-header-logo" src="/img/team/{team}.png">'
+                f'<div class="team-header-country">{("North America", "EMEA", "Pacific", "China")[team % 4]}</div>'
+                '</div></body></html>')
+
+    def _event_page(self, event: int) -> str:
+        teams = ''.join(f'<a href="/team/{team}/team-{team}"><div class="text-of">Team {team}</div></a>'
+                        for team in range(self.teams))
+        return ('<html><body><div class="event-prize">$250,000</div>'
+                f'<div class="event-dates">Jul 1 - Aug 15, 2024</div>{teams}</body></html>')
+
+    def _player_page(self, player: int) -> str:
+        return (f'<html><body><div class="ge-flag">{("United States", "Canada", "Brazil")[player % 3]}</div>'
+                f'<div class="wf-card"><a href="/team/{player // 5}/team-{player // 5}"><div class="text-of">'
+                f'Team {player // 5}</div></a><div class="player-summary-join-date">Jan 15, 2024</div></div>'
+                '</body></html>')
+
+
+class ArchiveSite:
+    """
+    Pages recorded in an HTMLArchive, served by path. Results pages that were
+    not recorded are built from the archived match URLs.
+    """
+
+    def __init__(self, archive_path: str):
+        from vlr_archive import HTMLArchive
+
+        self.archive = HTMLArchive(archive_path)
+        self.match_paths = [url[len(RECORDED_ORIGIN):] for url in self.archive.urls('match')
+                            if url.startswith(RECORDED_ORIGIN)]
+
+    def page(self, path: str, query: Dict[str, List[str]]) -> Optional[str]:
+        query_string = '&'.join(f"{key}={value}" for key, values in query.items() for value in values)
+        html = self.archive.latest(RECORDED_ORIGIN + path + (f"?{query_string}" if query_string else ''))
+        if html is None and path == '/matches/results':
+            return _results_page(self.match_paths, int(query.get('page', ['1'])[0] or 1))
+        return html
+
+
+class MockVLRServer:
+    """
+    Threaded HTTP server standing in for vlr.gg on localhost.
+
+    Each request sleeps for a random latency, then is answered with a 429
+    (throttle_rate), a 500 (error_rate) or the page. Point the scraper at
+    base_url with the VLR_BASE_URL environment variable.
+    """
+
+    def __init__(self, site=None, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: Tuple[float, float] = (20, 80), error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: int = 1, seed: Optional[int] = None):
+        """
+        Args:
+            site: SyntheticSite or ArchiveSite (default: SyntheticSite())
+            host, port: Address to listen on (port 0 picks a free port)
+            latency_ms: Uniform (min, max) delay added to every response
+            error_rate: Share of requests answered with 500
+            throttle_rate: Share of requests answered with 429 and Retry-After
+            retry_after: Retry-After seconds sent with a 429
+            seed: Seed for latency and fault injection
+        """
+        self.site = site if site is not None else SyntheticSite()
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'pages': 0, 'not_found': 0, 'errors': 0, 'throttled': 0, 'by_type': {}}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockVLRServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-vlr', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'by_type': dict(self._stats['by_type'])}
+
+    def _respond(self, raw_path: str) -> Tuple[int, Dict[str, str], bytes]:
+        """Status, headers and body for one request (also counts it)"""
+        parts = urlsplit(raw_path)
+        with self._lock:
+            delay = self._random.uniform(*self.latency_ms) / 1000
+            roll = self._random.random()
+            self._stats['requests'] += 1
+            page_type = classify_url(raw_path)
+            self._stats['by_type'][page_type] = self._stats['by_type'].get(page_type, 0) + 1
+        time.sleep(delay)
+
+        if roll < self.throttle_rate:
+            self._count('throttled')
+            return 429, {'Retry-After': str(self.retry_after)}, b'Too Many Requests'
+        if roll < self.throttle_rate + self.error_rate:
+            self._count('errors')
+            return 500, {}, b'Internal Server Error'
+
+        html = self.site.page(parts.path, parse_qs(parts.query))
+        if html is None:
+            self._count('not_found')
+            return 404, {}, b'Not Found'
+        self._count('pages')
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, html.encode('utf-8')
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, headers, body = server._respond(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    # Usage: python vlr_mock_server.py [--archive vlr_archive.sqlite] [--port 8000] ...
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local vlr.gg stand-in")
+    parser.add_argument('--archive', help="Serve pages recorded in this HTML archive (default: generated pages)")
+    parser.add_argument('--matches', type=int, default=100, help="Generated matches (default: 100)")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency-ms', type=float, nargs=2, default=(20, 80), metavar=('MIN', 'MAX'))
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    site = ArchiveSite(args.archive) if args.archive else SyntheticSite(matches=args.matches)
+    server = MockVLRServer(site, port=args.port, latency_ms=tuple(args.latency_ms),
+                           error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    server.start()
+    print(f"Serving {len(site.match_paths)} matches at {server.base_url} "
+          f"(set VLR_BASE_URL={server.base_url}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(server.get_stats())
@@ -0,0 +1,80 @@
+"""
+Parallel match scraping with a pool of worker processes
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import util as mp_util
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import vlr_http
+from vlr_browser_pool import BrowserPool
+
+
+# Per-process state, set up by _init_worker
+_worker_pool: Optional[BrowserPool] = None
+_worker_engine = 'static'
+
+
+def _init_worker(headless: bool, engine: str,
+                 max_pages_per_driver: int, max_memory_mb: Optional[int],
+                 scraper_options: Optional[Dict], http_settings: Optional[Dict]):
+    """Give each worker process its own single-browser pool and HTTP layer"""
+    global _worker_pool, _worker_engine
+    _worker_engine = engine
+    vlr_http.configure(**(http_settings or {}))
+    _worker_pool = BrowserPool(
+        size=1,
+        headless=headless,
+        max_pages_per_driver=max_pages_per_driver,
+        max_memory_mb=max_memory_mb,
+        scraper_options=scraper_options
+    )
+    # Quit Firefox when the worker process exits
+    mp_util.Finalize(None, _worker_pool.close, exitpriority=10)
+
+
+def _scrape_in_worker(url: str) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """Scrape one match inside a worker; errors are returned, not raised"""
+    try:
+        match_data = _worker_pool.scrape_match(url, engine=_worker_engine)
+        return url, match_data, None
+    except Exception as e:
+        return url, None, str(e) or e.__class__.__name__
+
+
+def scrape_parallel(urls: List[str], workers: int, headless: bool = True,
+                    engine: str = 'static',
+                    max_pages_per_driver: int = 25,
+                    max_memory_mb: Optional[int] = 1500,
+                    scraper_options: Optional[Dict] = None,
+                    http_settings: Optional[Dict] = None) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    """
+    Scrape matches across `workers` processes, each owning its own browser.
+
+    Yields (url, match_data, error) tuples in completion order so the caller
+    can write every result through a single database connection.
+    `http_settings` are passed to vlr_http.configure() in every worker; a
+    RateLimiter given there as 'rate_limiter' is shared by all workers, so
+    together they never exceed its request rate.
+    """
+    ctx = multiprocessing.get_context()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(headless, engine, max_pages_per_driver, max_memory_mb,
+                  scraper_options, http_settings)
+    ) as executor:
+        futures = {executor.submit(_scrape_in_worker, url): url for url in urls}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # Worker process died (e.g. killed by the OS)
+                    yield futures[future], None, str(e) or e.__class__.__name__
+        except (KeyboardInterrupt, GeneratorExit):
+            for future in futures:
+                future.cancel()
+            raise
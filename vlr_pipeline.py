@@ -0,0 +1,172 @@
+"""
+Bounded producer/consumer pipeline between scraping and database writes
+"""
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+# Queue sentinel telling a writer thread to finish
+_STOP = object()
+
+
+class IngestPipeline:
+    """
+    Lets scraping continue while matches are written to the database.
+
+    Producers call submit() with each scraped match; writer threads drain the
+    bounded queue, each through its own database connection. A full queue
+    blocks submit(), so a slow database holds scraping back instead of
+    filling memory. get_stats() reports queue depth, throughput of both
+    sides and how long each side spent waiting on the other.
+    """
+
+    def __init__(self, inserter_factory: Callable, store: Callable,
+                 on_done: Optional[Callable] = None, writers: int = 1, max_queue: int = 8):
+        """
+        Args:
+            inserter_factory: Creates one database connection (e.g. SQLServerInserter) per writer
+            store: store(db, match_data) writes one match; raises on failure
+            on_done: on_done(url, match_data, error) after each write (called under a lock)
+            writers: Number of writer threads
+            max_queue: Matches allowed to wait for a writer
+        """
+        self.inserter_factory = inserter_factory
+        self.store = store
+        self.on_done = on_done
+        self.writers = writers
+        self.max_queue = max_queue
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._started_at = None
+        self._finished_at = None
+
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'failed': 0,
+            'max_depth': 0,
+            'depth_total': 0,
+            'producer_blocked_seconds': 0.0,
+            'writer_idle_seconds': 0.0,
+            'write_seconds': 0.0,
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self):
+        """Start the writer threads"""
+        self._started_at = time.perf_counter()
+        for i in range(self.writers):
+            thread = threading.Thread(target=self._writer, name=f"vlr-writer-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, url: str, match_data: Dict):
+        """Queue a scraped match for writing; blocks while the queue is full"""
+        if not any(thread.is_alive() for thread in self._threads):
+            raise RuntimeError("No database writer is running")
+
+        start = time.perf_counter()
+        self._queue.put((url, match_data))
+        blocked = time.perf_counter() - start
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self.stats['submitted'] += 1
+            self.stats['producer_blocked_seconds'] += blocked
+            self.stats['depth_total'] += depth
+            self.stats['max_depth'] = max(self.stats['max_depth'], depth)
+
+    @property
+    def depth(self) -> int:
+        """Matches currently waiting for a writer"""
+        return self._queue.qsize()
+
+    def drain(self):
+        """Block until every match submitted so far has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Wait for every queued match to be written, then stop the writers"""
+        if not self._threads:
+            return
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._finished_at = time.perf_counter()
+
+    def _writer(self):
+        """Writer thread: own connection, drain the queue until told to stop"""
+        db = None
+        connect_error = None
+        try:
+            db = self.inserter_factory()
+        except Exception as e:
+            connect_error = f"database connection failed: {e}"
+            print(f"  {threading.current_thread().name}: {connect_error}")
+
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                item = self._queue.get()
+                idle = time.perf_counter() - wait_start
+                if item is _STOP:
+                    self._queue.task_done()
+                    break
+
+                url, match_data = item
+                error = connect_error
+                write_start = time.perf_counter()
+                if db is not None:
+                    try:
+                        self.store(db, match_data)
+                    except Exception as e:
+                        error = str(e) or e.__class__.__name__
+                write_time = time.perf_counter() - write_start
+
+                with self._lock:
+                    self.stats['writer_idle_seconds'] += idle
+                    self.stats['write_seconds'] += write_time
+                    self.stats['failed' if error else 'written'] += 1
+                    if self.on_done is not None:
+                        self.on_done(url, match_data, error)
+                self._queue.task_done()
+        finally:
+            if db is not None:
+                db.close()
+
+    def get_stats(self) -> Dict:
+        """Queue depth, per-side throughput (matches/minute) and wait times"""
+        with self._lock:
+            stats = dict(self.stats)
+        end = self._finished_at or time.perf_counter()
+        elapsed = end - self._started_at if self._started_at else 0.0
+
+        stats['depth'] = self.depth
+        stats['avg_depth'] = stats['depth_total'] / stats['submitted'] if stats['submitted'] else 0.0
+        stats['elapsed_seconds'] = elapsed
+        minutes = elapsed / 60 if elapsed else 0.0
+        stats['scraped_per_min'] = stats['submitted'] / minutes if minutes else 0.0
+        done = stats['written'] + stats['failed']
+        stats['written_per_min'] = done / minutes if minutes else 0.0
+        # What the writers could sustain if they never had to wait for matches
+        busy_minutes = stats['write_seconds'] / 60 / self.writers
+        stats['write_capacity_per_min'] = done / busy_minutes if busy_minutes else 0.0
+
+        # Whichever side spent more time waiting on the other is not the bottleneck
+        if stats['producer_blocked_seconds'] > stats['writer_idle_seconds'] / max(1, self.writers):
+            stats['bottleneck'] = 'database'
+        else:
+            stats['bottleneck'] = 'scraping'
+        return stats
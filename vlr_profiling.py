@@ -0,0 +1,208 @@
+"""
+Per-stage timing aggregation and optional profilers for scrape runs
+"""
+import collections
+import cProfile
+import csv
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+PERCENTILES = (50, 90, 95, 99)
+PROFILE_MODES = ('cprofile', 'sample')
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * pct / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+class StageProfiler:
+    """
+    Collects the stage_timings of every scraped match in a run.
+
+    add() is cheap (one list append per stage) and thread-safe, so it can be
+    called from the result loop of any scrape mode. summary() turns the
+    samples into count/mean/percentiles per stage; write_report() saves them
+    as JSON or CSV.
+    """
+
+    def __init__(self):
+        self._samples = collections.defaultdict(list)
+        self._lock = threading.Lock()
+        self.matches = 0
+
+    def add(self, stage_timings: Optional[Dict[str, float]]):
+        """Record one match's stage timings (seconds per stage)"""
+        if not stage_timings:
+            return
+        with self._lock:
+            self.matches += 1
+            for stage, seconds in stage_timings.items():
+                self._samples[stage].append(seconds)
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Returns:
+            {stage: {count, mean, p50, p90, p95, p99, max, total}} in seconds,
+            top-level stages first, sub-stages (dotted names) after their parent
+        """
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+
+        # Top-level stages in the order they were first seen (scrape order)
+        order = {}
+        for stage in samples:
+            order.setdefault(stage.split('.')[0], len(order))
+
+        summary = {}
+        for stage in sorted(samples, key=lambda name: (order[name.split('.')[0]], '.' in name, name)):
+            values = samples[stage]
+            total = sum(values)
+            row = {'count': len(values), 'mean': total / len(values)}
+            for pct in PERCENTILES:
+                row[f'p{pct}'] = percentile(values, pct)
+            row['max'] = values[-1]
+            row['total'] = total
+            summary[stage] = row
+        return summary
+
+    def write_report(self, path: str, extra: Optional[Dict] = None):
+        """
+        Save the summary; CSV if the path ends in .csv, JSON otherwise
+        Args:
+            path: Output file
+            extra: Run details added to the JSON report (ignored for CSV)
+        """
+        summary = self.summary()
+        if path.lower().endswith('.csv'):
+            fields = ['stage', 'count', 'mean'] + [f'p{pct}' for pct in PERCENTILES] + ['max', 'total']
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for stage, row in summary.items():
+                    writer.writerow({'stage': stage, **{k: round(v, 6) for k, v in row.items()}})
+        else:
+            report = {'generated_at': time.time(), 'matches': self.matches, 'stages': summary}
+            if extra:
+                report.update(extra)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, default=str)
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for one thread.
+
+    A background thread looks at the target thread's current stack every
+    `interval` seconds and counts it; the result is written in collapsed
+    stack format ("a;b;c count"), which flamegraph.pl and speedscope read.
+    Unlike cProfile it does not slow down the profiled code.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        """
+        Args:
+            interval: Seconds between samples
+            thread_id: Thread to sample (default: the thread calling start())
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='vlr-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str):
+        """Save the sampled stacks in collapsed format"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top(self, limit: int = 15) -> List:
+        """Functions most often on top of the stack: [(function, share of samples)]"""
+        leaves = collections.Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return [(name, count / self.samples) for name, count in leaves.most_common(limit)] if self.samples else []
+
+
+@contextmanager
+def profiling(mode: Optional[str], output_prefix: str = 'vlr_profile'):
+    """
+    Profile the enclosed block of the current process.
+    Args:
+        mode: 'cprofile' (deterministic, writes <prefix>.prof),
+              'sample' (sampling, writes <prefix>.collapsed) or None for no profiling
+        output_prefix: Output path without extension
+    Only the calling process is profiled; scrapes in worker processes are not.
+    """
+    if not mode:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode} (expected one of {', '.join(PROFILE_MODES)})")
+
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = f"{output_prefix}.prof"
+            profiler.dump_stats(path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(25)
+            print(out.getvalue())
+            print(f"cProfile data written to {path} (open with snakeviz or pstats)")
+    else:
+        sampler = SamplingProfiler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            path = f"{output_prefix}.collapsed"
+            sampler.write_collapsed(path)
+            print(f"\nSampling profile: {sampler.samples} samples")
+            for name, share in sampler.top():
+                print(f"  {share:6.1%}  {name}")
+            print(f"Collapsed stacks written to {path} (flamegraph.pl / speedscope)")
@@ -0,0 +1,138 @@
+"""
+Token-bucket rate limiter with adaptive backoff for all vlr.gg traffic
+"""
+import multiprocessing
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+THROTTLE_STATUSES = (429, 503)
+
+# Slots in the shared state array
+_TOKENS, _UPDATED, _RATE, _BLOCKED_UNTIL, _STRIKES, _THROTTLED, _WAITED, _REQUESTS = range(8)
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread and worker process of a run.
+
+    Each request takes one token; tokens refill at the current rate up to
+    `burst`. A 429/503 response halves the rate and blocks everyone for an
+    exponentially growing, jittered delay (or the server's Retry-After);
+    each successful response adds `recovery_step` requests/second back until
+    the configured rate is reached again (AIMD).
+
+    State lives in a multiprocessing Array, so a limiter passed to worker
+    processes (e.g. through a pool initializer) is the same limiter there.
+    """
+
+    def __init__(self, requests_per_second: float = 2.0, burst: int = 4,
+                 min_rate: float = 0.1, recovery_step: float = 0.05,
+                 base_backoff: float = 2.0, max_backoff: float = 120.0, ctx=None):
+        """
+        Args:
+            requests_per_second: Target (and maximum) request rate
+            burst: Bucket size, i.e. requests allowed back to back after idling
+            min_rate: Lowest rate backoff can push the limiter to
+            recovery_step: Rate added back per successful response
+            base_backoff: First pause after a throttled response (seconds)
+            max_backoff: Longest pause after repeated throttling (seconds)
+            ctx: multiprocessing context used to create the shared state
+        """
+        ctx = ctx or multiprocessing.get_context()
+        self.max_rate = requests_per_second
+        self.burst = burst
+        self.min_rate = min(min_rate, requests_per_second)
+        self.recovery_step = recovery_step
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._state = ctx.Array('d', 8, lock=False)
+        self._state[_TOKENS] = float(burst)
+        self._state[_UPDATED] = time.time()
+        self._state[_RATE] = requests_per_second
+        self._lock = ctx.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token and return how long the caller must wait before using it.
+        Never blocks, so it can be used from asyncio code.
+        """
+        with self._lock:
+            state = self._state
+            now = time.time()
+            rate = state[_RATE]
+            state[_TOKENS] = min(self.burst, state[_TOKENS] + (now - state[_UPDATED]) * rate)
+            state[_UPDATED] = now
+
+            # Tokens may go negative: each reservation queues behind the previous one
+            state[_TOKENS] -= 1
+            delay = -state[_TOKENS] / rate if state[_TOKENS] < 0 else 0.0
+            delay = max(delay, state[_BLOCKED_UNTIL] - now)
+
+            state[_REQUESTS] += 1
+            state[_WAITED] += delay
+        return delay
+
+    def acquire(self) -> float:
+        """Block until the next request may be sent; returns seconds waited"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def record(self, status_code: int, retry_after=None):
+        """Adapt the rate to a response: back off on 429/503, recover otherwise"""
+        with self._lock:
+            state = self._state
+            if status_code in THROTTLE_STATUSES:
+                state[_STRIKES] += 1
+                state[_THROTTLED] += 1
+                state[_RATE] = max(self.min_rate, state[_RATE] / 2)
+
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = min(self.max_backoff, self.base_backoff * 2 ** (state[_STRIKES] - 1))
+                    delay *= random.uniform(0.5, 1.5)
+                state[_BLOCKED_UNTIL] = max(state[_BLOCKED_UNTIL], time.time() + delay)
+                # Empty bucket that only starts refilling once the pause is over,
+                # so waiting requests resume one by one instead of all at once
+                state[_TOKENS] = 0.0
+                state[_UPDATED] = max(state[_UPDATED], state[_BLOCKED_UNTIL])
+            elif status_code < 500:
+                state[_STRIKES] = 0
+                state[_RATE] = min(self.max_rate, state[_RATE] + self.recovery_step)
+
+    @property
+    def current_rate(self) -> float:
+        """Requests per second currently allowed"""
+        return self._state[_RATE]
+
+    def get_stats(self) -> Dict:
+        """Current rate and counters (across all processes)"""
+        with self._lock:
+            state = list(self._state)
+        return {
+            'current_rate': state[_RATE],
+            'max_rate': self.max_rate,
+            'requests': int(state[_REQUESTS]),
+            'throttled': int(state[_THROTTLED]),
+            'waited_seconds': state[_WAITED],
+            'blocked_for': max(0.0, state[_BLOCKED_UNTIL] - time.time()),
+        }
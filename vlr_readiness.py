@@ -0,0 +1,195 @@
+"""
+Event-driven page readiness for browser scrapes: wait on DOM conditions and
+mutation quiet periods instead of fixed sleeps, with per-condition latency
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from vlr_profiling import percentile
+
+READY_TIMEOUT = 5.0   # Seconds before a condition is given up on (the scrape carries on)
+READY_POLL = 0.05     # Seconds between condition checks
+QUIET_MS = 150        # DOM must be unchanged this long to count as settled
+QUIET_TIMEOUT = 0.5   # Seconds a quiet wait may take at most (the fixed sleeps it replaced were 0.5s)
+
+# Upper bounds (ms) of the latency histogram buckets; slower waits land in the last bucket
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Resolves once nothing in the document has changed for quietMs (true),
+# or with false once maxMs has passed without a quiet period
+_QUIET_SCRIPT = """
+var quietMs = arguments[0], maxMs = arguments[1], done = arguments[arguments.length - 1];
+var quietTimer = null, capTimer = null, observer = null;
+function finish(settled) {
+    if (observer) { observer.disconnect(); }
+    clearTimeout(quietTimer);
+    clearTimeout(capTimer);
+    done(settled);
+}
+observer = new MutationObserver(function () {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(function () { finish(true); }, quietMs);
+});
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, characterData: true,
+    attributes: true, attributeFilter: ['class', 'style']
+});
+quietTimer = setTimeout(function () { finish(true); }, quietMs);
+capTimer = setTimeout(function () { finish(false); }, maxMs);
+"""
+
+_STAT_TABLES_SCRIPT = """
+var tables = document.querySelectorAll('table.wf-table-inset');
+if (!arguments[0]) { return tables.length; }
+return Array.prototype.filter.call(tables, function (t) { return t.offsetParent !== null; }).length;
+"""
+
+_ACTIVE_TAB_SCRIPT = """
+var tab = document.querySelector('div.vm-stats-gamesnav-item.mod-active');
+return !!tab && tab.textContent.toLowerCase().indexOf(arguments[0]) !== -1;
+"""
+
+
+class LatencyHistogram:
+    """Wait times for one readiness condition"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.samples = []
+        self.timeouts = 0
+
+    def add(self, seconds: float, timed_out: bool = False):
+        ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound), len(LATENCY_BUCKETS_MS))
+        self.bucket_counts[bucket] += 1
+        self.samples.append(seconds)
+        if timed_out:
+            self.timeouts += 1
+
+    def summary(self) -> Dict:
+        """count, timeouts, p50/p95/max (seconds) and {'<=Nms': count} buckets"""
+        samples = sorted(self.samples)
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            'count': len(samples),
+            'timeouts': self.timeouts,
+            'p50': percentile(samples, 50),
+            'p95': percentile(samples, 95),
+            'max': samples[-1] if samples else 0.0,
+            'buckets': dict(zip(labels, self.bucket_counts)),
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def record_latency(name: str, seconds: float, timed_out: bool = False):
+    """Add one wait to the process-wide histogram of a condition"""
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = LatencyHistogram()
+        histogram.add(seconds, timed_out)
+
+
+def latency_report() -> Dict[str, Dict]:
+    """LatencyHistogram.summary() for every condition waited on in this process"""
+    with _histograms_lock:
+        return {name: histogram.summary() for name, histogram in _histograms.items()}
+
+
+def reset_latency():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def stat_tables_present(count: int = 2, visible_only: bool = False) -> Callable:
+    """Condition: at least `count` stat tables in the DOM (or shown, with visible_only)"""
+    def condition(driver):
+        return (driver.execute_script(_STAT_TABLES_SCRIPT, visible_only) or 0) >= count
+    return condition
+
+
+def active_tab(map_name: str) -> Callable:
+    """Condition: the selected map tab is the one for map_name"""
+    def condition(driver):
+        return bool(driver.execute_script(_ACTIVE_TAB_SCRIPT, map_name.lower()))
+    return condition
+
+
+class ReadinessWaiter:
+    """
+    Waits for a browser page to be ready using concrete conditions.
+
+    A wait that runs out of time is recorded as a timeout and returns False
+    rather than raising, so the scrape goes on just as it did after the
+    fixed sleeps these waits replace.
+    """
+
+    def __init__(self, driver, timeout: float = READY_TIMEOUT, poll: float = READY_POLL,
+                 quiet_ms: int = QUIET_MS, quiet_timeout: float = QUIET_TIMEOUT):
+        """
+        Args:
+            driver: Selenium WebDriver of the page
+            timeout: Seconds to wait for any one condition
+            poll: Seconds between condition checks
+            quiet_ms: Mutation-free period that counts as settled
+            quiet_timeout: Seconds to wait for a quiet period
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+        self.quiet_ms = quiet_ms
+        self.quiet_timeout = quiet_timeout
+
+    def until(self, name: str, condition: Callable, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until condition(driver) is truthy
+        Args:
+            name: Histogram the latency is recorded under
+            condition: Callable(driver) -> bool, e.g. stat_tables_present()
+            timeout: Override of the waiter's timeout
+        Returns:
+            True once the condition held, False on timeout
+        """
+        start = time.perf_counter()
+        try:
+            WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.poll).until(condition)
+            ready = True
+        except TimeoutException:
+            ready = False
+        record_latency(name, time.perf_counter() - start, timed_out=not ready)
+        return ready
+
+    def quiet(self, name: str, quiet_ms: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the DOM has not changed for quiet_ms (one MutationObserver
+        script call, so no polling round trips). Pages with live widgets may
+        never go quiet, so this gives up after quiet_timeout, not the
+        condition timeout.
+        Returns:
+            True once the page was quiet, False if it kept changing until the timeout
+        """
+        start = time.perf_counter()
+        max_ms = int((timeout or self.quiet_timeout) * 1000)
+        try:
+            settled = bool(self.driver.execute_async_script(_QUIET_SCRIPT, quiet_ms or self.quiet_ms, max_ms))
+        except TimeoutException:
+            settled = False
+        record_latency(name, time.perf_counter() - start, timed_out=not settled)
+        return settled
+
+
+def format_latency_report(report: Optional[Dict[str, Dict]] = None) -> str:
+    """One line per condition: count, p50/p95/max and timeouts"""
+    report = latency_report() if report is None else report
+    return "\n".join(
+        f"{name:20} {row['count']:5} waits  p50 {row['p50'] * 1000:6.0f}ms  p95 {row['p95'] * 1000:6.0f}ms  "
+        f"max {row['max'] * 1000:6.0f}ms  timeouts {row['timeouts']}"
+        for name, row in report.items()
+    )
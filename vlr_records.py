@@ -0,0 +1,213 @@
+"""
+Compact record types for the rows of a scraped match (player stats, maps, rounds)
+"""
+import sys
+import tracemalloc
+from collections.abc import Mapping, MutableMapping
+from typing import Callable, Dict, Iterator
+
+
+_get_slot = object.__getattribute__
+_set_slot = object.__setattr__
+
+
+class SlotRecord(MutableMapping):
+    """
+    Fixed-field record stored in __slots__ instead of a per-row dict.
+
+    Behaves like the dicts the scraper used to build: rec['kills'],
+    rec.get('kills', 0), 'player_region' in rec, iteration and == against
+    dicts all work, and a field that was never set is missing (not None),
+    so existing .get() defaults keep their meaning. Fields can also be read
+    as attributes (rec.kills), which gives None for unset fields. Keys that
+    are not fields go into a small overflow dict, so callers can still
+    attach extra data. Records pickle to their set fields only.
+    """
+
+    __slots__ = ('_extra',)
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = cls.FIELDS + tuple(cls.__dict__.get('__slots__', ()))
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, **values):
+        for key, value in values.items():
+            self[key] = value
+
+    def __getattr__(self, name):
+        # Only reached for slots that were never assigned
+        if name in self._FIELD_SET:
+            return None
+        if name == '_extra':
+            return None
+        raise AttributeError(f"{type(self).__name__!r} has no attribute {name!r}")
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                return _get_slot(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._FIELD_SET:
+            try:
+                return _get_slot(self, key)
+            except AttributeError:
+                return default
+        extra = self._extra
+        return extra.get(key, default) if extra is not None else default
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            _set_slot(self, key, value)
+        else:
+            if self._extra is None:
+                _set_slot(self, '_extra', {})
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                object.__delattr__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                _get_slot(self, key)
+                return True
+            except AttributeError:
+                return False
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self.FIELDS:
+            try:
+                _get_slot(self, field)
+            except AttributeError:
+                continue
+            yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        return (self.__class__, (), dict(self))
+
+    def __setstate__(self, state):
+        self.update(state)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class PlayerMapStat(SlotRecord):
+    """One player's stat line on one map (map_name 'Overall' for the match aggregate)"""
+    __slots__ = ('team_name', 'map_name', 'player_ign', 'player_url', 'agent',
+                 'rating', 'acs', 'kills', 'deaths', 'assists', 'plus_minus',
+                 'kast_percent', 'adr', 'hs_percent', 'first_kills', 'first_deaths',
+                 'player_region', 'team_join_date', 'econ_rating', 'plants', 'defuses',
+                 'sides')
+
+
+class RoundRecord(SlotRecord):
+    """Result of one round"""
+    __slots__ = ('round_number', 'winner', 'win_type')
+
+
+class MapRecord(SlotRecord):
+    """One played map with its score, halves and rounds"""
+    __slots__ = ('map_number', 'game_id', 'map_name', 'pick_type', 'duration',
+                 'team1_score', 'team2_score',
+                 'team1_half1', 'team1_half2', 'team2_half1', 'team2_half2',
+                 'team1_attack_rounds', 'team1_defense_rounds',
+                 'team2_attack_rounds', 'team2_defense_rounds',
+                 'rounds', 'economy', 'multikills', 'clutches')
+
+
+class MatchStub(SlotRecord):
+    """What a results-page card shows about a match, before its page is scraped"""
+    __slots__ = ('url', 'vlr_match_id', 'match_date', 'match_time',
+                 'team1_name', 'team2_name', 'team1_score', 'team2_score',
+                 'team1_country', 'team2_country', 'event_name', 'event_series', 'status')
+
+
+def to_plain(value):
+    """Deep-copy a structure into plain dicts and lists (e.g. for json.dump)"""
+    if isinstance(value, Mapping):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def measure_memory(build: Callable[[], object]) -> int:
+    """Bytes still allocated by whatever build() returns, measured with tracemalloc"""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+        del result
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return size
+
+
+def compare_memory(match_data: Dict, copies: int = 1000) -> Dict[str, int]:
+    """
+    Memory for `copies` copies of a match's maps, rounds and player stats,
+    held as records versus as plain dicts
+    Returns:
+        {'records': bytes, 'dicts': bytes}
+    """
+    rows = {'maps': match_data.get('maps', []), 'player_stats': match_data.get('player_stats', [])}
+    plain = to_plain(rows)
+
+    def as_records():
+        return [{
+            'maps': [MapRecord(**{**m, 'rounds': [RoundRecord(**r) for r in m.get('rounds', [])]})
+                     for m in plain['maps']],
+            'player_stats': [PlayerMapStat(**s) for s in plain['player_stats']],
+        } for _ in range(copies)]
+
+    def as_dicts():
+        return [to_plain(plain) for _ in range(copies)]
+
+    return {'records': measure_memory(as_records), 'dicts': measure_memory(as_dicts)}
+
+
+if __name__ == "__main__":
+    # Usage: python vlr_records.py saved_match_page.html [copies]
+    from vlr_scraper_enhanced import VLRScraper
+
+    with open(sys.argv[1], encoding='utf-8') as f:
+        html = f.read()
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    scraper = VLRScraper(start_driver=False, detail_fetch='none')
+    match_data = scraper.parse_match_html('', html)
+    sizes = compare_memory(match_data, copies)
+    print(f"{copies} matches ({len(match_data['player_stats'])} stat rows, "
+          f"{len(match_data['maps'])} maps each)")
+    print(f"  dicts:   {sizes['dicts'] / 1024 / 1024:8.1f} MB")
+    print(f"  records: {sizes['records'] / 1024 / 1024:8.1f} MB "
+          f"({1 - sizes['records'] / sizes['dicts']:.0%} less)")
@@ -9,30 +9,104 @@ from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.firefox.options import Options
 from webdriver_manager.firefox import GeckoDriverManager
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import os
 import time
 import re
-import requests
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from vlr_http import archive_page, fetch_html, wait_for_slot
+from vlr_entity_registry import EntityRegistry
+from vlr_html_parser import make_soup
+from vlr_records import MapRecord, MatchStub, PlayerMapStat, RoundRecord
+from vlr_aggregate import aggregate_player_stats
+from vlr_lean_browser import apply_lean_options, browser_cache_dir
+from vlr_match_tabs import MATCH_TABS, apply_match_tabs, parse_economy, parse_performance, tab_url
+from vlr_readiness import ReadinessWaiter, active_tab, stat_tables_present
+from vlr_match_stubs import parse_results_page
+
+
+# Site root for every scraped URL; point it at a local stand-in (vlr_mock_server) to benchmark
+VLR_BASE_URL = os.environ.get('VLR_BASE_URL', 'https://www.vlr.gg').rstrip('/')
+
+# Scoreboard stat cells in column order, with how each side's value is read
+SIDE_STAT_COLUMNS = (
+    ('rating', float), ('acs', int), ('kills', int), ('deaths', int), ('assists', int),
+    ('plus_minus', int), ('kast_percent', float), ('adr', float), ('hs_percent', float),
+    ('first_kills', int), ('first_deaths', int),
+)
+
+# Side classes used by scoreboard cells and map headers -> side name stored in the database
+SIDES = (('mod-t', 'Attack'), ('mod-ct', 'Defense'))
 
 
 class VLRScraper:
     """Enhanced scraper for VLR.gg match data"""
     
-    def __init__(self, headless: bool = False):
-        """Initialize the scraper with Selenium WebDriver"""
+    def __init__(self, headless: bool = False, driver=None, start_driver: bool = True,
+                 detail_fetch: str = 'sync', registry: Optional[EntityRegistry] = None,
+                 parser_backend: Optional[str] = None, lean_browser: bool = False,
+                 match_tabs: bool = False):
+        """
+        Initialize the scraper with Selenium WebDriver
+        Args:
+            headless: Run Firefox without a visible window
+            driver: Existing WebDriver to borrow (e.g. from a BrowserPool).
+                    A borrowed driver is never quit by close().
+            start_driver: If False, Firefox is only started when a browser
+                          scrape actually needs it (static scraping needs none)
+            detail_fetch: How team/tournament/player pages are fetched:
+                          'sync' (one after another), 'async' (all at once) or
+                          'none' (left to the caller, e.g. AsyncDetailEnricher
+                          over a batch of matches)
+            registry: EntityRegistry shared across scrapers so teams, tournaments
+                      and players are only enriched once per run
+            parser_backend: HTML parser ('html.parser', 'lxml' or 'selectolax');
+                            None uses vlr_html_parser's default
+            lean_browser: Start Firefox with the lean profile (no images,
+                          third-party requests or animations, eager page loads)
+            match_tabs: Also fetch the economy and performance tabs (two extra
+                        HTTP requests, sent while the match page loads)
+        """
 
-        self.driver = None
+        self.driver = driver
         self.headless = headless
-        self._setup_driver()
+        self.detail_fetch = detail_fetch
+        self.registry = registry if registry is not None else EntityRegistry()
+        self.parser_backend = parser_backend
+        self.lean_browser = lean_browser
+        self.match_tabs = match_tabs
+        self._tab_executor = None
+        self.last_stage_timings = {}
+        self._owns_driver = driver is None
+        if self.driver is None and start_driver:
+            self._setup_driver()
     
     def _setup_driver(self):
         """Setup Selenium WebDriver with Firefox"""
+        self.driver = self.build_driver(self.headless, lean=self.lean_browser)
+    
+    def _ensure_driver(self):
+        """Start the WebDriver if this scraper was created without one"""
+        if self.driver is None:
+            self._owns_driver = True
+            self._setup_driver()
+    
+    @staticmethod
+    def build_driver(headless: bool = False, lean: bool = False, cache_slot: int = 0):
+        """
+        Create a new Firefox WebDriver instance
+        Args:
+            headless: Run Firefox without a visible window
+            lean: Use the lean profile from vlr_lean_browser
+            cache_slot: Which persistent disk cache a lean browser uses (e.g. pool slot)
+        """
         try:
             firefox_options = Options()
-            if self.headless:
+            if headless:
                 firefox_options.add_argument('-headless')
                 firefox_options.add_argument('--no-sandbox')
                 firefox_options.add_argument('--disable-setuid-sandbox')
@@ -41,14 +115,34 @@ class VLRScraper:
                 firefox_options.add_argument('--window-size=1920,1080')
                 firefox_options.add_argument('--disable-extensions')
                 firefox_options.set_preference("general.useragent.override", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+            if lean:
+                apply_lean_options(firefox_options, browser_cache_dir(cache_slot))
 
             service = Service(GeckoDriverManager().install())
-            self.driver = webdriver.Firefox(service=service, options=firefox_options)
-            print("WebDriver initialized successfully using Firefox")
+            driver = webdriver.Firefox(service=service, options=firefox_options)
+            print(f"WebDriver initialized successfully using Firefox{' (lean profile)' if lean else ''}")
+            return driver
         except Exception as e:
             print(f"Failed to initialize WebDriver: {e}")
             raise
     
+    def _soup(self, html: str):
+        """Parse HTML with this scraper's parser backend"""
+        return make_soup(html, self.parser_backend)
+    
+    @contextmanager
+    def _stage(self, name: str):
+        """
+        Add the time spent in a scrape stage to last_stage_timings (seconds).
+        Dotted names ('load.navigate') are sub-stages of the part before the dot.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = self.last_stage_timings
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+    
     def __enter__(self):
         """Context manager entry"""
         return self
@@ -58,53 +152,47 @@ class VLRScraper:
         self.close()
     
     def close(self):
-        """Close the WebDriver"""
-        if self.driver:
+        """Close the WebDriver (borrowed drivers are left running for their owner)"""
+        if self.driver and self._owns_driver:
             self.driver.quit()
             print("WebDriver closed")
+        self.driver = None
+        if self._tab_executor is not None:
+            self._tab_executor.shutdown(wait=False)
+            self._tab_executor = None
 
     def get_match_links_by_page(self, page_number: int) -> List[str]:
         """
-        Get match links from VLR.gg results page using requests + BeautifulSoup
+        Get match links from VLR.gg results page over HTTP (vlr_http) + BeautifulSoup
         """
-        return self.get_match_links_by_page_static(page_number)
+        return self.get_match_links_by_page_static(page_number, self.parser_backend)
     
     @staticmethod
-    def get_match_links_by_page_static(page_number: int) -> List[str]:
+    def get_match_links_by_page_static(page_number: int, parser_backend: Optional[str] = None) -> List[str]:
         """
         Static method to get match links without requiring a WebDriver instance
         """
-        base_url = "https://www.vlr.gg/matches/results"
+        stubs = VLRScraper.get_match_stubs_by_page_static(page_number, parser_backend)
+        return list({stub['url'] for stub in stubs})
+    
+    @staticmethod
+    def get_match_stubs_by_page_static(page_number: int, parser_backend: Optional[str] = None) -> List[MatchStub]:
+        """
+        Match stubs (teams, score, event, date, status) from one results page
+        Args:
+            page_number: Results page number
+            parser_backend: HTML parser backend
+        Returns:
+            MatchStub per match in page order (empty if the page could not be fetched)
+        """
+        base_url = f"{VLR_BASE_URL}/matches/results"
         full_url = f"{base_url}?page={page_number}"
         
         print(f"Loading results page: {full_url}")
         
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-            }
-            
-            response = requests.get(full_url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            match_links = []
-            all_links = soup.find_all('a', href=True)
-            
-            for link in all_links:
-                href = link.get('href', '')
-                if re.match(r'^/\d+.*vs.*', href):
-                    full_url = 'https://www.vlr.gg' + href
-                    match_links.append(full_url)
-            
-            unique_links = list(set(match_links))
-            
-            return unique_links
+            html = fetch_html(full_url, timeout=30)
+            return parse_results_page(html, VLR_BASE_URL, parser_backend)
             
         except Exception as e:
             print(f"❌ Error fetching page {page_number}: {e}")
@@ -118,187 +206,401 @@ class VLRScraper:
         Returns:
             Dictionary containing all match data
         """
+        self.last_stage_timings = {}
         try:
-            pass
-            self.driver.get(match_url)
+            tab_fetches = self._start_tab_fetches(match_url)
+            with self._stage('load'):
+                with self._stage('load.driver'):
+                    self._ensure_driver()
+                with self._stage('load.rate_limit'):
+                    wait_for_slot()
+                with self._stage('load.navigate'):
+                    self.driver.get(match_url)
+                
+                with self._stage('load.wait_header'):
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.CLASS_NAME, "match-header"))
+                    )
+                ready = ReadinessWaiter(self.driver)
+                
+                # Click spoiler button if exists
+                with self._stage('load.spoiler'):
+                    try:
+                        spoiler_btn = self.driver.find_element(By.CLASS_NAME, 'js-spoiler')
+                        if spoiler_btn and 'spoiler' in spoiler_btn.get_attribute('class'):
+                            spoiler_btn.click()
+                            ready.quiet('spoiler')
+                    except:
+                        pass
+                
+                # Stat tables in place (page_source reads them from the DOM as-is)
+                with self._stage('load.settle'):
+                    ready.until('stat_tables', stat_tables_present())
+                with self._stage('load.page_source'):
+                    page_source = self.driver.page_source
+                    archive_page(match_url, page_source)
             
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "match-header"))
-            )
+            with self._stage('parse'):
+                soup = self._soup(page_source)
             
-            # Click spoiler button if exists
-            try:
-                spoiler_btn = self.driver.find_element(By.CLASS_NAME, 'js-spoiler')
-                if spoiler_btn and 'spoiler' in spoiler_btn.get_attribute('class'):
-                    spoiler_btn.click()
-                    time.sleep(0.5)
-            except:
-                pass
+            def player_stats_single_parse(team1_name, team2_name, maps_data):
+                # Every map's tables are already in page_source; only click
+                # through the tabs if the parsed tree is missing some of them
+                stats = self._extract_player_stats_from_soup(soup, team1_name, team2_name, maps_data)
+                if self._stats_complete(stats, maps_data):
+                    return stats
+                print("  Stat tables incomplete in page source, switching map tabs")
+                with self._stage('player_stats.tabs'):
+                    return self._extract_player_stats_all_maps(team1_name, team2_name, maps_data)
             
-            time.sleep(2)
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            return self._build_match_data(match_url, soup, player_stats_single_parse, tab_fetches)
             
-            # Extract data
+        except Exception as e:
+            print(f"Failed to scrape match: {e}")
+            raise
+    
+    def scrape_match_static(self, match_url: str) -> Dict:
+        """
+        Scrape complete match data with a single HTTP request and no browser.
+        
+        The server-rendered page already contains every map's stat tables
+        (tabs only toggle their visibility), so they are read straight from
+        the same soup as the header and map data.
+        Args:
+            match_url: URL of the match page
+        Returns:
+            Dictionary with the same schema as scrape_match
+        """
+        self.last_stage_timings = {}
+        tab_fetches = self._start_tab_fetches(match_url)
+        with self._stage('load'):
+            html = fetch_html(match_url, timeout=10)
+        return self._parse_match_html(match_url, html, tab_fetches)
+    
+    def parse_match_html(self, match_url: str, html: str) -> Dict:
+        """
+        Build match_data from the HTML of a match page (no browser needed)
+        Args:
+            match_url: URL the page was fetched from
+            html: Server-rendered match page
+        """
+        self.last_stage_timings = {}
+        return self._parse_match_html(match_url, html)
+    
+    def _parse_match_html(self, match_url: str, html: str, tab_fetches: Optional[Dict] = None) -> Dict:
+        """parse_match_html without resetting the stage timings"""
+        if tab_fetches is None:
+            tab_fetches = self._start_tab_fetches(match_url)
+        with self._stage('parse'):
+            soup = self._soup(html)
+        
+        def player_stats_from_soup(team1_name, team2_name, maps_data):
+            return self._extract_player_stats_from_soup(soup, team1_name, team2_name, maps_data)
+        
+        return self._build_match_data(match_url, soup, player_stats_from_soup, tab_fetches)
+    
+    def scrape_match_auto(self, match_url: str, browser_pool=None) -> Dict:
+        """
+        Scrape a match statically, falling back to Selenium if the result fails validation
+        Args:
+            match_url: URL of the match page
+            browser_pool: Optional BrowserPool to borrow the fallback browser from;
+                          otherwise this scraper starts its own driver
+        """
+        static_start = time.perf_counter()
+        try:
+            match_data = self.scrape_match_static(match_url)
+            problems = self.validate_match_data(match_data)
+        except Exception as e:
+            problems = [f"static fetch failed: {e}"]
+        
+        if not problems:
+            return match_data
+        
+        print(f"  Static parse incomplete ({'; '.join(problems[:3])}), using browser")
+        static_time = time.perf_counter() - static_start
+        if browser_pool is not None:
+            with browser_pool.scraper() as scraper:
+                match_data = scraper.scrape_match(match_url)
+        else:
+            match_data = self.scrape_match(match_url)
+        # Keep the cost of the discarded static attempt in the browser result
+        match_data.setdefault('stage_timings', {})['static_attempt'] = static_time
+        return match_data
+    
+    @staticmethod
+    def validate_match_data(match_data: Dict) -> List[str]:
+        """
+        Check that a scraped match is complete enough to insert
+        Returns:
+            List of problems (empty if the match looks complete)
+        """
+        problems = []
+        
+        teams = match_data.get('teams', {})
+        for team_key in ('team1', 'team2'):
+            if not teams.get(team_key, {}).get('name'):
+                problems.append(f"missing {team_key} name")
+        
+        maps_data = match_data.get('maps', [])
+        if not maps_data:
+            problems.append("no maps found")
+        
+        per_map_counts = {}
+        for stat in match_data.get('player_stats', []):
+            if stat.get('map_name') == 'Overall':
+                continue
+            if stat.get('kills') is None or stat.get('deaths') is None:
+                problems.append(f"incomplete stats for {stat.get('player_ign')} on {stat.get('map_name')}")
+            per_map_counts[stat.get('map_name')] = per_map_counts.get(stat.get('map_name'), 0) + 1
+        
+        for map_data in maps_data:
+            count = per_map_counts.get(map_data.get('map_name'), 0)
+            if count != 10:
+                problems.append(f"{count} player rows on {map_data.get('map_name')} (expected 10)")
+        
+        return problems
+    
+    @staticmethod
+    def _stats_complete(player_stats: List[Dict], maps_data: List[Dict]) -> bool:
+        """True if every map has 10 player rows"""
+        if not maps_data:
+            return False
+        per_map_counts = {}
+        for stat in player_stats:
+            per_map_counts[stat.get('map_name')] = per_map_counts.get(stat.get('map_name'), 0) + 1
+        return all(per_map_counts.get(m.get('map_name'), 0) == 10 for m in maps_data)
+    
+    def _build_match_data(self, match_url: str, soup: BeautifulSoup, extract_player_stats,
+                          tab_fetches: Optional[Dict] = None) -> Dict:
+        """
+        Assemble match_data from a parsed match page
+        Args:
+            match_url: URL of the match page
+            soup: Parsed match page
+            extract_player_stats: Callable(team1_name, team2_name, maps_data) -> per-map player stats
+            tab_fetches: Pending tab downloads from _start_tab_fetches, if any
+        """
+        # Extract data
+        with self._stage('header'):
             match_info = self._extract_match_info(soup)
             teams_data = self._extract_teams(soup)
+        with self._stage('maps'):
             maps_data = self._extract_maps(soup)
-            
-            # Scrape team details (region, etc.)
-            team1_details = self._scrape_team_details(teams_data['team1'].get('url'))
-            team2_details = self._scrape_team_details(teams_data['team2'].get('url'))
-            
-            # DEBUG: Print what was scraped before update
-            
-            teams_data['team1'].update(team1_details)
-            teams_data['team2'].update(team2_details)
-            
-            # DEBUG: Print teams_data after update
-            
-            # Scrape tournament details
-            tournament_url = match_info.get('tournament_url')
-            if tournament_url:
-                tournament_details = self._scrape_tournament_details(tournament_url)
-                match_info.update(tournament_details)
-            
-            team1_name = teams_data['team1'].get('name', 'Team 1')
-            team2_name = teams_data['team2'].get('name', 'Team 2')
-            
-            # Recalculate scores based on map data
-            team1_wins = sum(1 for m in maps_data if m.get('team1_score', 0) > m.get('team2_score', 0))
-            team2_wins = sum(1 for m in maps_data if m.get('team2_score', 0) > m.get('team1_score', 0))
-            teams_data['team1']['score'] = team1_wins
-            teams_data['team2']['score'] = team2_wins
+        
+        if self.detail_fetch == 'sync':
+            with self._stage('details'):
+                # Scrape team details (region, etc.)
+                with self._stage('details.teams'):
+                    team1_details = self._scrape_team_details(teams_data['team1'].get('url'))
+                    team2_details = self._scrape_team_details(teams_data['team2'].get('url'))
+                
+                teams_data['team1'].update(team1_details)
+                teams_data['team2'].update(team2_details)
+                
+                # Scrape tournament details
+                tournament_url = match_info.get('tournament_url')
+                if tournament_url:
+                    with self._stage('details.tournament'):
+                        tournament_details = self._scrape_tournament_details(tournament_url)
+                    match_info.update(tournament_details)
+        
+        team1_name = teams_data['team1'].get('name', 'Team 1')
+        team2_name = teams_data['team2'].get('name', 'Team 2')
+        
+        # Recalculate scores based on map data
+        team1_wins = sum(1 for m in maps_data if m.get('team1_score', 0) > m.get('team2_score', 0))
+        team2_wins = sum(1 for m in maps_data if m.get('team2_score', 0) > m.get('team1_score', 0))
+        teams_data['team1']['score'] = team1_wins
+        teams_data['team2']['score'] = team2_wins
 
-            
-            # Extract player stats
-            player_stats = self._extract_player_stats_all_maps(team1_name, team2_name, maps_data)
-            
-            # Scrape player details (region, team join date)
-            player_stats = self._enrich_player_stats(player_stats, team1_name, team2_name)
-            
-            # Add aggregated overall stats
+        
+        # Extract player stats
+        with self._stage('player_stats'):
+            player_stats = extract_player_stats(team1_name, team2_name, maps_data)
+        
+        # Scrape player details (region, team join date)
+        if self.detail_fetch == 'sync':
+            with self._stage('details'), self._stage('details.players'):
+                player_stats = self._enrich_player_stats(player_stats, team1_name, team2_name)
+        
+        # Add aggregated overall stats
+        with self._stage('aggregate'):
             overall_stats = aggregate_player_stats(player_stats)
             all_stats = overall_stats + player_stats
-            
-            match_data = {
-                'url': match_url,
-                'match_info': match_info,
-                'teams': teams_data,
-                'maps': maps_data,
-                'player_stats': all_stats,
-            }
-            
-            return match_data
-            
-        except Exception as e:
-            print(f"Failed to scrape match: {e}")
-            raise
+        
+        match_data = {
+            'url': match_url,
+            'match_info': match_info,
+            'teams': teams_data,
+            'maps': maps_data,
+            'player_stats': all_stats,
+        }
+        
+        if tab_fetches:
+            with self._stage('tabs'):
+                self._apply_match_tabs(match_data, tab_fetches)
+        
+        if self.detail_fetch == 'async':
+            # Fetch all team, tournament and player pages concurrently
+            from vlr_async_enrich import AsyncDetailEnricher
+            with self._stage('details'):
+                AsyncDetailEnricher(self).enrich([match_data])
+        
+        # Travels with the match so worker processes can report it too
+        match_data['stage_timings'] = dict(self.last_stage_timings)
+        return match_data
+    
+    def _start_tab_fetches(self, match_url: str) -> Dict:
+        """Start downloading the economy and performance tabs in the background (if enabled)"""
+        if not self.match_tabs or not match_url:
+            return {}
+        if self._tab_executor is None:
+            self._tab_executor = ThreadPoolExecutor(max_workers=len(MATCH_TABS), thread_name_prefix='vlr-tabs')
+        return {tab: self._tab_executor.submit(fetch_html, tab_url(match_url, tab), 10) for tab in MATCH_TABS}
+    
+    def _apply_match_tabs(self, match_data: Dict, tab_fetches: Dict):
+        """Parse the downloaded tabs into match_data; a failed tab is skipped, not fatal"""
+        pages = {}
+        for tab, future in tab_fetches.items():
+            try:
+                pages[tab] = future.result()
+            except Exception as e:
+                print(f"  Could not fetch {tab} tab: {e}")
+        
+        economy = parse_economy(pages['economy'], self.parser_backend) if 'economy' in pages else None
+        performance = parse_performance(pages['performance'], self.parser_backend) if 'performance' in pages else None
+        apply_match_tabs(match_data, economy, performance)
     
     def _scrape_team_details(self, team_url: str) -> Dict:
         """
         Scrape team page for region and other details
         """
-        details = {'region': None, 'logo_url': None}
-        
         if not team_url:
-            return details
+            return {'region': None, 'logo_url': None}
+        
+        cached = self.registry.get('team', team_url)
+        if cached is not None:
+            return cached
         
         try:
-            pass
-            response = requests.get(team_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract region from team header
-            region_div = soup.find('div', class_='team-header-country')
-            if region_div:
-                region_text = region_div.text.strip()
-                details['region'] = region_text
-                print(f"    Region: {region_text}")
-            
-            # Extract logo URL
-            logo_img = soup.find('img', class_='team-header-logo')
-            if logo_img and logo_img.get('src'):
-                details['logo_url'] = logo_img.get('src')
-            
+            details = self._parse_team_details(fetch_html(team_url, timeout=10))
+            self.registry.put('team', team_url, details)
+            return details
         except Exception as e:
             print(f"    Warning: Could not fetch team details: {e}")
         
+        return {'region': None, 'logo_url': None}
+    
+    def _parse_team_details(self, html: str) -> Dict:
+        """Parse region and logo from a team page"""
+        details = {'region': None, 'logo_url': None}
+        soup = self._soup(html)
+        
+        # Extract region from team header
+        region_div = soup.find('div', class_='team-header-country')
+        if region_div:
+            region_text = region_div.text.strip()
+            details['region'] = region_text
+            print(f"    Region: {region_text}")
+        
+        # Extract logo URL
+        logo_img = soup.find('img', class_='team-header-logo')
+        if logo_img and logo_img.get('src'):
+            details['logo_url'] = logo_img.get('src')
+        
         return details
     
-    def _scrape_tournament_details(self, tournament_url: str) -> Dict:
-        """
-        Scrape tournament page for prize pool, dates, participating teams
-        """
-        details = {
+    @staticmethod
+    def _is_valid_tournament_url(tournament_url: str) -> bool:
+        """Check that a tournament URL points at an /event/ page"""
+        if not tournament_url:
+            print(f"    Warning: No tournament URL provided")
+            return False
+        
+        if '/event/' not in tournament_url:
+            print(f"    Warning: Invalid tournament URL (no /event/): {tournament_url}")
+            return False
+        
+        return True
+    
+    @staticmethod
+    def _empty_tournament_details() -> Dict:
+        """Default tournament details when nothing could be scraped"""
+        return {
             'tournament_prize_pool': None,
             'tournament_start_date': None,
             'tournament_end_date': None,
             'tournament_teams': []
         }
+    
+    def _scrape_tournament_details(self, tournament_url: str) -> Dict:
+        """
+        Scrape tournament page for prize pool, dates, participating teams
+        """
+        if not self._is_valid_tournament_url(tournament_url):
+            return self._empty_tournament_details()
         
-        if not tournament_url:
-            print(f"    Warning: No tournament URL provided")
-            return details
-        
-        # Validate the URL
-        if '/event/' not in tournament_url:
-            print(f"    Warning: Invalid tournament URL (no /event/): {tournament_url}")
-            return details
+        cached = self.registry.get('tournament', tournament_url)
+        if cached is not None:
+            return cached
         
         try:
-            pass
-            response = requests.get(tournament_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract prize pool
-            prize_elem = soup.find('div', class_='event-prize')
-            if prize_elem:
-                prize_text = prize_elem.text.strip()
-                # Extract numeric value from prize (e.g., "$100,000" -> 100000)
-                prize_match = re.search(r'[\d,]+', prize_text.replace('$', ''))
-                if prize_match:
-                    prize_str = prize_match.group().replace(',', '')
-                    try:
-                        details['tournament_prize_pool'] = int(prize_str)
-                        print(f"    Prize Pool: ${details['tournament_prize_pool']:,}")
-                    except ValueError:
-                        pass
-            
-            # Extract dates
-            dates_elem = soup.find('div', class_='event-dates')
-            if dates_elem:
-                dates_text = dates_elem.text.strip()
-                # Try to parse dates like "Jul 1 - Aug 15, 2024"
-                date_match = re.search(r'([A-Z][a-z]{2}\s+\d+)\s*-\s*([A-Z][a-z]{2}\s+\d+),?\s*(\d{4})', dates_text)
-                if date_match:
-                    try:
-                        start_str = f"{date_match.group(1)} {date_match.group(3)}"
-                        end_str = f"{date_match.group(2)} {date_match.group(3)}"
-                        details['tournament_start_date'] = datetime.strptime(start_str, '%b %d %Y').date()
-                        details['tournament_end_date'] = datetime.strptime(end_str, '%b %d %Y').date()
-                        print(f"    Dates: {details['tournament_start_date']} to {details['tournament_end_date']}")
-                    except ValueError as e:
-                        print(f"    Warning: Could not parse dates: {e}")
-            
-            # Extract participating teams
-            team_links = soup.find_all('a', href=re.compile(r'^/team/\d+'))
-            team_names = []
-            for link in team_links:
-                team_name_elem = link.find('div', class_='text-of')
-                if team_name_elem:
-                    team_name = team_name_elem.text.strip()
-                    if team_name and team_name not in team_names:
-                        team_names.append(team_name)
-            
-            details['tournament_teams'] = team_names[:16]  # Limit to reasonable number
-            if details['tournament_teams']:
-                pass
-            
+            details = self._parse_tournament_details(fetch_html(tournament_url, timeout=10))
+            self.registry.put('tournament', tournament_url, details)
+            return details
         except Exception as e:
             print(f"    Warning: Could not fetch tournament details: {e}")
         
+        return self._empty_tournament_details()
+    
+    def _parse_tournament_details(self, html: str) -> Dict:
+        """Parse prize pool, dates and participating teams from an event page"""
+        details = self._empty_tournament_details()
+        soup = self._soup(html)
+        
+        # Extract prize pool
+        prize_elem = soup.find('div', class_='event-prize')
+        if prize_elem:
+            prize_text = prize_elem.text.strip()
+            # Extract numeric value from prize (e.g., "$100,000" -> 100000)
+            prize_match = re.search(r'[\d,]+', prize_text.replace('$', ''))
+            if prize_match:
+                prize_str = prize_match.group().replace(',', '')
+                try:
+                    details['tournament_prize_pool'] = int(prize_str)
+                    print(f"    Prize Pool: ${details['tournament_prize_pool']:,}")
+                except ValueError:
+                    pass
+        
+        # Extract dates
+        dates_elem = soup.find('div', class_='event-dates')
+        if dates_elem:
+            dates_text = dates_elem.text.strip()
+            # Try to parse dates like "Jul 1 - Aug 15, 2024"
+            date_match = re.search(r'([A-Z][a-z]{2}\s+\d+)\s*-\s*([A-Z][a-z]{2}\s+\d+),?\s*(\d{4})', dates_text)
+            if date_match:
+                try:
+                    start_str = f"{date_match.group(1)} {date_match.group(3)}"
+                    end_str = f"{date_match.group(2)} {date_match.group(3)}"
+                    details['tournament_start_date'] = datetime.strptime(start_str, '%b %d %Y').date()
+                    details['tournament_end_date'] = datetime.strptime(end_str, '%b %d %Y').date()
+                    print(f"    Dates: {details['tournament_start_date']} to {details['tournament_end_date']}")
+                except ValueError as e:
+                    print(f"    Warning: Could not parse dates: {e}")
+        
+        # Extract participating teams
+        team_links = soup.find_all('a', href=re.compile(r'^/team/\d+'))
+        team_names = []
+        for link in team_links:
+            team_name_elem = link.find('div', class_='text-of')
+            if team_name_elem:
+                team_name = team_name_elem.text.strip()
+                if team_name and team_name not in team_names:
+                    team_names.append(team_name)
+        
+        details['tournament_teams'] = team_names[:16]  # Limit to reasonable number
+        
         return details
     
     def _enrich_player_stats(self, player_stats: List[Dict], team1_name: str, team2_name: str) -> List[Dict]:
@@ -309,60 +611,77 @@ class VLRScraper:
         
         for stat in player_stats:
             player_url = stat.get('player_url')
-            if not player_url or player_url in player_cache:
-                if player_url in player_cache:
-                    stat.update(player_cache[player_url])
+            if not player_url:
                 continue
             
-            try:
-                response = requests.get(player_url, timeout=5)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract player region
-                country_elem = soup.find('div', class_='ge-flag')
-                if country_elem:
-                    country_text = country_elem.text.strip()
-                    stat['player_region'] = country_text
-                else:
-                    stat['player_region'] = 'Unknown'
-                
-                # Extract team join date (if available)
-                # Look in player history for current team
-                current_team = stat.get('team_name')
-                team_history = soup.find_all('div', class_='wf-card')
-                
-                for card in team_history:
-                    team_link = card.find('a', href=re.compile(r'^/team/'))
-                    if team_link:
-                        team_name_elem = team_link.find('div', class_='text-of')
-                        if team_name_elem and team_name_elem.text.strip() == current_team:
-                            # Try to find date
-                            date_elem = card.find('div', class_='player-summary-join-date')
-                            if date_elem:
-                                date_text = date_elem.text.strip()
-                                try:
-                                    # Parse date like "Jan 15, 2024"
-                                    join_date = datetime.strptime(date_text, '%b %d, %Y').date()
-                                    stat['team_join_date'] = join_date
-                                except ValueError:
-                                    pass
-                            break
-                
-                # Cache the results
-                player_cache[player_url] = {
-                    'player_region': stat.get('player_region', 'Unknown'),
-                    'team_join_date': stat.get('team_join_date')
-                }
-                
-                time.sleep(0.2)  # Be nice to the server
-                
-            except Exception as e:
-                print(f"    Warning: Could not fetch player details for {stat.get('player_ign')}: {e}")
-                stat['player_region'] = 'Unknown'
+            # Looked up (and if need be fetched) once per player; a failed fetch
+            # is cached as None so the player's other rows do not retry it
+            if player_url not in player_cache:
+                details = self.registry.get('player', player_url)
+                if details is None:
+                    try:
+                        details = self._parse_player_details(fetch_html(player_url, timeout=5))
+                        self.registry.put('player', player_url, details)
+                        
+                    except Exception as e:
+                        print(f"    Warning: Could not fetch player details for {stat.get('player_ign')}: {e}")
+                        details = None
+                player_cache[player_url] = details
+            
+            self._apply_player_details(stat, player_cache[player_url])
         
         return player_stats
     
+    def _parse_player_details(self, html: str) -> Dict:
+        """
+        Parse a player page into its region and the join date for every team in its history
+        Returns:
+            {'player_region': str, 'team_join_dates': {team_name: date}}
+        """
+        soup = self._soup(html)
+        details = {'player_region': 'Unknown', 'team_join_dates': {}}
+        
+        # Extract player region
+        country_elem = soup.find('div', class_='ge-flag')
+        if country_elem:
+            details['player_region'] = country_elem.text.strip()
+        
+        # Extract team join dates from player history cards
+        for card in soup.find_all('div', class_='wf-card'):
+            team_link = card.find('a', href=re.compile(r'^/team/'))
+            if not team_link:
+                continue
+            team_name_elem = team_link.find('div', class_='text-of')
+            if not team_name_elem:
+                continue
+            team_name = team_name_elem.text.strip()
+            if team_name in details['team_join_dates']:
+                continue
+            
+            join_date = None
+            date_elem = card.find('div', class_='player-summary-join-date')
+            if date_elem:
+                try:
+                    # Parse date like "Jan 15, 2024"
+                    join_date = datetime.strptime(date_elem.text.strip(), '%b %d, %Y').date()
+                except ValueError:
+                    pass
+            details['team_join_dates'][team_name] = join_date
+        
+        return details
+    
+    @staticmethod
+    def _apply_player_details(stat: Dict, details: Optional[Dict]):
+        """Copy parsed player page details onto one player stat row"""
+        if not details:
+            stat['player_region'] = 'Unknown'
+            return
+        
+        stat['player_region'] = details.get('player_region', 'Unknown')
+        join_date = details.get('team_join_dates', {}).get(stat.get('team_name'))
+        if join_date:
+            stat['team_join_date'] = join_date
+    
     def _extract_match_info(self, soup: BeautifulSoup) -> Dict:
         """Extract basic match information including actual match date"""
         match_info = {}
@@ -378,7 +697,7 @@ class VLRScraper:
                 
                 # Only use links that go to /event/ pages
                 if href and '/event/' in href:
-                    match_info['tournament_url'] = 'https://www.vlr.gg' + href
+                    match_info['tournament_url'] = VLR_BASE_URL + href
                     
                     # Get tournament name 
                     tournament_name = None
@@ -495,7 +814,7 @@ class VLRScraper:
                     # Get team URL
                     link_elem = team_elem.find_parent('a')
                     if link_elem:
-                        teams[team_key]['url'] = 'https://www.vlr.gg' + link_elem.get('href', '')
+                        teams[team_key]['url'] = VLR_BASE_URL + link_elem.get('href', '')
             
             # Extract scores
             score_container = soup.find('div', class_='match-header-vs')
@@ -517,22 +836,15 @@ class VLRScraper:
         
         return teams
     
-    def _extract_maps(self, soup: BeautifulSoup) -> List[Dict]:
+    def _extract_maps(self, soup: BeautifulSoup) -> List[MapRecord]:
         """Extract map data"""
         maps = []
         
         try:
-            map_containers = soup.find_all('div', class_='vm-stats-game')
-            
-            valid_maps = []
-            for container in map_containers:
-                map_name_elem = container.find('div', class_='map')
-                if map_name_elem and map_name_elem.find('span'):
-                    valid_maps.append(container)
-            
+            valid_maps = self._get_map_containers(soup)
             
             for idx, map_container in enumerate(valid_maps, 1):
-                map_data = {'map_number': idx}
+                map_data = MapRecord(map_number=idx, game_id=map_container.get('data-game-id'))
                 
                 # Map name
                 map_name_elem = map_container.find('div', class_='map')
@@ -583,6 +895,18 @@ class VLRScraper:
                     except (ValueError, IndexError):
                         pass
                 
+                # Rounds won per side (header spans next to each team's score)
+                map_header = map_container.find('div', class_='vm-stats-game-header')
+                header_teams = map_header.find_all('div', class_='team') if map_header else []
+                for team_key, team_elem in zip(('team1', 'team2'), header_teams):
+                    for css_class, side in SIDES:
+                        side_span = team_elem.find('span', class_=css_class)
+                        if side_span:
+                            try:
+                                map_data[f'{team_key}_{side.lower()}_rounds'] = int(side_span.text.strip())
+                            except ValueError:
+                                pass
+                
                 # Round results
                 map_data['rounds'] = self._extract_round_results(map_container)
                 
@@ -594,7 +918,16 @@ class VLRScraper:
         
         return maps
     
-    def _extract_round_results(self, map_container) -> List[Dict]:
+    def _get_map_containers(self, soup: BeautifulSoup) -> List:
+        """Return the per-map vm-stats-game containers (skips the 'All Maps' summary)"""
+        valid_maps = []
+        for container in soup.find_all('div', class_='vm-stats-game'):
+            map_name_elem = container.find('div', class_='map')
+            if map_name_elem and map_name_elem.find('span'):
+                valid_maps.append(container)
+        return valid_maps
+    
+    def _extract_round_results(self, map_container) -> List[RoundRecord]:
         """Extract round-by-round results"""
         rounds = []
         try:
@@ -602,7 +935,7 @@ class VLRScraper:
             if vlr_rounds:
                 round_elements = vlr_rounds.find_all('div', class_='rnd')
                 for idx, round_elem in enumerate(round_elements, 1):
-                    round_data = {'round_number': idx}
+                    round_data = RoundRecord(round_number=idx)
                     
                     round_classes = round_elem.get('class', [])
                     if 'mod-t' in round_classes:
@@ -639,6 +972,7 @@ class VLRScraper:
     def _extract_player_stats_all_maps(self, team1_name: str, team2_name: str, maps_data: List[Dict]) -> List[Dict]:
         """Extract player statistics for each individual map only."""
         all_player_stats = []
+        ready = ReadinessWaiter(self.driver)
         
         try:
             map_names = [m['map_name'] for m in maps_data]
@@ -656,7 +990,7 @@ class VLRScraper:
                 
                 map_name = map_names[0] if map_names else "Unknown"
                 
-                time.sleep(1)
+                ready.until('stat_tables_visible', stat_tables_present(visible_only=True))
                 visible_tables = self._get_visible_stat_tables()
                 
                 if len(visible_tables) >= 2:
@@ -694,28 +1028,17 @@ class VLRScraper:
                         current_tab = map_tabs[tab_index]
                         
                         self.driver.execute_script("arguments[0].scrollIntoView(true);", current_tab)
-                        time.sleep(0.3)
                         
                         try:
                             current_tab.click()
                         except Exception as e:
                             self.driver.execute_script("arguments[0].click();", current_tab)
                         
-                        def active_tab_is_correct(driver):
-                            try:
-                                active_tab = driver.find_element(By.XPATH, f"//div[contains(@class, 'vm-stats-gamesnav-item') and contains(@class, 'mod-active') and contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{map_name.lower()}')]")
-                                return active_tab is not None
-                            except:
-                                return False
-
-                        WebDriverWait(self.driver, 10).until(active_tab_is_correct)
-                        
-                        def visible_tables_ready(driver):
-                            tables = self._get_visible_stat_tables()
-                            return len(tables) >= 2
-
-                        WebDriverWait(self.driver, 10).until(visible_tables_ready)
-                        time.sleep(0.5)
+                        if not ready.until('active_tab', active_tab(map_name), timeout=10):
+                            print(f"ERROR: tab for {map_name} never became active")
+                            continue
+                        ready.until('stat_tables_visible', stat_tables_present(visible_only=True))
+                        ready.quiet('tab_switch')
                         
                         visible_tables = self._get_visible_stat_tables()
                         
@@ -750,15 +1073,33 @@ class VLRScraper:
         print(f"{'='*60}")
         return all_player_stats
 
-    def _parse_stats_table_bs(self, html_str: str, team_name: str, map_name: str) -> List[Dict]:
+    def _extract_player_stats_from_soup(self, soup: BeautifulSoup, team1_name: str, team2_name: str,
+                                        maps_data: List[Dict]) -> List[PlayerMapStat]:
+        """Extract per-map player statistics from the server HTML without switching tabs"""
+        all_player_stats = []
+        
+        map_containers = self._get_map_containers(soup)
+        for map_container, map_data in zip(map_containers, maps_data):
+            map_name = map_data.get('map_name', 'Unknown')
+            tables = map_container.find_all('table', class_='wf-table-inset')
+            
+            if len(tables) >= 2:
+                all_player_stats.extend(self._parse_stats_table(tables[0], team1_name, map_name))
+                all_player_stats.extend(self._parse_stats_table(tables[1], team2_name, map_name))
+            else:
+                print(f"WARNING: Found {len(tables)} tables on map {map_name} (expected 2)")
+        
+        return all_player_stats
+
+    def _parse_stats_table_bs(self, html_str: str, team_name: str, map_name: str) -> List[PlayerMapStat]:
         """Parse stats table from HTML string via BeautifulSoup"""
-        soup = BeautifulSoup(html_str, 'html.parser')
+        soup = self._soup(html_str)
         table = soup.find('table')
         if not table:
             return []
         return self._parse_stats_table(table, team_name, map_name)
 
-    def _parse_stats_table(self, table, team_name: str, map_name: str) -> List[Dict]:
+    def _parse_stats_table(self, table, team_name: str, map_name: str) -> List[PlayerMapStat]:
         """Parse a single stats table for a team"""
         team_stats = []
         
@@ -770,10 +1111,7 @@ class VLRScraper:
             rows = tbody.find_all('tr')
             
             for row in rows:
-                player_stat = {
-                    'team_name': team_name,
-                    'map_name': map_name
-                }
+                player_stat = PlayerMapStat(team_name=team_name, map_name=map_name)
                 
                 # Player name and URL 
                 player_cell = row.find('td', class_='mod-player')
@@ -783,10 +1121,10 @@ class VLRScraper:
                         player_name_div = player_link.find('div', class_='text-of')
                         if player_name_div:
                             player_stat['player_ign'] = player_name_div.text.strip()
-                            player_stat['player_url'] = 'https://www.vlr.gg' + player_link.get('href', '')
+                            player_stat['player_url'] = VLR_BASE_URL + player_link.get('href', '')
                         else:
                             player_stat['player_ign'] = player_link.text.strip().split('\n')[0].strip()
-                            player_stat['player_url'] = 'https://www.vlr.gg' + player_link.get('href', '')
+                            player_stat['player_url'] = VLR_BASE_URL + player_link.get('href', '')
                     else:
                         continue
                 else:
@@ -876,6 +1214,11 @@ class VLRScraper:
                         player_stat['first_deaths'] = int(fd_text) if fd_text else None
                     except (ValueError, IndexError):
                         player_stat['first_deaths'] = None
+                    
+                    # Attack/defense values sit in the same cells as the totals
+                    sides = self._parse_side_stats(stat_cells)
+                    if sides:
+                        player_stat['sides'] = sides
                 
                 team_stats.append(player_stat)
                 
@@ -884,69 +1227,30 @@ class VLRScraper:
         
         return team_stats
 
+    @staticmethod
+    def _parse_side_stats(stat_cells) -> Dict[str, Dict]:
+        """
+        Attack and defense values from a scoreboard row's stat cells
+        Returns:
+            {'Attack': {...}, 'Defense': {...}} with the SIDE_STAT_COLUMNS fields
+            (a side is left out when the cells carry no values for it)
+        """
+        sides = {}
+        for css_class, side in SIDES:
+            values = {}
+            for cell, (field, convert) in zip(stat_cells, SIDE_STAT_COLUMNS):
+                side_span = cell.find('span', class_=css_class)
+                if side_span is None:
+                    continue
+                text = side_span.text.strip().replace('%', '').replace('+', '')
+                try:
+                    values[field] = convert(text) if text else None
+                except ValueError:
+                    values[field] = None
+            if values:
+                sides[side] = values
+        return sides
 
-def aggregate_player_stats(player_stats: List[Dict]) -> List[Dict]:
-    """Aggregate individual map stats into overall player statistics."""
-    from collections import defaultdict
-    
-    player_map_stats = defaultdict(list)
-    
-    for stat in player_stats:
-        key = (stat['team_name'], stat['player_ign'])
-        player_map_stats[key].append(stat)
-    
-    aggregated_stats = []
-    
-    for (team_name, player_ign), maps in player_map_stats.items():
-        if not maps:
-            continue
-        
-        agg = {
-            'team_name': team_name,
-            'player_ign': player_ign,
-            'map_name': 'Overall',
-            'player_url': maps[0].get('player_url', ''),
-        }
-        
-        # Copy region and join date from any map entry
-        if 'player_region' in maps[0]:
-            agg['player_region'] = maps[0]['player_region']
-        if 'team_join_date' in maps[0]:
-            agg['team_join_date'] = maps[0]['team_join_date']
-        
-        total_kills = sum(m.get('kills', 0) for m in maps if m.get('kills') is not None)
-        total_deaths = sum(m.get('deaths', 0) for m in maps if m.get('deaths') is not None)
-        total_assists = sum(m.get('assists', 0) for m in maps if m.get('assists') is not None)
-        total_fk = sum(m.get('first_kills', 0) for m in maps if m.get('first_kills') is not None)
-        total_fd = sum(m.get('first_deaths', 0) for m in maps if m.get('first_deaths') is not None)
-        
-        agg['kills'] = total_kills
-        agg['deaths'] = total_deaths
-        agg['assists'] = total_assists
-        agg['first_kills'] = total_fk
-        agg['first_deaths'] = total_fd
-        
-        valid_ratings = [m.get('rating') for m in maps if m.get('rating') is not None]
-        valid_acs = [m.get('acs') for m in maps if m.get('acs') is not None]
-        valid_kast = [m.get('kast_percent') for m in maps if m.get('kast_percent') is not None]
-        valid_adr = [m.get('adr') for m in maps if m.get('adr') is not None]
-        valid_hs = [m.get('hs_percent') for m in maps if m.get('hs_percent') is not None]
-        
-        agg['rating'] = round(sum(valid_ratings) / len(valid_ratings), 2) if valid_ratings else None
-        agg['acs'] = round(sum(valid_acs) / len(valid_acs)) if valid_acs else None
-        agg['kast_percent'] = round(sum(valid_kast) / len(valid_kast), 1) if valid_kast else None
-        agg['adr'] = round(sum(valid_adr) / len(valid_adr), 1) if valid_adr else None
-        agg['hs_percent'] = round(sum(valid_hs) / len(valid_hs), 1) if valid_hs else None
-        
-        agg['plus_minus'] = sum(m.get('plus_minus', 0) for m in maps if m.get('plus_minus') is not None)
-        
-        agents = [m.get('agent') for m in maps if m.get('agent')]
-        if agents:
-            agg['agent'] = agents[0]
-        
-        aggregated_stats.append(agg)
-    
-    return aggregated_stats
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Pooled keep-alive HTTP sessions for the static vlr.gg fetchers
+"""
+import asyncio
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 (enables HTTP/2 in httpx)
+except ImportError:
+    h2 = None
+
+
+def http2_available() -> bool:
+    """True if httpx can speak HTTP/2 (httpx and h2 installed)"""
+    return httpx is not None and h2 is not None
+
+
+class SessionManager:
+    """
+    One connection pool per process for every static request to vlr.gg.
+
+    Uses an httpx.Client with HTTP/2 when httpx and h2 are installed (one
+    multiplexed connection per host), otherwise a requests.Session with a
+    pooled keep-alive HTTPAdapter. Both send the shared headers (gzip
+    included) and retry failed connections; the requests transport also
+    retries 500/502/504 responses. 429 and 503 are left to the rate limiter.
+
+    Async callers (the detail-page enricher) share one httpx.AsyncClient,
+    kept alive with its own event loop thread for the life of the process,
+    so their connections are reused across matches too. Counts requests and
+    newly opened connections of both clients so reuse can be checked.
+    """
+
+    def __init__(self, headers: Optional[Dict] = None, pool_size: int = 10,
+                 max_retries: int = 3, backoff_factor: float = 0.5, use_http2: Optional[bool] = None):
+        """
+        Args:
+            headers: Headers sent with every request
+            pool_size: Connections kept alive per host
+            max_retries: Retries for failed connections (and 500/502/504 with requests)
+            backoff_factor: urllib3 retry backoff factor (seconds)
+            use_http2: Force HTTP/2 on or off (default: on when available)
+        """
+        self.headers = dict(headers or {})
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.use_http2 = http2_available() if use_http2 is None else (use_http2 and http2_available())
+
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'connections': 0, 'http2_responses': 0}
+
+        # Async side, started on first use by the process that uses it
+        self._loop = None
+        self._loop_thread = None
+        self._loop_pid = None
+        self._async_client = None
+
+        if self.use_http2:
+            # httpx only retries failed connects; status retries are not supported
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            self._client = httpx.Client(
+                headers=self.headers,
+                follow_redirects=True,
+                transport=httpx.HTTPTransport(http2=True, retries=max_retries, limits=limits),
+            )
+            self._session = None
+        else:
+            self._client = None
+            self._session = requests.Session()
+            self._session.headers.update(self.headers)
+            retry = Retry(
+                total=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=(500, 502, 504),
+                allowed_methods=frozenset(['GET', 'HEAD']),
+                raise_on_status=False,
+                respect_retry_after_header=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+
+    @property
+    def transport(self) -> str:
+        return 'httpx (HTTP/2)' if self._client is not None else 'requests (HTTP/1.1 keep-alive)'
+
+    def get(self, url: str, headers: Optional[Dict] = None, timeout: float = 10):
+        """
+        GET a URL over the pooled connections
+        Returns:
+            Response with status_code, headers and text (requests or httpx)
+        """
+        if self._client is not None:
+            response = self._client.get(url, headers=headers, timeout=timeout,
+                                        extensions={'trace': self._trace})
+            with self._lock:
+                self.stats['requests'] += 1
+                if response.http_version == 'HTTP/2':
+                    self.stats['http2_responses'] += 1
+            return response
+
+        response = self._session.get(url, headers=headers, timeout=timeout)
+        with self._lock:
+            self.stats['requests'] += 1
+        return response
+
+    def _trace(self, event_name: str, info: Dict):
+        """httpcore trace hook: a TCP connect means a new connection (no reuse)"""
+        if event_name == 'connection.connect_tcp.complete':
+            with self._lock:
+                self.stats['connections'] += 1
+
+    async def _atrace(self, event_name: str, info: Dict):
+        self._trace(event_name, info)
+
+    def run(self, coro):
+        """
+        Run a coroutine on the session's event loop and wait for its result.
+        Coroutines that call aget() must run here, since the shared async
+        client's connections belong to this loop.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._event_loop()).result()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """The long-lived loop thread of this process (a forked child starts its own)"""
+        with self._lock:
+            if self._loop is None or self._loop_pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._loop_pid = os.getpid()
+                self._async_client = None
+                self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                                     name='vlr-session-loop', daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    async def aget(self, url: str, headers: Optional[Dict] = None, timeout: float = 10):
+        """
+        GET a URL over the shared async client (call from a coroutine passed to run()).
+        Without httpx the request goes through get() in a worker thread.
+        """
+        if httpx is None:
+            return await asyncio.to_thread(self.get, url, headers=headers, timeout=timeout)
+
+        if self._async_client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            self._async_client = httpx.AsyncClient(
+                headers=self.headers,
+                follow_redirects=True,
+                transport=httpx.AsyncHTTPTransport(http2=http2_available(), retries=self.max_retries,
+                                                   limits=limits),
+            )
+        response = await self._async_client.get(url, headers=headers, timeout=timeout,
+                                                extensions={'trace': self._atrace})
+        with self._lock:
+            self.stats['requests'] += 1
+            if response.http_version == 'HTTP/2':
+                self.stats['http2_responses'] += 1
+        return response
+
+    def _urllib3_connections(self) -> int:
+        """New connections opened by the requests adapters' urllib3 pools"""
+        total = 0
+        seen = set()
+        for adapter in self._session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    total += pool.num_connections
+        return total
+
+    def get_stats(self) -> Dict:
+        """Requests sent, connections opened and how many requests reused a connection"""
+        with self._lock:
+            stats = dict(self.stats)
+        if self._session is not None:
+            # The trace hook only saw the async client's connections
+            stats['connections'] += self._urllib3_connections()
+        stats['reused'] = max(0, stats['requests'] - stats['connections'])
+        stats['transport'] = self.transport
+        return stats
+
+    def close(self):
+        """Close every pooled connection"""
+        if self._client is not None:
+            self._client.close()
+        if self._session is not None:
+            self._session.close()
+        # A forked child inherits the parent's loop object but not its thread
+        if self._loop is not None and self._loop_pid == os.getpid():
+            if self._async_client is not None:
+                self.run(self._async_client.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+        self._loop = None
+        self._async_client = None